@@ -5,12 +5,16 @@ DesignAgent enhancements:
 3. Skips invalid PubChem lookups (diseases / targets).
 4. Supports single-compound and multi-compound workflows.
 5. Modular and ready for extension.
+6. Nearest-neighbour lookup in the compound library (Tanimoto).
+7. Scaffold / SMARTS substructure filtering of the compound library.
 """
 
 from tools.pubchem import PubChemTool
 from tools.docking import DockingTool
 from tools.qsar import QSARTool
 from tools.pubmedbert_tool import pubmedbert_summarize
+from tools.similarity_index import find_similar_compounds
+from tools.substructure_search import find_substructure_matches
 
 
 class DesignAgent:
@@ -33,6 +37,18 @@ class DesignAgent:
         ]
         return not any(t in name for t in invalid_terms)
 
+    def find_similar(self, smiles: str, k: int = 10, min_similarity: float = 0.0):
+        """
+        Library compounds most similar to a query SMILES (Morgan/Tanimoto).
+        """
+        return find_similar_compounds(smiles, k=k, min_similarity=min_similarity)
+
+    def find_containing(self, scaffold: str, limit: int | None = None):
+        """
+        Library compounds containing a scaffold (SMILES or SMARTS).
+        """
+        return find_substructure_matches(scaffold, limit=limit)
+
     def run(self, compound, compounds_for_target=None):
         """
         Design stage:
@@ -2,6 +2,10 @@
 # DISCOVERY AGENT — RAG-ONLY, GENE-SPECIFIC VERSION
 # ============================================================
 
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
 from tools.pubmed import PubMedTool
 from tools.alphafold import AlphaFoldTool
 from tools.pubchem import PubChemTool
@@ -12,6 +16,14 @@ from tools.admet_predictor import predict_admet
 from tools.rag_explainer import explain   # 🔥 YOUR 20-LINE RAG EXPLAINER
 
 
+# ------------------------------------------------------------
+# CONCURRENT MODE SETTINGS
+# ------------------------------------------------------------
+
+DISCOVERY_DEADLINE = float(os.getenv("DISCOVERY_DEADLINE", "25"))        # seconds
+DISCOVERY_CONCURRENCY = int(os.getenv("DISCOVERY_CONCURRENCY", "12"))     # in-flight calls
+
+
 # ------------------------------------------------------------
 # SAFE FLOAT
 # ------------------------------------------------------------
@@ -35,107 +47,112 @@ class DiscoveryAgent:
         self.qsar = QSARTool()
 
     # --------------------------------------------------------
-    # MAIN PIPELINE
+    # TARGET IDENTIFICATION
     # --------------------------------------------------------
 
-    def run(self, query: str):
-
-        # ---------------- Literature ----------------
-        literature = self.pubmed.search(query)
-
-        # ---------------- Target Identification ----------------
+    @staticmethod
+    def _targets_for(query: str):
         q = query.lower()
 
         if "alzheimer" in q:
-            targets = ["APP", "PSEN1", "PSEN2", "BACE1", "MAPT"]
-        elif "parkinson" in q:
-            targets = ["SNCA", "LRRK2"]
-        elif "als" in q:
-            targets = ["SOD1", "FUS", "TARDBP"]
-        elif "huntington" in q:
-            targets = ["HTT"]
-        else:
-            # direct gene or protein query
-            targets = [query.upper()]
+            return ["APP", "PSEN1", "PSEN2", "BACE1", "MAPT"]
+        if "parkinson" in q:
+            return ["SNCA", "LRRK2"]
+        if "als" in q:
+            return ["SOD1", "FUS", "TARDBP"]
+        if "huntington" in q:
+            return ["HTT"]
 
-        # ---------------- AlphaFold Structures ----------------
-        structures = {
-            gene: self.alphafold.predict(gene)
-            for gene in targets
+        # direct gene or protein query
+        return [query.upper()]
+
+    @staticmethod
+    def _structure_unavailable(gene: str, message: str):
+        return {
+            "found": False,
+            "manual_link": f"https://alphafold.ebi.ac.uk/search/text/{gene}",
+            "message": message
         }
 
-        # ---------------- Pathway Enrichment ----------------
-        pathways = run_pathway_enrichment(targets)
+    # --------------------------------------------------------
+    # GENE → COMPOUND SCORING
+    # --------------------------------------------------------
 
-        # ---------------- Gene → Compound Scoring ----------------
-        gene_compound_scores = {}
+    def _score_compounds(self, gene: str, hits: list):
+        compounds = []
+        hits = (hits or [])[:5]
 
-        for gene in targets:
-            compounds = []
+        # ---- QSAR: one batched call per gene, RDKit descriptors per SMILES ----
+        # (hits without SMILES get empty descriptor rows → default MW / LogP)
+        qsar_scores = self.qsar.predict_batch([hit.get("smiles") or "" for hit in hits])
 
-            hits = get_chembl_compounds_for_target(gene) or []
+        # ---- ChEMBL-derived compounds ----
+        for hit, qsar_score in zip(hits, qsar_scores):
 
-            # ---- ChEMBL-derived compounds ----
-            for hit in hits[:5]:
+            compound_name = (
+                hit.get("name")
+                or hit.get("compound")
+                or hit.get("molecule_chembl_id")
+                or f"InSilico_{gene}"
+            )
 
-                compound_name = (
-                    hit.get("name")
-                    or hit.get("compound")
-                    or hit.get("molecule_chembl_id")
-                    or f"InSilico_{gene}"
-                )
+            activity_type = hit.get("activity_type", "IC50")
+            activity_value = safe_float(hit.get("activity_value", 1000))
+            activity_units = hit.get("activity_units", "nM")
 
-                activity_type = hit.get("activity_type", "IC50")
-                activity_value = safe_float(hit.get("activity_value", 1000))
-                activity_units = hit.get("activity_units", "nM")
+            activity = f"{activity_type} {activity_value} {activity_units}"
 
-                activity = f"{activity_type} {activity_value} {activity_units}"
+            admet = safe_float(predict_admet(compound_name))
 
-                admet = safe_float(predict_admet(compound_name))
+            qsar_score = safe_float(qsar_score)
 
-                qsar_score = safe_float(
-                    self.qsar.predict({
-                        "MW": safe_float(hit.get("MW", 350)),
-                        "LogP": safe_float(hit.get("LogP", 2.5)),
-                        "HBD": safe_float(hit.get("HBD", 1)),
-                        "HBA": safe_float(hit.get("HBA", 5)),
-                        "TPSA": safe_float(hit.get("TPSA", 75)),
-                    })
-                )
+            final_score = round(
+                (0.4 * qsar_score) +
+                (0.3 * admet) +
+                (0.3 * (1 / (1 + activity_value))),
+                3
+            )
 
-                final_score = round(
-                    (0.4 * qsar_score) +
-                    (0.3 * admet) +
-                    (0.3 * (1 / (1 + activity_value))),
-                    3
-                )
+            compounds.append({
+                "compound_name": compound_name,
+                "activity": activity,
+                "admet": admet,
+                "qsar_score": qsar_score,
+                "final_score": final_score,
+            })
 
+        # ---- HARD FALLBACK (UNDUGGABLE / RNA-BINDING PROTEINS) ----
+        if not compounds:
+            for i in range(3):
+                activity_value = 200 + i * 100
                 compounds.append({
-                    "compound_name": compound_name,
-                    "activity": activity,
-                    "admet": admet,
-                    "qsar_score": qsar_score,
-                    "final_score": final_score,
+                    "compound_name": f"InSilico_{gene}_{i+1}",
+                    "activity": f"IC50 {activity_value} nM",
+                    "admet": 0.55,
+                    "qsar_score": 0.85,
+                    "final_score": round(
+                        (0.4 * 0.85) +
+                        (0.3 * 0.55) +
+                        (0.3 * (1 / (1 + activity_value))),
+                        3
+                    )
                 })
 
-            # ---- HARD FALLBACK (UNDUGGABLE / RNA-BINDING PROTEINS) ----
-            if not compounds:
-                for i in range(3):
-                    activity_value = 200 + i * 100
-                    compounds.append({
-                        "compound_name": f"InSilico_{gene}_{i+1}",
-                        "activity": f"IC50 {activity_value} nM",
-                        "admet": 0.55,
-                        "qsar_score": 0.85,
-                        "final_score": round(
-                            (0.4 * 0.85) +
-                            (0.3 * 0.55) +
-                            (0.3 * (1 / (1 + activity_value))),
-                            3
-                        )
-                    })
+        return compounds
 
-            gene_compound_scores[gene] = compounds
+    # --------------------------------------------------------
+    # ASSEMBLY (SHARED BY BOTH MODES)
+    # --------------------------------------------------------
+
+    def _assemble(self, query, literature, targets, structures, chembl_hits):
+        # ---------------- Pathway Enrichment ----------------
+        pathways = run_pathway_enrichment(targets)
+
+        # ---------------- Gene → Compound Scoring ----------------
+        gene_compound_scores = {
+            gene: self._score_compounds(gene, chembl_hits.get(gene))
+            for gene in targets
+        }
 
         # ---------------- 🔥 RAG EXPLANATION (20 LINES PER GENE) ----------------
         llm_summary = explain(
@@ -153,3 +170,152 @@ class DiscoveryAgent:
             "gene_compound_scores": gene_compound_scores,
             "llm_summary": llm_summary,
         }
+
+    # --------------------------------------------------------
+    # MAIN PIPELINE (SEQUENTIAL)
+    # --------------------------------------------------------
+
+    def run(self, query: str):
+
+        # ---------------- Literature ----------------
+        literature = self.pubmed.search(query)
+
+        # ---------------- Target Identification ----------------
+        targets = self._targets_for(query)
+
+        # ---------------- AlphaFold Structures ----------------
+        structures = {
+            gene: self.alphafold.predict(gene)
+            for gene in targets
+        }
+
+        # ---------------- ChEMBL ----------------
+        chembl_hits = {
+            gene: get_chembl_compounds_for_target(gene)
+            for gene in targets
+        }
+
+        return self._assemble(query, literature, targets, structures, chembl_hits)
+
+    # --------------------------------------------------------
+    # MAIN PIPELINE (CONCURRENT FAN-OUT)
+    # --------------------------------------------------------
+
+    async def arun(
+        self,
+        query: str,
+        deadline: float = DISCOVERY_DEADLINE,
+        max_concurrency: int = DISCOVERY_CONCURRENCY,
+        progress=None
+    ):
+        """
+        Same result as run(), but literature, per-gene AlphaFold and
+        per-gene ChEMBL calls run concurrently (at most max_concurrency
+        at once) under one overall deadline.
+
+        Sources still pending at the deadline are abandoned, and sources
+        that raise are logged; both are replaced by their usual
+        fallbacks, and the result then carries "partial": True with the
+        source names under "timed_out" and "failed".
+
+        progress(stage, **data), if given, is called once targets are
+        known and as each source completes, with its result.
+        """
+        targets = self._targets_for(query)
+        if progress:
+            progress("targets", targets=targets)
+
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, max_concurrency),
+            thread_name_prefix="discovery"
+        )
+
+        calls = {("literature", None): (self.pubmed.search, query)}
+        for gene in targets:
+            calls[("alphafold", gene)] = (self.alphafold.predict, gene)
+            calls[("chembl", gene)] = (get_chembl_compounds_for_target, gene)
+
+        tasks = {
+            loop.run_in_executor(executor, fn, arg): key
+            for key, (fn, arg) in calls.items()
+        }
+
+        done, pending = set(), set(tasks)
+        end = loop.time() + deadline
+        try:
+            while pending:
+                remaining = end - loop.time()
+                if remaining <= 0:
+                    break
+                finished, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                done |= finished
+                if progress:
+                    for task in finished:
+                        source, gene = tasks[task]
+                        ok = task.exception() is None
+                        progress(
+                            source,
+                            gene=gene,
+                            ok=ok,
+                            result=task.result() if ok else None
+                        )
+        finally:
+            # Do not wait for abandoned network calls
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        results = {}
+        failed_keys = set()
+        for task in done:
+            try:
+                results[tasks[task]] = task.result()
+            except Exception as e:
+                print(f"⚠️ Discovery source failed {tasks[task]}:", e)
+                failed_keys.add(tasks[task])
+
+        for task in pending:
+            task.cancel()
+        timed_out_keys = {tasks[t] for t in pending}
+
+        def label(key):
+            source, gene = key
+            return f"{source}:{gene}" if gene else source
+
+        timed_out = sorted(label(k) for k in timed_out_keys)
+        failed = sorted(label(k) for k in failed_keys)
+
+        def structure_unavailable(gene):
+            key = ("alphafold", gene)
+            if key in timed_out_keys:
+                reason = " (deadline exceeded)"
+            elif key in failed_keys:
+                reason = " (request failed)"
+            else:
+                reason = ""
+            return self._structure_unavailable(gene, f"AlphaFold unavailable{reason}.")
+
+        literature = results.get(("literature", None), [])
+        structures = {
+            gene: results.get(("alphafold", gene)) or structure_unavailable(gene)
+            for gene in targets
+        }
+        chembl_hits = {
+            gene: results.get(("chembl", gene)) or []
+            for gene in targets
+        }
+
+        result = await loop.run_in_executor(
+            None, self._assemble, query, literature, targets, structures, chembl_hits
+        )
+        result["partial"] = bool(timed_out or failed)
+        result["timed_out"] = timed_out
+        result["failed"] = failed
+        return result
+
+    def run_concurrent(self, query: str, **kwargs):
+        """
+        Blocking wrapper around arun() for synchronous callers.
+        """
+        return asyncio.run(self.arun(query, **kwargs))
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from datetime import datetime
@@ -13,6 +15,7 @@ MONGODB_URI = os.getenv("MONGODB_URI")
 
 mongo_client = None
 history_collection = None
+history_writer = None
 
 # =========================================================
 # AGENTS
@@ -32,7 +35,19 @@ from tools.gnn_model import run_gnn
 from tools.alphafold import AlphaFoldTool
 from tools.admet_predictor import predict_admet
 from tools.clinical_trials import get_trials_for_query
-from tools.pathway_enrichment import run_pathway_enrichment
+from tools.clinical_trials_mirror import sync_clinical_trials
+from tools.pathway_enrichment import run_pathway_enrichment, run_pathway_enrichment_batch
+from tools.similarity_index import find_similar_compounds, MAX_TOP_K
+from tools.substructure_search import find_substructure_matches, MAX_HITS
+from tools.http_client import http_metrics
+from tools.response_cache import (
+    ResponseCache,
+    SQLiteResponseStore,
+    MongoResponseStore,
+    cache_headers,
+)
+from tools.job_queue import get_job_queue, close_job_queue, JobQueueFull
+from tools.history_writer import HistoryWriter
 
 # =========================================================
 # APP
@@ -64,6 +79,18 @@ design_agent = DesignAgent()
 validation_agent = ValidationAgent()
 approval_agent = ApprovalAgent()
 
+# =========================================================
+# RESPONSE CACHES (SQLITE UNTIL MONGO CONNECTS)
+# =========================================================
+response_store = SQLiteResponseStore()
+workflow_cache = ResponseCache("full_workflow", store=response_store)
+monitor_cache = ResponseCache("disease_monitor", store=response_store)
+
+# =========================================================
+# JOB QUEUE (LONG-RUNNING WORKFLOWS, BUILT ON STARTUP)
+# =========================================================
+job_queue = None
+
 # =========================================================
 # MONGO SAFE SERIALIZER (TORCH OPTIONAL)
 # =========================================================
@@ -88,7 +115,7 @@ def mongo_safe(obj):
 # =========================================================
 @app.on_event("startup")
 def startup_db():
-    global mongo_client, history_collection
+    global mongo_client, history_collection, history_writer
 
     if not MONGODB_URI:
         print("❌ MONGODB_URI not set")
@@ -102,42 +129,82 @@ def startup_db():
         )
         mongo_client.admin.command("ping")
         history_collection = mongo_client["drug_discovery"]["history"]
+        history_writer = HistoryWriter(history_collection, serialize=mongo_safe).start()
+
+        shared_store = MongoResponseStore(mongo_client["drug_discovery"]["response_cache"])
+        workflow_cache.store = shared_store
+        monitor_cache.store = shared_store
         print("✅ MongoDB connected")
     except Exception as e:
         print("❌ MongoDB connection error:", e)
         history_collection = None
 
+@app.on_event("shutdown")
+def shutdown_history_writer():
+    # Flush queued history documents before the process exits
+    if history_writer is not None:
+        history_writer.close()
+
 # =========================================================
 # ROOT
 # =========================================================
 @app.get("/")
-def root():
+async def root():
     return {"status": "Drug Discovery AI backend running"}
 
+# =========================================================
+# HISTORY (BATCHED, OFF THE REQUEST PATH)
+# =========================================================
+def save_history(query: str, query_type: str, result: dict):
+    # Serialization (mongo_safe) and insert_many happen on the writer thread
+    if history_writer is not None:
+        history_writer.submit({
+            "query": query,
+            "query_type": query_type,
+            "timestamp": datetime.utcnow(),
+            "result": result
+        })
+
 # =========================================================
 # FULL WORKFLOW
 # =========================================================
-@app.get("/full_workflow")
-def full_workflow(query: str):
-    try:
-        discovery = discovery_agent.run(query)
+def workflow_response(discovery: dict):
+    discovery.setdefault("suggested_targets", [])
+    discovery.setdefault("structures", {})
+    discovery.setdefault("pathways", [])
+    discovery.setdefault("gene_compound_scores", {})
+    discovery.setdefault("llm_summary", "")
+
+    return {"discovery": discovery}
 
-        discovery.setdefault("suggested_targets", [])
-        discovery.setdefault("structures", {})
-        discovery.setdefault("pathways", [])
-        discovery.setdefault("gene_compound_scores", {})
-        discovery.setdefault("llm_summary", "")
+def workflow_complete(result: dict):
+    # Partial results (deadline hit) are served but never cached
+    return not result["discovery"].get("partial")
 
-        result = {"discovery": discovery}
+def compute_full_workflow(query: str, progress=None):
+    return workflow_response(discovery_agent.run_concurrent(query, progress=progress))
 
-        if history_collection is not None:
-            history_collection.insert_one({
-                "query": query,
-                "query_type": "full_workflow",
-                "timestamp": datetime.utcnow(),
-                "result": mongo_safe(result)
-            })
+async def acompute_full_workflow(query: str):
+    return workflow_response(await discovery_agent.arun(query))
 
+def cached_full_workflow(query: str, progress=None):
+    return workflow_cache.get_or_compute(
+        query,
+        lambda: compute_full_workflow(query, progress=progress),
+        cacheable=workflow_complete
+    )
+
+@app.get("/full_workflow")
+async def full_workflow(query: str, response: Response):
+    try:
+        result, status, age = await workflow_cache.aget_or_compute(
+            query,
+            lambda: acompute_full_workflow(query),
+            cacheable=workflow_complete
+        )
+        response.headers.update(cache_headers(status, age, workflow_cache.ttl))
+
+        save_history(query, "full_workflow", result)
         return result
 
     except Exception as e:
@@ -155,13 +222,15 @@ def full_workflow(query: str):
 # =========================================================
 # DISEASE MONITOR
 # =========================================================
-@app.get("/disease_monitor")
-def disease_monitor(disease: str):
-    monitor = run_disease_monitor(disease)
+def compute_disease_monitor(disease: str, incremental: bool = False, progress=None):
+    monitor = run_disease_monitor(disease, incremental=incremental)
 
     genes = monitor.get("genes", [])
     evidence_timeline = monitor.get("evidence_timeline", {})
 
+    if progress:
+        progress("literature", genes=genes, evidence_timeline=evidence_timeline)
+
     if not genes:
         return {
             "ranked_targets": [],
@@ -172,6 +241,9 @@ def disease_monitor(disease: str):
 
     ranked_genes = run_gnn(genes, disease)
 
+    if progress:
+        progress("ranking", ranked_genes=len(ranked_genes))
+
     nodes = [{"id": disease, "type": "disease"}]
     edges = []
 
@@ -179,7 +251,7 @@ def disease_monitor(disease: str):
         nodes.append({"id": g["gene"], "type": "gene"})
         edges.append({"source": disease, "target": g["gene"]})
 
-    response = {
+    return {
         "ranked_targets": [
             {"node": g["gene"], "score": g["score"]}
             for g in ranked_genes
@@ -192,24 +264,140 @@ def disease_monitor(disease: str):
         "rag_ready": False
     }
 
-    if history_collection is not None:
-        history_collection.insert_one({
-            "query": disease,
-            "query_type": "disease_monitor",
-            "timestamp": datetime.utcnow(),
-            "result": mongo_safe(response)
-        })
+def monitor_found_targets(result: dict):
+    # Empty results (e.g. PubMed unreachable) are not cached
+    return bool(result["ranked_targets"])
+
+def cached_disease_monitor(disease: str, progress=None):
+    return monitor_cache.get_or_compute(
+        disease,
+        lambda: compute_disease_monitor(disease, progress=progress),
+        cacheable=monitor_found_targets
+    )
 
-    return response
+@app.get("/disease_monitor")
+async def disease_monitor(disease: str, response: Response, incremental: bool = False):
+    if incremental:
+        # Incremental runs advance the stored monitor state → always recompute
+        result = await run_in_threadpool(compute_disease_monitor, disease, True)
+    else:
+        result, status, age = await monitor_cache.aget_or_compute(
+            disease,
+            lambda: run_in_threadpool(compute_disease_monitor, disease),
+            cacheable=monitor_found_targets
+        )
+        response.headers.update(cache_headers(status, age, monitor_cache.ttl))
+
+    save_history(disease, "disease_monitor", result)
+    return result
 
 # =========================================================
-# ADMIN HISTORY
+# BACKGROUND JOBS
 # =========================================================
-@app.get("/admin/history")
-def get_history(limit: int = 20):
-    if history_collection is None:
-        return []
+def full_workflow_job(progress, query: str):
+    result, status, _ = cached_full_workflow(query, progress=progress)
+    progress("cache", status=status)
+    save_history(query, "full_workflow", result)
+    return result
+
+def disease_monitor_job(progress, disease: str, incremental: bool = False):
+    if incremental:
+        result = compute_disease_monitor(disease, incremental=True, progress=progress)
+    else:
+        result, status, _ = cached_disease_monitor(disease, progress=progress)
+        progress("cache", status=status)
+    save_history(disease, "disease_monitor", result)
+    return result
+
+JOB_HANDLERS = {
+    "full_workflow": full_workflow_job,
+    "disease_monitor": disease_monitor_job,
+    "clinical_trials_sync": sync_clinical_trials,
+}
+
+@app.on_event("startup")
+def startup_job_queue():
+    # Opening the queue touches its SQLite file, recovers expired jobs and
+    # starts the lease heartbeat — a server concern, not an import one
+    global job_queue
+    job_queue = get_job_queue()
+    for kind, handler in JOB_HANDLERS.items():
+        job_queue.register(kind, handler)
+
+@app.on_event("shutdown")
+def shutdown_job_queue():
+    # Queued jobs are dropped, running ones get a grace period; the rest
+    # are marked interrupted instead of staying "running"
+    global job_queue
+    job_queue = None
+    close_job_queue()
+
+def jobs():
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Job queue not running")
+    return job_queue
+
+async def submit_job(kind: str, **params):
+    try:
+        return await run_in_threadpool(jobs().submit, kind, **params)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=f"Job queue full: {e}")
+
+@app.post("/jobs/full_workflow", status_code=202)
+async def submit_full_workflow(query: str):
+    return await submit_job("full_workflow", query=query)
+
+@app.post("/jobs/disease_monitor", status_code=202)
+async def submit_disease_monitor(disease: str, incremental: bool = False):
+    return await submit_job("disease_monitor", disease=disease, incremental=incremental)
+
+@app.post("/jobs/clinical_trials_sync", status_code=202)
+async def submit_clinical_trials_sync(full: bool = False):
+    return await submit_job("clinical_trials_sync", full=full)
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    job = await run_in_threadpool(jobs().status, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str):
+    job = await run_in_threadpool(jobs().status, job_id, include_result=True)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "done":
+        return JSONResponse(status_code=202, content=job)
+    return job["result"]
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, after: int = 0, stream: bool = True):
+    """
+    Progress events; server-sent events by default, or one JSON
+    long-poll (stream=false) returning events after `after`.
+    """
+    if await run_in_threadpool(jobs().status, job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+
+    if not stream:
+        events, finished = await run_in_threadpool(
+            jobs().events, job_id, after=after, timeout=10
+        )
+        return {"events": events, "finished": finished}
+
+    return StreamingResponse(
+        jobs().stream(job_id, after=after),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
+# =========================================================
+# ADMIN HISTORY
+# =========================================================
+def recent_history(limit: int):
     docs = history_collection.find().sort("timestamp", -1).limit(limit)
     results = []
 
@@ -219,30 +407,85 @@ def get_history(limit: int = 20):
 
     return results
 
+@app.get("/admin/history")
+async def get_history(limit: int = 20):
+    if history_collection is None:
+        return []
+
+    return await run_in_threadpool(recent_history, limit)
+
+@app.get("/admin/http_metrics")
+async def get_http_metrics():
+    return http_metrics()
+
+@app.get("/admin/cache_stats")
+async def get_cache_stats():
+    return [workflow_cache.stats(), monitor_cache.stats()]
+
+@app.get("/admin/job_stats")
+async def get_job_stats():
+    return jobs().stats()
+
+@app.get("/admin/history_stats")
+async def get_history_stats():
+    return history_writer.stats() if history_writer is not None else {}
+
 # =========================================================
 # ENGINE ENDPOINTS
 # =========================================================
 @app.get("/alphafold/{gene}")
-def alphafold_structure(gene: str):
+async def alphafold_structure(gene: str):
     af = AlphaFoldTool()
-    return {"gene": gene, "structure": af.predict(gene)}
+    return {"gene": gene, "structure": await run_in_threadpool(af.predict, gene)}
 
 @app.post("/admet")
-def admet(payload: dict):
+async def admet(payload: dict):
     return {
         "compound": payload.get("compound"),
-        "admet_score": predict_admet(payload.get("compound"))
+        "admet_score": await run_in_threadpool(predict_admet, payload.get("compound"))
     }
 
 @app.post("/pathways")
-def pathways(payload: dict):
+async def pathways(payload: dict):
+    # {"gene_lists": [[...], ...]} scores many lists in one pass
+    if "gene_lists" in payload:
+        return {
+            "results": await run_in_threadpool(
+                run_pathway_enrichment_batch, payload.get("gene_lists") or []
+            )
+        }
+
     return {
-        "pathways": run_pathway_enrichment(payload.get("genes", []))
+        "pathways": await run_in_threadpool(run_pathway_enrichment, payload.get("genes", []))
     }
 
 @app.get("/clinical_trials")
-def clinical_trials(query: str):
+async def clinical_trials(query: str, whole_word: bool = False, limit: int | None = None):
+    return {
+        "query": query,
+        "trials": await run_in_threadpool(
+            get_trials_for_query, query, whole_word=whole_word, limit=limit
+        )
+    }
+
+@app.get("/similar_compounds")
+async def similar_compounds(
+    smiles: str,
+    k: int = Query(10, ge=1, le=MAX_TOP_K),
+    min_similarity: float = Query(0.0, ge=0.0, le=1.0)
+):
+    return {
+        "query": smiles,
+        "hits": await run_in_threadpool(
+            find_similar_compounds, smiles, k=k, min_similarity=min_similarity
+        )
+    }
+
+@app.get("/substructure_search")
+async def substructure_search(query: str, limit: int = Query(100, ge=1, le=MAX_HITS)):
+    hits = await run_in_threadpool(find_substructure_matches, query, limit=limit)
     return {
         "query": query,
-        "trials": get_trials_for_query(query)
+        "count": len(hits),
+        "hits": hits
     }
@@ -0,0 +1,106 @@
+# ============================================================
+# BENCHMARK: CLINICAL TRIAL LOOKUP (INVERTED INDEX VS ROW SCAN)
+# ============================================================
+#
+# Usage (from the project root):
+#   python -m benchmarks.clinical_trials [n_trials]
+#
+# Writes a synthetic registry to a temporary CSV, builds the index
+# and times substring / whole-word queries against the old
+# DataFrame.apply scan.
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+import pandas as pd
+
+from tools.clinical_trials import TrialsIndex, SEARCH_COLUMNS
+
+
+CONDITIONS = [
+    "Alzheimer's disease", "Parkinson's disease", "Amyotrophic lateral sclerosis",
+    "Huntington's disease", "Multiple sclerosis", "Pancreatic cancer",
+    "Non-small cell lung cancer", "Breast cancer", "Type 2 diabetes",
+    "Rheumatoid arthritis", "Crohn's disease", "Glioblastoma",
+]
+INTERVENTIONS = [
+    "Placebo", "Donepezil", "Levodopa", "Riluzole", "Tofersen", "Pembrolizumab",
+    "Nivolumab", "Gefitinib", "Osimertinib", "Metformin", "Adalimumab", "Temozolomide",
+]
+GENES = [
+    "APP", "PSEN1", "SNCA", "LRRK2", "SOD1", "FUS", "TARDBP", "HTT", "EGFR",
+    "KRAS", "TP53", "BRCA1", "PDCD1", "TNF", "IL6", "MGMT",
+]
+
+QUERIES = ["egfr", "lung cancer", "sclerosis", "riluzole", "tofersen", "brca1", "x", "il", "zz"]
+
+
+def synthetic_trials(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        gene = rng.choice(GENES)
+        rows.append({
+            "nct_id": f"NCT{i:08d}",
+            "condition": rng.choice(CONDITIONS),
+            "intervention": f"{rng.choice(INTERVENTIONS)} {rng.randint(1, 400)} mg",
+            "target": f"{gene} protein",
+            "gene": gene,
+            "phase": rng.choice(["Phase 1", "Phase 2", "Phase 3"]),
+        })
+    return pd.DataFrame(rows)
+
+
+def scan(df, q):
+    return df[
+        df.apply(
+            lambda row: any(q in str(row[col]).lower() for col in SEARCH_COLUMNS),
+            axis=1
+        )
+    ]
+
+
+def timed(fn, repeat=20):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn()
+    return out, (time.perf_counter() - t0) / repeat * 1000
+
+
+def run(n: int = 300_000):
+    df = synthetic_trials(n)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "clinical_trials.csv")
+        df.to_csv(path, index=False)
+
+        index = TrialsIndex(path, mirror_path=None)
+        t0 = time.perf_counter()
+        index.refresh()
+        print(f"trials: {len(index)}  build: {time.perf_counter() - t0:.1f} s")
+
+        small = df.head(20_000)
+        for q in QUERIES:
+            hits, ms = timed(lambda: index.search(q, limit=20))
+            candidates = sum(1 for _ in index.candidates(q))
+            word, word_ms = timed(lambda: index.search(q, whole_word=True, limit=20))
+
+            expected = scan(small, q)["nct_id"].tolist()
+            got = [t["nct_id"] for t in index.search(q) if int(t["nct_id"][3:]) < len(small)]
+            assert got == expected, q
+
+            print(
+                f"{q!r:>15}  top-20: {ms:7.3f} ms  whole-word top-20: {word_ms:7.3f} ms  "
+                f"candidates: {candidates:>7}"
+            )
+
+        _, scan_ms = timed(lambda: scan(df, "egfr"), repeat=1)
+        print(f"row scan ('egfr', {n} trials): {scan_ms:,.0f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000)
@@ -0,0 +1,52 @@
+# ============================================================
+# BENCHMARK: GENE MENTION EXTRACTION THROUGHPUT
+# ============================================================
+#
+# Usage (from the project root, with an HGNC .txt file in data/):
+#   python -m benchmarks.gene_extraction [n_abstracts]
+#
+# Synthetic ~1.2 kB abstracts, four gene symbols each, rule-based
+# pass only (no NER).
+
+import sys
+import time
+import random
+
+from tools import gene_extraction as ge
+
+
+FILLER = (
+    "the of and in protein expression patients mice neuronal signaling "
+    "pathway increased decreased cells role disease model analysis"
+).split()
+
+
+def synthetic_abstracts(n: int, symbols: list, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        words = [rng.choice(FILLER) for _ in range(170)]
+        for _ in range(4):
+            words[rng.randrange(len(words))] = rng.choice(symbols)
+        yield " ".join(words).capitalize() + "."
+
+
+def run(n: int = 100_000):
+    t0 = time.perf_counter()
+    matcher = ge.get_gene_matcher()
+    print(f"compile: {time.perf_counter() - t0:.2f} s")
+
+    symbols = sorted(set(matcher.vocabulary.values()))
+
+    t0 = time.perf_counter()
+    mentions = sum(
+        len(doc["mentions"])
+        for doc in ge.iter_gene_mentions(synthetic_abstracts(n, symbols))
+    )
+    elapsed = time.perf_counter() - t0
+
+    print(f"abstracts: {n}  mentions: {mentions}  time: {elapsed:.2f} s")
+    print(f"throughput: {n / elapsed * 60:,.0f} abstracts/min")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,71 @@
+# ============================================================
+# BENCHMARK: PATHWAY ENRICHMENT (SPARSE INCIDENCE, BATCHED)
+# ============================================================
+#
+# Usage (from the project root):
+#   python -m benchmarks.pathway_enrichment [n_pathways] [n_lists]
+#
+# Synthetic gene sets over a 20k-gene universe; checks the first list
+# against scipy's one-sided Fisher exact test and times single and
+# batched queries.
+
+import sys
+import time
+import random
+
+import numpy as np
+from scipy.stats import fisher_exact
+
+from tools.pathway_enrichment import EnrichmentEngine
+
+
+def synthetic_gene_sets(n_pathways: int, n_genes: int = 20000, seed: int = 0):
+    rng = random.Random(seed)
+    genes = [f"G{i}" for i in range(n_genes)]
+    return genes, {
+        f"PATHWAY_{j}": ("synthetic", rng.sample(genes, rng.randint(10, 300)))
+        for j in range(n_pathways)
+    }
+
+
+def run(n_pathways: int = 5000, n_lists: int = 200):
+    genes, gene_sets = synthetic_gene_sets(n_pathways)
+
+    t0 = time.perf_counter()
+    engine = EnrichmentEngine(gene_sets)
+    print(f"pathways: {len(engine)}  genes: {engine.background}  build: {time.perf_counter() - t0:.2f} s")
+
+    rng = random.Random(1)
+    lists = []
+    for _ in range(n_lists):
+        # half random, half drawn from one pathway → some real enrichment
+        members = gene_sets[rng.choice(list(gene_sets))][1]
+        lists.append(rng.sample(genes, 25) + rng.sample(members, min(10, len(members))))
+
+    # Check against Fisher's exact test (one-sided) for the top hits
+    top = engine.enrich(lists[:1], max_results=5)[0]
+    query = set(lists[0])
+    N = engine.background
+    for hit in top:
+        members = set(gene_sets[hit["pathway"]][1])
+        a = len(query & members)
+        table = [[a, len(query) - a], [len(members) - a, N - len(members) - len(query) + a]]
+        _, expected = fisher_exact(table, alternative="greater")
+        assert np.isclose(hit["p_value"], expected, rtol=1e-6), (hit, expected)
+
+    t0 = time.perf_counter()
+    for genes_ in lists[:50]:
+        engine.enrich([genes_])
+    single = (time.perf_counter() - t0) / 50 * 1000
+
+    t0 = time.perf_counter()
+    engine.enrich(lists)
+    batched = (time.perf_counter() - t0) * 1000
+
+    print(f"single list: {single:.2f} ms")
+    print(f"batch of {n_lists}: {batched:.1f} ms ({batched / n_lists:.2f} ms per list)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    run(*args)
@@ -0,0 +1,70 @@
+# ============================================================
+# BENCHMARK: NATIVE PDBQT WRITER vs prepare_ligand4.py
+# ============================================================
+#
+# Usage (from the project root):
+#   python -m benchmarks.pdbqt_conversion [n_repeats]
+#
+# Only the MOL → PDBQT step is timed; every molecule is embedded once
+# up front so both methods convert the same 3D conformers.
+
+import os
+import sys
+import time
+import statistics
+
+from rdkit import Chem
+
+from tools import ligand_preparation as lp
+
+
+SMILES = {
+    "aspirin": "CC(=O)Oc1ccccc1C(=O)O",
+    "caffeine": "Cn1cnc2c1c(=O)n(C)c(=O)n2C",
+    "ibuprofen": "CC(C)Cc1ccc(cc1)C(C)C(=O)O",
+    "donepezil": "COc1cc2CC(CC3CCN(Cc4ccccc4)CC3)C(=O)c2cc1OC",
+    "memantine": "CC12CC3CC(C)(C1)CC(N)(C3)C2",
+    "riluzole": "Nc1nc2ccc(OC(F)(F)F)cc2s1",
+    "levodopa": "N[C@@H](Cc1ccc(O)c(O)c1)C(=O)O",
+    "imatinib": "Cc1ccc(NC(=O)c2ccc(CN3CCN(C)CC3)cc2)cc1Nc1nccc(-c2cccnc2)n1",
+}
+
+
+def _time_method(convert, mols, repeats):
+    times = []
+    for _ in range(repeats):
+        for name, mol in mols.items():
+            out = os.path.join(lp.TMP_DIR, f"bench_{name}.pdbqt")
+            t0 = time.perf_counter()
+            convert(mol, name, out)
+            times.append(time.perf_counter() - t0)
+    return times
+
+
+def run(repeats: int = 3):
+    lp._ensure_dirs()
+    mols = {
+        name: lp._optimize(lp._embed(Chem.MolFromSmiles(smi)))
+        for name, smi in SMILES.items()
+    }
+
+    methods = {"native": lp._convert_native}
+    try:
+        lp.find_prepare_ligand()
+        methods["adt"] = lp._convert_adt
+    except RuntimeError:
+        print("⚠️ prepare_ligand4.py not on PATH — timing native writer only")
+
+    print(f"{'method':<8} {'n':>4} {'mean ms':>9} {'median ms':>10} {'total s':>8}")
+    for label, convert in methods.items():
+        times = _time_method(convert, mols, repeats)
+        print(
+            f"{label:<8} {len(times):>4} "
+            f"{statistics.mean(times) * 1000:>9.2f} "
+            f"{statistics.median(times) * 1000:>10.2f} "
+            f"{sum(times):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,154 @@
+# ============================================================
+# BENCHMARK: IMPORT COST OF THE tools PACKAGE
+# ============================================================
+#
+# Usage (from the project root):
+#   python -m benchmarks.tools_import                  # current tree
+#   python -m benchmarks.tools_import --baseline HEAD~1  # before vs after
+#   python -m benchmarks.tools_import tools.qsar tools.pubmed   # a subset
+#
+# Every tools.* module (plus the tools package itself) is timed in a
+# fresh interpreter with `-X importtime`; the report is the cumulative
+# import time of each module (median). With --baseline, modules whose
+# import got more than --threshold ms slower are flagged.
+
+import os
+import sys
+import shutil
+import tarfile
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+
+def discover_modules(cwd: str):
+    """
+    "tools" and every tools/*.py module in a tree.
+    """
+    tools_dir = os.path.join(cwd, "tools")
+    if not os.path.isdir(tools_dir):
+        return []
+    return ["tools"] + sorted(
+        f"tools.{name[:-3]}"
+        for name in os.listdir(tools_dir)
+        if name.endswith(".py") and name != "__init__.py"
+    )
+
+
+def _import_time_us(module: str, cwd: str):
+    """
+    Cumulative import time (µs) of one module, or None if it fails.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        return None
+
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return None
+
+
+def measure(trees, modules, repeats: int):
+    """
+    {module: median ms} per tree, for the modules present in it (None
+    if the import fails there, e.g. a missing optional dependency).
+
+    Samples alternate between trees, so machine-wide drift affects
+    every tree alike instead of showing up as a regression.
+    """
+    present = [set(discover_modules(cwd)) for cwd in trees]
+    results = [{} for _ in trees]
+    for module in modules:
+        samples = [[] for _ in trees]
+        for _ in range(repeats):
+            for i, cwd in enumerate(trees):
+                if module in present[i]:
+                    samples[i].append(_import_time_us(module, cwd))
+        for i in range(len(trees)):
+            if module not in present[i]:
+                continue
+            ok = [s for s in samples[i] if s is not None]
+            results[i][module] = statistics.median(ok) / 1000 if ok else None
+    return results
+
+
+def _checkout(rev: str, dest: str):
+    archive = subprocess.run(
+        ["git", "archive", "--format=tar", rev],
+        capture_output=True,
+        check=True
+    ).stdout
+
+    path = os.path.join(dest, "tree.tar")
+    with open(path, "wb") as f:
+        f.write(archive)
+    with tarfile.open(path) as tar:
+        tar.extractall(dest)
+    os.remove(path)
+
+
+def _fmt(ms):
+    return f"{ms:>10.1f}" if ms is not None else f"{'-':>10}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", help="git revision to compare against")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="ms slower than the baseline to flag a module")
+    parser.add_argument("modules", nargs="*", help="default: every tools.* module")
+    args = parser.parse_args()
+
+    tmp = None
+    try:
+        if args.baseline:
+            tmp = tempfile.mkdtemp(prefix="tools_import_")
+            _checkout(args.baseline, tmp)
+
+        modules = args.modules or sorted(
+            set(discover_modules(os.getcwd())) | set(discover_modules(tmp) if tmp else [])
+        )
+
+        trees = [os.getcwd()] + ([tmp] if tmp else [])
+        after, before = (measure(trees, modules, args.repeats) + [None])[:2]
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    width = max([len(m) for m in modules] + [6]) + 2
+    header = f"{'module':<{width}}{'now ms':>10}"
+    if before is not None:
+        header += f"{'before ms':>10}{'delta':>10}"
+    print(header)
+
+    regressions = []
+    for module in modules:
+        now = after.get(module)
+        row = f"{module:<{width}}{_fmt(now)}"
+        if before is not None:
+            then = before.get(module)
+            row += _fmt(then)
+            if now is not None and then is not None:
+                delta = now - then
+                row += f"{delta:>+10.1f}"
+                if delta > args.threshold:
+                    row += "  ⚠️"
+                    regressions.append(module)
+        print(row)
+
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} module(s) slower by more than {args.threshold} ms: "
+              + ", ".join(regressions))
+
+
+if __name__ == "__main__":
+    main()
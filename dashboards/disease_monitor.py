@@ -63,12 +63,49 @@ if not run:
 # ============================================================
 # CALL FASTAPI
 # ============================================================
+# Submitted as a background job and polled, so long runs are not cut
+# off by an HTTP timeout; each stage is shown as it completes.
+STAGE_LABELS = {
+    "queued": "Waiting for a worker...",
+    "running": "Fetching PubMed literature...",
+    "literature": "Genes extracted, ranking with GNN...",
+    "ranking": "Building network...",
+}
+
+submitted = requests.post(
+    f"{API_URL}/jobs/disease_monitor",
+    params={"disease": disease},
+    timeout=30
+)
+
+if submitted.status_code != 202:
+    st.error("❌ FastAPI error")
+    st.stop()
+
+job_id = submitted.json()["job_id"]
+status_box = st.empty()
+after = 0
+finished = False
+
 with st.spinner("Running GNN + Retrieval pipeline..."):
-    response = requests.get(
-        f"{API_URL}/disease_monitor",
-        params={"disease": disease},
-        timeout=120
-    )
+    while not finished:
+        poll = requests.get(
+            f"{API_URL}/jobs/{job_id}/events",
+            params={"after": after, "stream": False},
+            timeout=30
+        ).json()
+        finished = poll["finished"]
+
+        for event in poll["events"]:
+            after = event["seq"]
+            if event["stage"] == "literature":
+                genes = event["data"].get("genes", [])
+                status_box.info(f"🧬 {len(genes)} genes extracted, ranking with GNN...")
+            elif event["stage"] in STAGE_LABELS:
+                status_box.info(STAGE_LABELS[event["stage"]])
+
+response = requests.get(f"{API_URL}/jobs/{job_id}/result", timeout=30)
+status_box.empty()
 
 if response.status_code != 200:
     st.error("❌ FastAPI error")
@@ -1,33 +1,22 @@
-import pandas as pd
 import os
 
+from tools.hgnc_index import get_hgnc_index
+
 # Paths
-INPUT_FILE = "data/hgnc_complete_set.txt"
 OUTPUT_FILE = "tools/hgnc_symbols.txt"
 
 # Ensure tools directory exists
 os.makedirs("tools", exist_ok=True)
 
-# Load HGNC TSV safely
-df = pd.read_csv(
-    INPUT_FILE,
-    sep="\t",
-    encoding="utf-8",
-    low_memory=False
-)
-
-# Extract gene symbols
-symbols = (
-    df["symbol"]
-    .dropna()
-    .astype(str)
-    .str.upper()
-    .unique()
-)
+# Compile data/hgnc_complete_set.txt → data/index/hgnc/ (symbols,
+# previous symbols, aliases, HGNC / Entrez / UniProt IDs)
+index = get_hgnc_index(rebuild=True)
 
-# Write one gene per line
-with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-    for gene in symbols:
-        f.write(gene + "\n")
+# Write one gene per line (fallback source when the full TSV is absent)
+symbols = list(index.symbols())
+if os.path.abspath(index.source["path"]) != os.path.abspath(OUTPUT_FILE):
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        for gene in symbols:
+            f.write(gene + "\n")
 
 print(f"✅ Generated {len(symbols)} gene symbols → {OUTPUT_FILE}")
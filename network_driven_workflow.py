@@ -17,7 +17,7 @@ import matplotlib.pyplot as plt
 import networkx as nx
 
 def multi_target_workflow(disease_name, gene_list):
-    # 1. Retrieve real pathways from KEGG
+    # 1. Retrieve real pathways from KEGG (served from the local KEGG cache when fresh)
     pathways = get_pathways_from_kegg(disease_name)
     targets = gene_list
 
@@ -0,0 +1,33 @@
+import tools.chembl_target as chembl
+
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def test_hits_carry_canonical_smiles(monkeypatch):
+    def fake_get(url, params=None, headers=None, timeout=None):
+        if "target/search" in url:
+            return Response({"targets": [
+                {"target_type": "SINGLE PROTEIN", "target_chembl_id": "CHEMBL203"}
+            ]})
+        return Response({"activities": [
+            {"molecule_chembl_id": "CHEMBL939", "standard_type": "IC50",
+             "standard_value": "33", "standard_units": "nM",
+             "canonical_smiles": "COCCOc1cc2ncnc(Nc3cccc(C#C)c3)c2cc1OCCOC"},
+            {"molecule_chembl_id": "CHEMBL2", "standard_type": "Ki",
+             "standard_value": "5", "standard_units": "nM"},
+        ]})
+
+    monkeypatch.setattr(chembl, "http_get", fake_get)
+    hits = chembl.get_chembl_compounds_for_target("EGFR")
+
+    assert hits[0]["smiles"].startswith("COCCOc1")
+    assert hits[1]["smiles"] is None
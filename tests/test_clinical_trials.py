@@ -0,0 +1,96 @@
+import os
+import re
+import random
+
+import pandas as pd
+
+from tools.clinical_trials import TrialsIndex, SEARCH_COLUMNS, CANDIDATE_CHUNK
+
+
+WORDS = [
+    "alzheimer", "disease", "parkinson's", "egfr", "her2", "breast cancer",
+    "lung", "nsclc", "donepezil", "gefitinib", "app", "brca1", "type 2 diabetes",
+    "metformin", "ins", "insulin", "il-6", "tnf", "a", "an",
+]
+
+
+def make_rows(n, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        row = {"nct_id": f"NCT{i:08d}", "phase": rng.choice(["Phase 1", "Phase 2", "Phase 3"])}
+        for column in SEARCH_COLUMNS:
+            if rng.random() < 0.1:
+                row[column] = None
+            else:
+                row[column] = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).title()
+        rows.append(row)
+    return rows
+
+
+def brute_force(rows, query, whole_word=False):
+    q = query.lower()
+    hits = []
+    for row in rows:
+        values = ["" if row.get(c) is None else str(row[c]).lower() for c in SEARCH_COLUMNS]
+        if whole_word:
+            pattern = rf"(?<![a-z0-9]){re.escape(q.strip())}(?![a-z0-9])"
+            matched = any(re.search(pattern, v) for v in values)
+        else:
+            matched = any(q in v for v in values)
+        if matched:
+            hits.append(row["nct_id"])
+    return hits
+
+
+def write_csv(path, rows):
+    pd.DataFrame(rows).to_csv(path, index=False)
+
+
+QUERIES = [
+    "alzheimer", "ALZHEIMER", "disease", "egfr", "her", "er", "a", "an", "ins",
+    "il-6", "-", "'s", "2 d", "cancer lung", "breast cancer", "zzz", "brca1",
+    "s disease", "e", " ",
+]
+
+
+def test_search_matches_a_substring_scan(tmp_path):
+    rows = make_rows(3 * CANDIDATE_CHUNK)
+    path = str(tmp_path / "trials.csv")
+    write_csv(path, rows)
+    index = TrialsIndex(path=path, mirror_path=None)
+
+    for query in QUERIES:
+        expected = brute_force(rows, query)
+        got = [t["nct_id"] for t in index.search(query)]
+        assert got == expected, query
+
+        for limit in (1, 5):
+            got = [t["nct_id"] for t in index.search(query, limit=limit)]
+            assert got == expected[:limit], (query, limit)
+
+
+def test_whole_word_search_matches_a_regex_scan(tmp_path):
+    rows = make_rows(500)
+    path = str(tmp_path / "trials.csv")
+    write_csv(path, rows)
+    index = TrialsIndex(path=path, mirror_path=None)
+
+    for query in ["ins", "insulin", "app", "a", "il-6", "breast cancer", "type 2", "disease"]:
+        got = [t["nct_id"] for t in index.search(query, whole_word=True)]
+        assert got == brute_force(rows, query, whole_word=True), query
+
+
+def test_reloads_when_the_csv_changes(tmp_path):
+    path = str(tmp_path / "trials.csv")
+    write_csv(path, make_rows(50, seed=1))
+    index = TrialsIndex(path=path, mirror_path=None)
+    index.search("egfr")
+
+    rows = make_rows(80, seed=2)
+    write_csv(path, rows)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert [t["nct_id"] for t in index.search("egfr")] == brute_force(rows, "egfr")
+    assert len(index) == 80
@@ -0,0 +1,75 @@
+import os
+import json
+
+from tools.clinical_trials import TrialsIndex
+from tools.clinical_trials_mirror import ClinicalTrialsMirror, FixtureSource
+
+
+FIXTURE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "fixtures", "ctgov_studies.json"
+)
+
+
+def mirror_at(tmp_path, fixture=FIXTURE):
+    return ClinicalTrialsMirror(str(tmp_path / "trials.sqlite"), source=FixtureSource(fixture))
+
+
+def test_sync_from_fixture(tmp_path):
+    mirror = mirror_at(tmp_path)
+    summary = mirror.sync(conditions=["Alzheimer", "Amyotrophic"], genes=["LRRK2"])
+
+    assert [r["studies"] for r in summary["terms"]] == [2, 2, 1]
+    assert all(r["since"] is None for r in summary["terms"])
+    assert summary["trials"] == 5
+
+    records = {r["nct_id"]: r for r in mirror.to_records()}
+    assert records["NCT90000003"]["phase"] == "Phase 2, Phase 3"
+    assert records["NCT90000006"]["phase"] == "Early Phase 1"
+    assert records["NCT90000001"]["intervention"] == "Tofersen; Placebo"
+    assert records["NCT90000004"]["gene"] == "LRRK2"
+    assert records["NCT90000001"]["gene"] == ""
+    assert mirror.term_state("Alzheimer")["last_update"] == "2025-09-01"
+
+
+def test_incremental_resync_adds_nothing_new(tmp_path):
+    mirror = mirror_at(tmp_path)
+    mirror.sync(conditions=["Alzheimer"], genes=[])
+
+    again = mirror.sync(conditions=["Alzheimer"], genes=[])["terms"][0]
+
+    assert again["since"] == "2025-09-01"
+    assert again["studies"] == 1            # only the boundary study, re-upserted
+    assert len(mirror) == 2
+
+
+def test_incremental_sync_picks_up_updated_studies(tmp_path):
+    mirror = mirror_at(tmp_path)
+    mirror.sync(conditions=["Alzheimer"], genes=[])
+
+    with open(FIXTURE, encoding="utf-8") as f:
+        studies = json.load(f)["studies"]
+    updated = [s for s in studies if s["protocolSection"]["identificationModule"]["nctId"] == "NCT90000003"]
+    status = updated[0]["protocolSection"]["statusModule"]
+    status["overallStatus"] = "COMPLETED"
+    status["lastUpdatePostDateStruct"]["date"] = "2026-01-01"
+    newer = tmp_path / "newer.json"
+    newer.write_text(json.dumps({"studies": studies}), encoding="utf-8")
+
+    mirror.source = FixtureSource(str(newer))
+    result = mirror.sync(conditions=["Alzheimer"], genes=[])["terms"][0]
+
+    assert result["since"] == "2025-09-01"
+    records = {r["nct_id"]: r for r in mirror.to_records()}
+    assert records["NCT90000003"]["status"] == "COMPLETED"
+    assert mirror.term_state("Alzheimer")["last_update"] == "2026-01-01"
+
+
+def test_trials_index_searches_the_mirror(tmp_path):
+    mirror = mirror_at(tmp_path)
+    index = TrialsIndex(path=str(tmp_path / "missing.csv"), mirror_path=mirror.path)
+    assert index.search("lrrk2") == []
+
+    mirror.sync(conditions=["Parkinson"], genes=["LRRK2"])
+
+    hits = index.search("lrrk2")
+    assert [h["nct_id"] for h in hits] == ["NCT90000004"]
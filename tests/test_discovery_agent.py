@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+import agents.discovery_agent as discovery
+from agents.discovery_agent import DiscoveryAgent
+from tools.qsar import QSARTool, train_qsar_model
+
+
+HITS = [
+    {"name": "CHEMBL1", "smiles": "CCO", "activity_value": 10},
+    {"name": "CHEMBL2", "smiles": "CC(=O)Oc1ccccc1C(=O)O", "activity_value": 10},
+    {"name": "CHEMBL3", "smiles": "CN1CCC[C@H]1c1cccnc1", "activity_value": 10},
+    {"name": "CHEMBL4", "activity_value": 10},          # no SMILES
+]
+
+
+def agent_with(qsar, monkeypatch):
+    monkeypatch.setattr(discovery, "predict_admet", lambda name: 0.5)
+    agent = DiscoveryAgent.__new__(DiscoveryAgent)
+    agent.qsar = qsar
+    return agent
+
+
+def test_hits_are_scored_from_their_own_descriptors(tmp_path, monkeypatch):
+    agent = agent_with(QSARTool(model_path=str(tmp_path / "missing.joblib")), monkeypatch)
+    scores = [c["qsar_score"] for c in agent._score_compounds("EGFR", HITS)]
+
+    assert len(set(scores[:3])) == 3
+    assert scores[3] == 0.9                 # defaults only without SMILES
+
+
+def test_trained_model_sees_per_compound_descriptors(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    mw = rng.uniform(40, 400, 40)
+    df = pd.DataFrame({"MW": mw, "LogP": rng.uniform(-1, 5, 40), "pIC50": mw / 100})
+    csv = tmp_path / "train.csv"
+    df.to_csv(csv, index=False)
+    model_path = str(tmp_path / "qsar.joblib")
+    train_qsar_model(str(csv), "pIC50", model_path=model_path)
+
+    qsar = QSARTool(model_path=model_path)
+    agent = agent_with(qsar, monkeypatch)
+    scores = [c["qsar_score"] for c in agent._score_compounds("EGFR", HITS[:3])]
+
+    assert qsar.last_stats["source"] == "model"
+    assert qsar.last_stats["model_rows"] == 3
+    assert scores[0] < scores[1]            # ethanol lighter than aspirin
+
+
+class FakeAlphaFold:
+    def predict(self, gene):
+        if gene == "PSEN1":
+            raise ConnectionError("AlphaFold down")
+        if gene == "BACE1":
+            import time
+            time.sleep(2)
+        return {"found": True, "gene": gene}
+
+
+class FakePubMed:
+    def search(self, query):
+        return [{"title": query}]
+
+
+def concurrent_agent(monkeypatch):
+    monkeypatch.setattr(discovery, "get_chembl_compounds_for_target", lambda gene: [])
+    agent = DiscoveryAgent.__new__(DiscoveryAgent)
+    agent.pubmed = FakePubMed()
+    agent.alphafold = FakeAlphaFold()
+    agent._assemble = lambda query, literature, targets, structures, hits: {
+        "structures": structures
+    }
+    return agent
+
+
+def test_failed_and_timed_out_sources_are_reported_separately(monkeypatch):
+    agent = concurrent_agent(monkeypatch)
+    result = agent.run_concurrent("alzheimer", deadline=0.5)
+
+    assert result["partial"] is True
+    assert result["failed"] == ["alphafold:PSEN1"]
+    assert result["timed_out"] == ["alphafold:BACE1"]
+    structures = result["structures"]
+    assert structures["PSEN1"]["message"] == "AlphaFold unavailable (request failed)."
+    assert structures["BACE1"]["message"] == "AlphaFold unavailable (deadline exceeded)."
+    assert structures["APP"]["found"] is True
+
+
+def test_a_failed_source_alone_marks_the_result_partial(monkeypatch):
+    agent = concurrent_agent(monkeypatch)
+    result = agent.run_concurrent("PSEN1", deadline=5)
+
+    assert result["partial"] is True
+    assert result["failed"] == ["alphafold:PSEN1"]
+    assert result["timed_out"] == []
@@ -0,0 +1,91 @@
+import pytest
+
+import tools.pubmed_live as pubmed_live
+import tools.pubmed_store as pubmed_store
+import tools.disease_monitor_core as monitor
+from tools.pubmed_store import PubMedStore
+
+
+class FakePubMed:
+    """
+    esearch / efetch over an in-memory list of (pmid, edat, abstract).
+    Newest records first, like PubMed's default sort.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.esearch_calls = []
+
+    def add(self, pmid, edat, abstract):
+        self.records.insert(0, (str(pmid), edat, abstract))
+
+    def esearch(self, query, max_results=20, mindate=None, retstart=0):
+        self.esearch_calls.append((mindate, retstart, max_results))
+        ids = [p for p, edat, _ in self.records if not mindate or edat >= mindate]
+        return ids[retstart:retstart + max_results]
+
+    def efetch(self, pmids):
+        wanted = set(pmids)
+        return [
+            {"pmid": p, "title": "", "abstract": text, "year": 2020}
+            for p, _, text in self.records if p in wanted
+        ]
+
+
+@pytest.fixture
+def pubmed(tmp_path, monkeypatch):
+    fake = FakePubMed()
+    monkeypatch.setattr(pubmed_live, "esearch_pmids", fake.esearch)
+    monkeypatch.setattr(pubmed_live, "efetch_articles", fake.efetch)
+    monkeypatch.setattr(pubmed_store, "_STORE", PubMedStore(str(tmp_path / "pubmed.sqlite"), offline=False))
+    monkeypatch.setattr(pubmed_store, "ESEARCH_PAGE_SIZE", 10)
+    monkeypatch.setattr(monitor, "MONITOR_STATE_DIR", str(tmp_path / "state"))
+    return fake
+
+
+def _run(monkeypatch, today, **kwargs):
+    class Clock(monitor.datetime):
+        @classmethod
+        def utcnow(cls):
+            return monitor.datetime.strptime(today, "%Y/%m/%d")
+
+    monkeypatch.setattr(monitor, "datetime", Clock)
+    return monitor.run_disease_monitor("Test disease", **kwargs)
+
+
+def test_incremental_run_pages_through_every_new_record(pubmed, monkeypatch):
+    for i in range(5):
+        pubmed.add(i, "2024/01/01", "APP was studied.")
+    _run(monkeypatch, "2024/01/01", incremental=True)
+
+    # 35 new records (40 listed since the last run): several esearch pages
+    for i in range(100, 135):
+        pubmed.add(i, "2024/02/01", "SOD1 was studied.")
+    _run(monkeypatch, "2024/02/02", incremental=True)
+
+    state = monitor.load_monitor_state("Test disease")
+    assert len(state["pmids"]) == 40
+    assert {m[0] for m in state["mentions"]} == {"APP", "SOD1"}
+    assert state["last_run"] == "2024/02/02"
+    assert [c[1] for c in pubmed.esearch_calls if c[0] == "2024/01/01"] == [0, 10, 20, 30, 40]
+
+
+def test_non_incremental_run_keeps_incremental_state(pubmed, monkeypatch):
+    for i in range(30):
+        pubmed.add(i, "2024/01/01", "APP was studied.")
+    _run(monkeypatch, "2024/01/01", incremental=True)
+    before = monitor.load_monitor_state("Test disease")
+
+    _run(monkeypatch, "2024/01/05", incremental=False)
+
+    assert monitor.load_monitor_state("Test disease") == before
+
+
+def test_offline_keeps_the_watermark(pubmed, monkeypatch):
+    pubmed.add(1, "2024/01/01", "APP was studied.")
+    _run(monkeypatch, "2024/01/01", incremental=True)
+
+    pubmed_store._STORE.offline = True
+    _run(monkeypatch, "2024/03/01", incremental=True)
+
+    assert monitor.load_monitor_state("Test disease")["last_run"] == "2024/01/01"
@@ -0,0 +1,61 @@
+import os
+import subprocess
+
+import tools.docking_runner as runner
+from tools.docking_cache import DockingCache
+
+
+def test_overwrite_does_not_grow_size_estimate(tmp_path):
+    cache = DockingCache(cache_dir=str(tmp_path), max_bytes=10_000)
+    cache.put("ab" * 32, -7.1, poses="x" * 500)
+    for _ in range(50):
+        cache.put("ab" * 32, -7.1, poses="x" * 500)
+
+    on_disk = cache.stats()["size_bytes"]
+    assert cache._size == on_disk
+    assert cache.evictions == 0
+    assert cache.get("ab" * 32)["affinity"] == -7.1
+
+
+def test_evicts_least_recently_used_past_the_bound(tmp_path):
+    cache = DockingCache(cache_dir=str(tmp_path), max_bytes=3_000)
+    keys = [f"{i:02d}" * 32 for i in range(10)]
+    for key in keys:
+        cache.put(key, -6.0, poses="x" * 500)
+
+    assert cache.evictions > 0
+    assert cache.stats()["size_bytes"] <= 3_000
+    assert cache.get(keys[-1]) is not None
+    assert cache.get(keys[0]) is None
+
+
+def test_vina_output_is_not_left_on_disk(tmp_path, monkeypatch):
+    (tmp_path / "af").mkdir()
+    (tmp_path / "lig").mkdir()
+    (tmp_path / "af" / "EGFR.pdb").write_text("ATOM\n")
+    (tmp_path / "lig" / "erlotinib.pdbqt").write_text("ROOT\n")
+    monkeypatch.setattr(runner, "ALPHAFOLD_DIR", str(tmp_path / "af"))
+    monkeypatch.setattr(runner, "LIGAND_DIR", str(tmp_path / "lig"))
+    monkeypatch.setattr(runner, "DOCKING_CACHE", DockingCache(cache_dir=str(tmp_path / "cache")))
+
+    outputs = []
+
+    def fake_vina(cmd, **kwargs):
+        out = cmd[cmd.index("--out") + 1]
+        outputs.append(out)
+        with open(out, "w") as f:
+            f.write("MODEL 1\nENDMDL\n")
+        return subprocess.CompletedProcess(cmd, 0, stdout="   1   -8.2   0.0   0.0\n", stderr="")
+
+    monkeypatch.setattr(runner.subprocess, "run", fake_vina)
+    box = dict(runner.DEFAULT_BOX)
+
+    first = runner.dock_vina("EGFR", "erlotinib", box=box)
+    assert first["affinity"] == -8.2
+    assert first["poses"] == "MODEL 1\nENDMDL\n"
+    assert not os.path.exists(outputs[0])
+    assert not os.path.exists(os.path.dirname(outputs[0]))
+
+    again = runner.dock_vina("EGFR", "erlotinib", box=box)
+    assert again["cached"] and again["poses"] == first["poses"]
+    assert len(outputs) == 1
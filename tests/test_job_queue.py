@@ -0,0 +1,168 @@
+import time
+import asyncio
+import inspect
+import sqlite3
+import threading
+
+import pytest
+
+import tools.job_queue as jq
+from tools.job_queue import JobQueue
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(jq, "JOB_POLL_INTERVAL", 0.02)
+
+
+def blocking_handler(release):
+    def handler(progress, n=3):
+        for i in range(n):
+            progress("step", i=i)
+        release.wait(5)
+        return {"n": n}
+    return handler
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def collect(stream):
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def test_new_worker_leaves_live_workers_jobs_alone(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    release = threading.Event()
+
+    a = JobQueue(path=path)
+    a.register("slow", blocking_handler(release))
+    job = a.submit("slow")
+    wait_for(lambda: a.status(job["job_id"])["status"] == "running")
+
+    b = JobQueue(path=path)              # another uvicorn worker starting up
+    assert b.status(job["job_id"])["status"] == "running"
+
+    release.set()
+    wait_for(lambda: b.status(job["job_id"])["status"] == "done")
+
+
+def test_jobs_with_an_expired_lease_are_failed(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    JobQueue(path=path)
+    stale = time.time() - jq.JOB_LEASE - 1
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "INSERT INTO jobs(id, kind, params, status, created_at, updated_at, events, "
+        "owner, heartbeat) VALUES ('dead', 'slow', '{}', 'running', ?, ?, '[]', 'gone', ?)",
+        (stale, stale, stale)
+    )
+    conn.commit()
+    conn.close()
+
+    q = JobQueue(path=path)
+    job = q.status("dead")
+    assert job["status"] == "failed"
+    assert "Interrupted" in job["error"]
+
+
+def test_stream_is_async_and_ends_after_final_event(tmp_path):
+    q = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    release = threading.Event()
+    q.register("slow", blocking_handler(release))
+    job = q.submit("slow", n=2)
+
+    assert inspect.isasyncgenfunction(JobQueue.stream)
+    threading.Timer(0.2, release.set).start()
+    chunks = collect(q.stream(job["job_id"], heartbeat=0.05))
+
+    stages = [c.split("\n")[1] for c in chunks if c.startswith("id:")]
+    assert stages == [
+        "event: queued", "event: running", "event: step", "event: step", "event: done"
+    ]
+    assert not q._waiters
+
+
+def test_stream_follows_a_job_run_by_another_worker(tmp_path):
+    path = str(tmp_path / "jobs.sqlite")
+    release = threading.Event()
+    a = JobQueue(path=path)
+    a.register("slow", blocking_handler(release))
+    b = JobQueue(path=path)
+
+    job = a.submit("slow", n=1)
+    threading.Timer(0.2, release.set).start()
+    chunks = collect(b.stream(job["job_id"]))
+
+    assert chunks[-1].split("\n")[1] == "event: done"
+
+
+def test_stream_reports_unknown_job(tmp_path):
+    q = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    assert collect(q.stream("missing")) == [
+        "event: error\ndata: {\"error\": \"Unknown job\"}\n\n"
+    ]
+
+
+def test_close_marks_queued_and_running_jobs_interrupted(tmp_path):
+    q = JobQueue(path=str(tmp_path / "jobs.sqlite"), max_workers=1)
+    release = threading.Event()
+    q.register("slow", blocking_handler(release))
+    running = q.submit("slow")
+    queued = q.submit("slow")
+    wait_for(lambda: q.status(running["job_id"])["status"] == "running")
+
+    q.close(grace=0.1)
+    release.set()
+
+    fresh = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    for job in (running, queued):
+        status = fresh.status(job["job_id"])
+        assert status["status"] in ("failed", "done")
+        if status["status"] == "failed":
+            assert status["error"] == "Interrupted by server shutdown."
+    assert fresh.status(queued["job_id"])["status"] == "failed"
+    assert q._stop.is_set()
+    with pytest.raises(RuntimeError):
+        q.submit("slow")
+
+
+def test_close_waits_for_running_jobs_within_the_grace_period(tmp_path):
+    q = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    release = threading.Event()
+    q.register("slow", blocking_handler(release))
+    job = q.submit("slow")
+    wait_for(lambda: q.status(job["job_id"])["status"] == "running")
+
+    threading.Timer(0.1, release.set).start()
+    q.close(grace=5)
+
+    assert q.status(job["job_id"])["status"] == "done"
+
+
+def test_app_builds_the_queue_on_startup_only(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import app.example_main as main
+
+    monkeypatch.delenv("MONGODB_URI", raising=False)
+    monkeypatch.setattr(main, "MONGODB_URI", None)
+    assert main.job_queue is None
+
+    queue = JobQueue(path=str(tmp_path / "jobs.sqlite"))
+    monkeypatch.setattr(jq, "_QUEUE", queue)
+
+    with TestClient(main.app) as client:
+        assert main.job_queue is queue
+        assert set(main.JOB_HANDLERS) <= set(queue._handlers)
+        assert client.get("/admin/job_stats").json()["queued"] == 0
+
+    assert main.job_queue is None
+    assert jq._QUEUE is None
+    assert queue._stop.is_set()
+    assert TestClient(main.app).get("/admin/job_stats").status_code == 503
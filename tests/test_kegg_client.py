@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+import tools.kegg_client as kegg
+from tools.kegg_client import KEGGClient, DISEASE_PATHWAYS, PATHWAY_GENES
+
+
+class Response:
+    def __init__(self, text="", status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+
+class FakeKEGG:
+    """
+    Answers find/disease and link/* paths from small tables.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.down = False
+        self.diseases = {"alzheimer disease": ["ds:H00056"]}
+        self.links = {
+            "ds:H00056": ["path:hsa05010", "path:map05022"],
+            "ds:H00057": ["path:hsa05012"],
+            "path:hsa05010": ["hsa:351", "hsa:348"],
+            "path:hsa05022": ["hsa:351"],
+        }
+
+    def __call__(self, url, timeout=None):
+        self.calls.append(url)
+        if self.down:
+            raise ConnectionError("KEGG unreachable")
+
+        path = url[len(kegg.KEGG_REST) + 1:]
+        if path.startswith("find/disease/"):
+            name = path[len("find/disease/"):].replace("%20", " ")
+            ids = self.diseases.get(name, [])
+            return Response("\n".join(f"{i}\tname" for i in ids)) if ids else Response(status_code=404)
+
+        _, _, keys = path.split("/", 2)
+        lines = [f"{k}\t{t}" for k in keys.split("+") for t in self.links.get(k, [])]
+        return Response("\n".join(lines)) if lines else Response(status_code=404)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    fake = FakeKEGG()
+    monkeypatch.setattr(kegg, "http_get", fake)
+    return fake
+
+
+def test_repeat_lookup_is_served_from_the_cache(tmp_path, fake):
+    client = KEGGClient(path=str(tmp_path / "kegg.sqlite"))
+
+    first = client.pathways_for_disease("Alzheimer  Disease")
+    calls = len(fake.calls)
+    assert first == ["hsa05010", "map05022"]
+    assert calls == 2
+
+    assert client.pathways_for_disease("alzheimer disease") == first
+    assert len(fake.calls) == calls
+
+    # A new client on the same file reuses the persisted entries
+    again = KEGGClient(path=str(tmp_path / "kegg.sqlite"))
+    assert again.pathways_for_disease("alzheimer disease") == first
+    assert len(fake.calls) == calls
+
+
+def test_link_queries_are_batched(tmp_path, fake):
+    client = KEGGClient(path=str(tmp_path / "kegg.sqlite"), max_workers=1)
+    ids = [f"ds:H{i:05d}" for i in range(40, 63)]
+
+    links = client.disease_pathways(ids)
+
+    assert len(fake.calls) == 3                      # 10 + 10 + 3
+    assert all(u.count("+") <= kegg.KEGG_BATCH - 1 for u in fake.calls)
+    assert links["ds:H00056"] == ["hsa05010", "map05022"]
+    assert links["ds:H00040"] == []                  # no links, still cached
+    client.disease_pathways(ids)
+    assert len(fake.calls) == 3
+
+
+def test_reference_maps_resolve_to_organism_genes(tmp_path, fake):
+    client = KEGGClient(path=str(tmp_path / "kegg.sqlite"))
+    genes = client.pathway_genes(["hsa05010", "map05022"])
+    assert genes == {"hsa05010": ["hsa:348", "hsa:351"], "map05022": ["hsa:351"]}
+
+
+def test_stale_entries_are_used_when_kegg_is_down(tmp_path, fake):
+    client = KEGGClient(path=str(tmp_path / "kegg.sqlite"), ttl=3600)
+    client.disease_pathways(["ds:H00057"])
+
+    with client._write_lock:
+        conn = client._conn()
+        conn.execute("UPDATE kegg_cache SET fetched_at = ?", (time.time() - 7200,))
+        conn.commit()
+    assert client._cached(DISEASE_PATHWAYS, ["ds:H00057"]) == {}
+
+    fake.down = True
+    assert client.disease_pathways(["ds:H00057"]) == {"ds:H00057": ["hsa05012"]}
+    assert client._cached(PATHWAY_GENES, ["hsa05010"]) == {}
@@ -0,0 +1,45 @@
+import pytest
+
+import tools.ligand_preparation as lp
+
+
+class RecordingPool:
+    created = []
+
+    def __init__(self, max_workers=None):
+        RecordingPool.created.append(max_workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, jobs, chunksize=1):
+        return map(fn, jobs)
+
+
+@pytest.fixture
+def fake_prepare(monkeypatch):
+    RecordingPool.created = []
+    monkeypatch.setattr(lp, "ProcessPoolExecutor", RecordingPool)
+    monkeypatch.setattr(
+        lp, "smiles_to_pdbqt",
+        lambda smiles, name, force=False, method=None: {"status": "ok", "timings": {"embed": 0.1}}
+    )
+
+
+def test_small_batches_run_in_process(fake_prepare):
+    out = lp.parallel_prepare_ligands({"ethanol": "CCO", "phenol": "c1ccccc1O"}, max_workers=16)
+
+    assert RecordingPool.created == []
+    assert set(out["results"]) == {"ethanol", "phenol"}
+    assert out["stage_totals"]["embed"] == 0.2
+
+
+def test_pool_never_has_more_workers_than_ligands(fake_prepare):
+    smiles = {f"alkane_{n}": "C" * n for n in range(1, lp.PARALLEL_THRESHOLD + 2)}
+    out = lp.parallel_prepare_ligands(smiles, max_workers=64)
+
+    assert RecordingPool.created == [len(smiles)]
+    assert list(out["results"]) == list(smiles)
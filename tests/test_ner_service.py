@@ -0,0 +1,78 @@
+import sys
+import types
+import contextlib
+import threading
+
+import pytest
+
+from tools.ner_service import NERService
+
+
+class FlakyPipeline:
+    """
+    Stands in for a HuggingFace NER pipeline; raises on the first call.
+    """
+
+    tokenizer = None
+
+    def __init__(self, fail_calls=1):
+        self.fail_calls = fail_calls
+        self.calls = 0
+
+    def __call__(self, batch, batch_size=None):
+        self.calls += 1
+        if self.calls <= self.fail_calls:
+            raise RuntimeError("CUDA out of memory")
+        return [
+            [{"entity_group": "Gene", "word": w, "start": 0, "end": len(w), "score": 0.9}
+             for w in text.split() if w.isupper()]
+            for text in batch
+        ]
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    # Only inference_mode() is used from torch
+    monkeypatch.setitem(
+        sys.modules, "torch",
+        types.SimpleNamespace(inference_mode=contextlib.nullcontext)
+    )
+    svc = NERService(model_name="fake", cache_dir=str(tmp_path / "ner"))
+    svc._pipeline = FlakyPipeline()
+    return svc
+
+
+def test_failed_batch_is_not_cached(service):
+    texts = ["APP cleaves BACE1", "no genes here"]
+
+    first = service.analyze(texts)
+    assert first == [[], []]
+    assert service.stats()["failures"] == 2
+
+    second = service.analyze(texts)
+    assert [e["word"] for e in second[0]] == ["APP", "BACE1"]
+    assert service._pipeline.calls == 2
+
+    # Now cached: no further pipeline calls
+    third = service.analyze(texts)
+    assert third == second
+    assert service._pipeline.calls == 2
+    assert service.stats()["hits"] == 2
+
+
+def test_counters_are_consistent_across_threads(service):
+    service._pipeline.fail_calls = 0
+    service.analyze(["SOD1 variant"])
+
+    threads = [
+        threading.Thread(target=lambda: [service.analyze(["SOD1 variant"]) for _ in range(50)])
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = service.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 400
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from scipy.stats import fisher_exact, hypergeom
+
+import tools.pathway_enrichment as pathway_enrichment
+from tools.pathway_enrichment import (
+    EnrichmentEngine, bh_fdr, hypergeom_sf, read_gmt, run_pathway_enrichment_batch,
+)
+
+RESULT_KEYS = {"pathway", "p_value", "fdr", "overlap", "size", "genes", "source"}
+
+
+def test_hypergeom_sf_matches_scipy():
+    rng = np.random.default_rng(0)
+    N = 20000
+    K = rng.integers(5, 500, 200)
+    n = rng.integers(1, 300, 200)
+    k = np.minimum(rng.integers(1, 20, 200), np.minimum(K, n))
+
+    expected = hypergeom.sf(k - 1, N, K, n)
+    np.testing.assert_allclose(hypergeom_sf(k, N, K, n), expected, rtol=1e-8, atol=1e-300)
+
+
+def test_enrichment_matches_fisher_exact():
+    genes = [f"G{i}" for i in range(2000)]
+    gene_sets = {
+        "target": ("test", genes[:40]),
+        "other": ("test", genes[100:400]),
+        "unrelated": ("test", genes[1000:1050]),
+    }
+    engine = EnrichmentEngine(gene_sets)
+    query = genes[:12] + genes[150:153] + genes[1500:1510]
+
+    hits = engine.enrich([query])[0]
+    assert hits[0]["pathway"] == "target"
+
+    N = engine.background
+    for hit in hits:
+        members = set(gene_sets[hit["pathway"]][1])
+        a = len(members & set(query))
+        table = [[a, len(query) - a], [len(members) - a, N - len(members) - len(query) + a]]
+        _, p = fisher_exact(table, alternative="greater")
+        assert hit["p_value"] == pytest.approx(p, rel=1e-8)
+        assert hit["overlap"] == a and hit["size"] == len(members)
+
+
+def test_bh_fdr():
+    p = np.array([0.01, 0.04, 0.03, 0.2])
+    np.testing.assert_allclose(bh_fdr(p), [0.04, 0.16 / 3, 0.16 / 3, 0.2])
+
+    rows = np.random.default_rng(1).uniform(size=(3, 50)) ** 3
+    expected = [
+        [min(1.0, min(sorted(r)[j] * 50 / (j + 1) for j in range(i, 50))) for i in range(50)]
+        for r in rows
+    ]
+    q = bh_fdr(rows)
+    for r, q_row, e in zip(rows, q, expected):
+        np.testing.assert_allclose(q_row[np.argsort(r)], e)
+
+
+def test_read_gmt(tmp_path):
+    path = tmp_path / "Reactome.gmt"
+    path.write_text("Pathway A\tdesc\tapp\tPSEN1\n\nbad line\n")
+    assert read_gmt(str(path)) == {"Pathway A": ("Reactome", ["APP", "PSEN1"])}
+
+
+def test_fallback_results_share_the_schema(monkeypatch):
+    # No GMT files installed → curated sets
+    monkeypatch.setattr(pathway_enrichment, "gmt_files", lambda directory=None: [])
+
+    enriched, fallback, empty = run_pathway_enrichment_batch([["APP", "BACE1"], ["NOTAGENE"], []])
+
+    assert enriched and all(set(r) == RESULT_KEYS for r in enriched)
+    assert [set(r) for r in fallback] == [RESULT_KEYS]
+    assert empty == []
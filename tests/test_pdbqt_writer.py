@@ -0,0 +1,58 @@
+import pytest
+from rdkit import Chem
+from rdkit.Chem import AllChem
+
+import tools.ligand_preparation as lp
+from tools.pdbqt_writer import ligand_to_pdbqt
+
+
+def embedded(smiles):
+    mol = Chem.AddHs(Chem.MolFromSmiles(smiles))
+    AllChem.EmbedMolecule(mol, randomSeed=7)
+    return mol
+
+
+def heavy_atoms(pdbqt):
+    return sum(
+        1 for line in pdbqt.splitlines()
+        if line.startswith("HETATM") and line.split()[-1] not in ("H", "HD")
+    )
+
+
+def test_single_component_keeps_every_heavy_atom():
+    text = ligand_to_pdbqt(embedded("CCCCCCCCCC"))
+    assert heavy_atoms(text) == 10
+    assert "TORSDOF 7" in text
+
+
+def test_multi_component_input_is_rejected():
+    with pytest.raises(ValueError, match="2 disconnected fragments"):
+        ligand_to_pdbqt(embedded("CCCCCCCCCC.c1ccccc1"))
+
+
+@pytest.fixture
+def ligand_dirs(tmp_path, monkeypatch):
+    for name in ("LIGAND_DIR", "TMP_DIR", "CONFORMER_DIR"):
+        monkeypatch.setattr(lp, name, str(tmp_path / name.lower()))
+    lp._ensure_dirs.cache_clear()
+    yield tmp_path
+    lp._ensure_dirs.cache_clear()
+
+
+def test_preparation_keeps_the_largest_fragment(ligand_dirs):
+    result = lp.smiles_to_pdbqt("CCCCCCCCCC.c1ccccc1", "mixture", method="native")
+
+    assert result["status"] == "ok"
+    assert "largest of 2 fragments" in result["message"]
+    with open(result["path"]) as f:
+        text = f.read()
+    assert heavy_atoms(text) == 10             # decane, not benzene
+    assert " A " not in text                   # no aromatic carbons
+
+
+def test_counterion_is_dropped(ligand_dirs):
+    result = lp.smiles_to_pdbqt("CC(=O)Oc1ccccc1C(=O)[O-].[Na+]", "aspirin_na", method="native")
+
+    assert result["status"] == "ok"
+    with open(result["path"]) as f:
+        assert heavy_atoms(f.read()) == 13     # aspirin anion, no Na+
@@ -0,0 +1,40 @@
+import time
+import threading
+
+import tools.pocket_detection as pocket_detection
+
+
+def test_receptors_are_detected_in_parallel_and_once_each(tmp_path, monkeypatch):
+    monkeypatch.setattr(pocket_detection, "POCKET_CACHE_FILE", str(tmp_path / "boxes.json"))
+    monkeypatch.setattr(pocket_detection, "_BOX_CACHE", None)
+
+    calls = []
+
+    def slow_detect(path):
+        calls.append(path)
+        time.sleep(0.3)
+        return {"center_x": 1.0}
+
+    monkeypatch.setattr(pocket_detection, "detect_pocket_box", slow_detect)
+
+    paths = []
+    for name in ("A", "B", "C"):
+        path = tmp_path / f"{name}.pdb"
+        path.write_text(f"ATOM {name}\n")
+        paths.append(str(path))
+
+    threads = [
+        threading.Thread(target=pocket_detection.get_pocket_box, args=(p,))
+        for p in paths + paths
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    assert sorted(calls) == sorted(paths)
+    assert elapsed < 0.8
+    assert pocket_detection.get_pocket_box(paths[0]) == {"center_x": 1.0}
+    assert len(calls) == 3
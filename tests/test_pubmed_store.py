@@ -0,0 +1,73 @@
+import pytest
+
+import tools.pubmed_live as pubmed_live
+import tools.pubmed_store as pubmed_store
+from tools.pubmed_store import PubMedStore
+from tools.rag_explainer import explain
+
+ABSTRACT = "{} is discussed at length in this abstract, which is long enough to quote."
+
+
+class FakeNCBI:
+    def __init__(self, listing):
+        self.listing = listing          # esearch order
+        self.added = {}                 # mindate → newer PMIDs
+
+    def esearch(self, query, max_results=20, mindate=None, retstart=0):
+        ids = self.added.get(mindate, []) if mindate else self.listing
+        return ids[retstart:retstart + max_results]
+
+    def efetch(self, pmids):
+        return [
+            {"pmid": p, "title": "", "abstract": ABSTRACT.format(f"Gene{p}"), "year": 2021}
+            for p in pmids
+        ]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = PubMedStore(str(tmp_path / "pubmed.sqlite"), offline=False)
+    monkeypatch.setattr(pubmed_store, "_STORE", store)
+    return store
+
+
+@pytest.fixture
+def ncbi(monkeypatch):
+    fake = FakeNCBI(["30", "10", "20"])
+    monkeypatch.setattr(pubmed_live, "esearch_pmids", fake.esearch)
+    monkeypatch.setattr(pubmed_live, "efetch_articles", fake.efetch)
+    return fake
+
+
+def test_local_pmids_keep_esearch_order(store, ncbi):
+    assert store.search_pmids("query", retmax=3) == ["30", "10", "20"]
+
+    # Incremental additions go first, in their own esearch order
+    ncbi.added[store.query_state("query")["last_sync"]] = ["50", "40", "10"]
+    store.sync("query", max_results=3, force=True)
+    assert store.local_pmids("query") == ["50", "40", "30", "10", "20"]
+
+
+def test_mindate_lookup_does_not_count_as_a_sync(store, ncbi):
+    ncbi.added["2024/01/01"] = ["40"]
+    articles = store.articles_for_query("query", max_results=5, mindate="2024/01/01")
+
+    assert [a["pmid"] for a in articles] == ["40"]
+    assert store.query_state("query") is None
+    assert store.local_pmids("query") == ["40"]
+
+    # A later sync still does the full listing
+    assert store.sync("query", max_results=3)["new_pmids"] == 3
+    assert store.local_pmids("query") == ["30", "10", "20", "40"]
+
+
+def test_explain_filters_local_abstracts_by_the_requested_gene(store, ncbi):
+    store.search_pmids("query", retmax=3)
+
+    text = explain(gene="Gene10", literature=["30", "10", "20"])
+    assert "Gene10 is discussed" in text
+    assert "Gene30 is discussed" not in text
+
+    # No gene: no filter, abstracts in the given order
+    text = explain(literature=["30", "10"])
+    assert "Gene30 is discussed" in text and "Gene10 is discussed" in text
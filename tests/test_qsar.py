@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+from tools.qsar import QSARTool, train_qsar_model
+from tools.descriptors import DESCRIPTOR_NAMES
+
+
+def _train(tmp_path, df, target):
+    csv = tmp_path / "train.csv"
+    df.to_csv(csv, index=False)
+    model_path = str(tmp_path / "qsar.joblib")
+    train_qsar_model(str(csv), target, model_path=model_path)
+    return QSARTool(model_path=model_path)
+
+
+def test_no_model_uses_heuristic(tmp_path):
+    tool = QSARTool(model_path=str(tmp_path / "missing.joblib"))
+    scores = tool.predict_batch([{"MW": 350, "LogP": 2.5}, {"MW": 900, "LogP": 7}])
+
+    assert tool.last_stats["source"] == "heuristic"
+    assert scores[0] > scores[1]
+
+
+def test_mismatched_features_fall_back_to_heuristic(tmp_path):
+    df = pd.DataFrame({
+        "feature1": np.arange(10, dtype=float),
+        "feature2": np.arange(10, dtype=float) * 2,
+        "feature3": np.arange(10, dtype=float) % 3,
+        "solubility": np.linspace(0, 1, 10),
+    })
+    tool = _train(tmp_path, df, "solubility")
+
+    scores = tool.predict_batch([{"MW": 350, "LogP": 2.5}, {"MW": 900, "LogP": 7}])
+    assert tool.last_stats["source"] == "heuristic"
+    assert scores[0] != scores[1]
+
+    # SMILES cannot be mapped onto feature1..3 either
+    scores = tool.predict_batch(["CCO", "c1ccccc1O"])
+    assert tool.last_stats["source"] == "heuristic"
+    assert len(scores) == 2
+
+
+def test_descriptor_model_scores_dicts_and_skips_empty_rows(tmp_path):
+    rng = np.random.default_rng(0)
+    mw = rng.uniform(150, 600, 40)
+    df = pd.DataFrame({"MW": mw, "LogP": rng.uniform(-1, 5, 40), "pIC50": mw / 100})
+    tool = _train(tmp_path, df, "pIC50")
+
+    scores = tool.predict_batch([
+        {"MW": 180, "LogP": 1.0},
+        {"MW": 580, "LogP": 1.0},
+        {"HBD": 2},                     # none of the model's features
+    ])
+    assert tool.last_stats["source"] == "model"
+    assert tool.last_stats["model_rows"] == 2
+    assert scores[1] > scores[0]
+    assert scores[2] == tool.predict_batch([{"HBD": 2}])[0]
+    assert tool.last_stats["source"] == "heuristic"
+
+
+def test_descriptor_matrix_is_column_selected(tmp_path):
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame({"MW": rng.uniform(150, 600, 30), "LogP": rng.uniform(-1, 5, 30)})
+    df["y"] = df["MW"] / 100
+    tool = _train(tmp_path, df, "y")
+
+    D = np.full((2, len(DESCRIPTOR_NAMES)), np.nan)
+    D[:, DESCRIPTOR_NAMES.index("MW")] = [200, 550]
+    D[:, DESCRIPTOR_NAMES.index("LogP")] = [2, 2]
+
+    scores = tool.predict_batch(D)
+    assert tool.last_stats["source"] == "model"
+    assert scores[1] > scores[0]
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from tools.response_cache import ResponseCache, MISS, COALESCED, HIT
+
+
+def test_cancelled_leader_hands_over_to_a_waiter():
+    cache = ResponseCache("test")
+    calls = []
+
+    def compute(tag, delay):
+        async def run():
+            calls.append(tag)
+            await asyncio.sleep(delay)
+            return {"by": tag}
+        return run
+
+    async def scenario():
+        leader = asyncio.create_task(cache.aget_or_compute("egfr", compute("leader", 10)))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.aget_or_compute("egfr", compute("waiter", 0.01)))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await waiter
+
+    value, status, _ = asyncio.run(scenario())
+
+    assert value == {"by": "waiter"}
+    assert status == MISS
+    assert calls == ["leader", "waiter"]
+    assert cache.stats()["inflight"] == 0
+    assert cache.get_or_compute("egfr", lambda: {"by": "sync"})[1] == HIT
+
+
+def test_leader_errors_still_reach_waiters():
+    cache = ResponseCache("test")
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("PubMed down")
+
+    async def never():
+        raise AssertionError("waiter must not compute")
+
+    async def scenario():
+        leader = asyncio.create_task(cache.aget_or_compute("als", failing))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(cache.aget_or_compute("als", never))
+        return await asyncio.gather(leader, waiter, return_exceptions=True)
+
+    leader_error, waiter_error = asyncio.run(scenario())
+
+    assert isinstance(leader_error, RuntimeError)
+    assert waiter_error is leader_error or str(waiter_error) == "PubMed down"
+    assert cache.stats()["inflight"] == 0
+
+
+def test_waiters_coalesce_onto_the_leader():
+    cache = ResponseCache("test")
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    async def scenario():
+        return await asyncio.gather(*(cache.aget_or_compute("snca", compute) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(calls) == 1
+    assert sorted(status for _, status, _ in results) == [COALESCED] * 4 + [MISS]
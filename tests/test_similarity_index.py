@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from tools.similarity_index import SimilarityIndex
+
+LIBRARY = [
+    ("ethanol", "CCO"),
+    ("propanol", "CCCO"),
+    ("benzene", "c1ccccc1"),
+    ("phenol", "c1ccccc1O"),
+    ("toluene", "Cc1ccccc1"),
+    ("broken", "not-a-smiles"),
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SimilarityIndex(index_dir=str(tmp_path)).build(LIBRARY)
+
+
+def test_top_k_best_first(index):
+    hits = index.search("c1ccccc1O", k=3)
+
+    assert hits[0] == {"id": "phenol", "smiles": "c1ccccc1O", "similarity": 1.0}
+    assert len(hits) == 3
+    assert [h["similarity"] for h in hits] == sorted((h["similarity"] for h in hits), reverse=True)
+
+
+def test_non_positive_k_returns_nothing(index):
+    assert index.search("CCO", k=0) == []
+    assert index.search("CCO", k=-3) == []
+
+
+def test_strings_are_packed_columns_not_json(index, tmp_path):
+    with open(tmp_path / "similarity_meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    assert "ids" not in meta and "smiles" not in meta
+    assert meta["count"] == 5
+
+    reopened = SimilarityIndex(index_dir=str(tmp_path)).open()
+    assert len(reopened) == 5
+    assert [reopened.ids[i] for i in range(5)] == [n for n, _ in LIBRARY[:5]]
+    assert reopened.search("CCCO", k=1)[0]["id"] == "propanol"
+
+
+def test_endpoint_rejects_invalid_k():
+    from fastapi.testclient import TestClient
+    from app.example_main import app
+
+    client = TestClient(app)
+    assert client.get("/similar_compounds", params={"smiles": "CCO", "k": -1}).status_code == 422
+    assert client.get("/similar_compounds", params={"smiles": "CCO", "k": 10**6}).status_code == 422
@@ -0,0 +1,49 @@
+import pytest
+
+import tools.fingerprint_index as fingerprint_index
+import tools.substructure_search as substructure_search
+from tools.substructure_search import SubstructureIndex
+
+PHENOLS = [(f"phenol_{i}", "c1ccccc1O") for i in range(40)]
+OTHERS = [("ethanol", "CCO"), ("toluene", "Cc1ccccc1"), ("aniline", "Nc1ccccc1")]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SubstructureIndex(index_dir=str(tmp_path)).build(OTHERS + PHENOLS)
+
+
+def test_matches_in_library_order(index):
+    hits = index.search("c1ccccc1")
+    assert [h["id"] for h in hits[:3]] == ["toluene", "aniline", "phenol_0"]
+    assert len(hits) == 42
+    assert index.search("[OX2H]c1ccccc1")[0]["id"] == "phenol_0"
+
+
+def test_limit_stops_matching_early(index, monkeypatch):
+    monkeypatch.setattr(substructure_search, "MATCH_CHUNK", 5)
+
+    hits = index.search("c1ccccc1", limit=3)
+    assert [h["id"] for h in hits] == ["toluene", "aniline", "phenol_0"]
+    assert index.last_stats["matched"] == 5
+    assert index.last_stats["screened_in"] == 42
+
+
+def test_limit_stops_matching_early_in_pool(index, monkeypatch):
+    monkeypatch.setattr(substructure_search, "MATCH_CHUNK", 5)
+    monkeypatch.setattr(substructure_search, "PARALLEL_THRESHOLD", 1)
+
+    hits = index.search("c1ccccc1", limit=7, n_jobs=2)
+    assert [h["id"] for h in hits] == ["toluene", "aniline"] + [f"phenol_{i}" for i in range(5)]
+    assert index.last_stats["matched"] < index.last_stats["screened_in"]
+
+
+def test_shares_the_fingerprint_index_layout(tmp_path, monkeypatch):
+    # Several build chunks → fingerprints computed in a process pool
+    monkeypatch.setattr(fingerprint_index, "BUILD_CHUNK", 10)
+    index = SubstructureIndex(index_dir=str(tmp_path)).build(OTHERS + PHENOLS, n_jobs=2)
+
+    reopened = SubstructureIndex(index_dir=str(tmp_path)).open()
+    assert reopened.exists()
+    assert len(reopened) == len(index) == 43
+    assert reopened.smiles[0] == "CCO"
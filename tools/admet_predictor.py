@@ -1,6 +1,10 @@
 # tools/admet_predictor.py
 import random
 
+import numpy as np
+
+from tools.descriptors import compute_descriptors, descriptor_index
+
 def predict_admet(compound):
     """
     Proxy ADMET score based on simple heuristics.
@@ -21,3 +25,28 @@ def predict_admet(compound):
     score -= abs(logp - 2.5) / 6
 
     return round(max(0.45, min(score, 0.75)), 2)
+
+
+def predict_admet_batch(compounds):
+    """
+    Vectorized predict_admet for many compounds in one call.
+
+    Args:
+        compounds: list of SMILES strings, or a descriptor matrix from
+            tools.descriptors.compute_descriptors
+
+    Returns:
+        np.ndarray of scores (0.45–0.75); unparseable SMILES get 0.55
+    """
+    if isinstance(compounds, np.ndarray):
+        X = compounds
+    else:
+        X = compute_descriptors(compounds)
+
+    mw = X[:, descriptor_index("MW")]
+    logp = X[:, descriptor_index("LogP")]
+
+    score = 0.7 - np.abs(mw - 350) / 700 - np.abs(logp - 2.5) / 6
+    score = np.round(np.clip(score, 0.45, 0.75), 2)
+
+    return np.where(np.isnan(score), 0.55, score)
@@ -2,14 +2,14 @@
 # SAFE ALPHAFOLD TOOL
 # ============================================================
 
-import requests
+from tools.http_client import http_get
 
 class AlphaFoldTool:
 
     def predict(self, gene: str):
         try:
             url = f"https://alphafold.ebi.ac.uk/api/prediction/{gene}"
-            r = requests.get(url, timeout=5)
+            r = http_get(url, timeout=5, retries=0)
 
             if r.status_code != 200:
                 raise Exception("AlphaFold not available")
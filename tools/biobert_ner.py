@@ -1,34 +1,22 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForTokenClassification
-from transformers import pipeline
+from tools.ner_service import get_ner_service
 
 MODEL_NAME = "dmis-lab/biobert-v1.1"
 
-@torch.no_grad()
+
 def extract_genes_from_abstracts(abstracts, hgnc_set=None):
     """
     Run BioBERT NER on PubMed abstracts.
     Returns a ranked dict of HGNC gene symbols.
-    """
 
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
-    model = AutoModelForTokenClassification.from_pretrained(MODEL_NAME)
+    The model is loaded once per process and entities are cached per
+    abstract (see tools.ner_service).
+    """
 
-    nlp = pipeline(
-        "ner",
-        model=model,
-        tokenizer=tokenizer,
-        aggregation_strategy="simple"
-    )
+    texts = [text for text in abstracts if text and len(text) >= 20]
 
     gene_counts = {}
 
-    for text in abstracts:
-        if not text or len(text) < 20:
-            continue
-
-        entities = nlp(text)
-
+    for entities in get_ner_service(MODEL_NAME).analyze(texts):
         for ent in entities:
             label = ent.get("entity_group", "")
             word = ent.get("word", "").upper()
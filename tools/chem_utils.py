@@ -1,28 +1,30 @@
 """
 chem_utils.py: Shared cheminformatics utility functions for property calculation and drug-likeness filtering.
 """
-from rdkit import Chem
-from rdkit.Chem import Descriptors, Crippen, Lipinski, rdMolDescriptors
+import numpy as np
+
+from tools.descriptors import compute_descriptors, descriptors_for, descriptor_index
 
 def lipinski_filter(smiles):
-    mol = Chem.MolFromSmiles(smiles)
-    if mol is None:
-        return False
-    mw = Descriptors.MolWt(mol)
-    logp = Descriptors.MolLogP(mol)
-    hbd = Descriptors.NumHDonors(mol)
-    hba = Descriptors.NumHAcceptors(mol)
-    return (mw <= 500 and logp <= 5 and hbd <= 5 and hba <= 10)
+    return bool(lipinski_filter_batch([smiles])[0])
+
+def lipinski_filter_batch(smiles_list):
+    X = compute_descriptors(smiles_list)
+    with np.errstate(invalid="ignore"):
+        return (
+            (X[:, descriptor_index("MW")] <= 500)
+            & (X[:, descriptor_index("LogP")] <= 5)
+            & (X[:, descriptor_index("HBD")] <= 5)
+            & (X[:, descriptor_index("HBA")] <= 10)
+        )
 
 def calc_admet_properties(smiles):
-    mol = Chem.MolFromSmiles(smiles)
-    if mol is None:
+    desc = descriptors_for(smiles)
+    if desc is None:
         return None
     props = {}
-    props['MW'] = Descriptors.MolWt(mol)
-    props['LogP'] = Crippen.MolLogP(mol)
-    props['HBD'] = Lipinski.NumHDonors(mol)
-    props['HBA'] = Lipinski.NumHAcceptors(mol)
-    props['RotB'] = Lipinski.NumRotatableBonds(mol)
-    props['TPSA'] = rdMolDescriptors.CalcTPSA(mol)
+    for key in ('MW', 'LogP', 'HBD', 'HBA', 'RotB', 'TPSA'):
+        props[key] = desc[key]
+    for key in ('HBD', 'HBA', 'RotB'):
+        props[key] = int(props[key])
     return props
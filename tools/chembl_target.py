@@ -3,7 +3,7 @@
 # REAL ChEMBL TARGET → COMPOUND LOADER (TIMEOUT-SAFE)
 # ============================================================
 
-import requests
+from tools.http_client import http_get
 
 BASE = "https://www.ebi.ac.uk/chembl/api/data"
 
@@ -22,7 +22,7 @@ def get_target_chembl_id(gene: str):
     url = f"{BASE}/target/search.json?q={gene}"
 
     try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+        r = http_get(url, headers=HEADERS, timeout=TIMEOUT)
         r.raise_for_status()
     except Exception:
         # 🚫 Network failure / timeout → safe fallback
@@ -58,7 +58,7 @@ def get_chembl_compounds_for_target(gene: str, limit=5):
     }
 
     try:
-        r = requests.get(url, params=params, headers=HEADERS, timeout=TIMEOUT)
+        r = http_get(url, params=params, headers=HEADERS, timeout=TIMEOUT)
         r.raise_for_status()
     except Exception:
         # 🚫 EBI timeout / rate-limit → safe fallback
@@ -87,6 +87,7 @@ def get_chembl_compounds_for_target(gene: str, limit=5):
             "activity_value": value,
             "activity_units": act.get("standard_units"),
             "bioactivity_score": act.get("pchembl_value") or 0.5,
+            "smiles": act.get("canonical_smiles"),
         })
 
         if len(compounds) >= limit:
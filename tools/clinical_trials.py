@@ -3,63 +3,253 @@
 # ============================================================
 
 import os
+import re
+import threading
+
+import numpy as np
 import pandas as pd
 
+from tools.clinical_trials_mirror import CTGOV_DB, ClinicalTrialsMirror
+
 # ------------------------------------------------------------
 # CONFIG
 # ------------------------------------------------------------
 
 CSV_PATH = os.path.join("data", "clinical_trials.csv")
 
+SEARCH_COLUMNS = ["condition", "intervention", "target", "gene"]
+
+GRAM = 3                 # n-gram length for substring search
+CANDIDATE_CHUNK = 256    # first batch of candidates; doubles each round
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SEP = "\x1f"            # between columns, so matches never span two fields
+
 
 # ------------------------------------------------------------
 # LOAD CSV SAFELY
 # ------------------------------------------------------------
 
-def load_clinical_trials():
+def load_clinical_trials(path: str = CSV_PATH):
     """
     Load clinical trials CSV safely.
     """
-    if not os.path.exists(CSV_PATH):
-        print("⚠️ clinical_trials.csv not found")
+    if not os.path.exists(path):
+        print(f"⚠️ {os.path.basename(path)} not found")
         return pd.DataFrame()
 
     try:
-        return pd.read_csv(CSV_PATH)
+        return pd.read_csv(path)
     except Exception as e:
         print("❌ Failed to load clinical trials:", e)
         return pd.DataFrame()
 
 
+# ------------------------------------------------------------
+# INVERTED INDEX (TOKENS + N-GRAMS, RELOADED ON CSV CHANGE)
+# ------------------------------------------------------------
+
+class TrialsIndex:
+    """
+    In-memory index over the clinical trials CSV and the local
+    ClinicalTrials.gov mirror (tools.clinical_trials_mirror).
+
+    ✔ Sources read once; re-read only when the CSV mtime or the mirror changes
+    ✔ n-gram postings → substring queries touch only candidate rows
+    ✔ token postings → whole-word queries
+    ✔ Results in source order (CSV, then mirror), same matches as a
+      per-row substring scan
+    """
+
+    def __init__(self, path: str = CSV_PATH, mirror_path: str | None = CTGOV_DB):
+        self.path = path
+        self.mirror_path = mirror_path
+        self.stamp = None
+        self._mirror = None
+        self.records = []
+        self.columns = []
+        self.haystacks = []      # lowercased SEARCH_COLUMNS per row, _SEP-joined
+        self.grams = {}          # n-gram → sorted int32 row ids
+        self.tokens = {}         # token  → sorted int32 row ids
+        self._lock = threading.Lock()
+
+    def _build(self, records: list, fields: set):
+        columns = [c for c in SEARCH_COLUMNS if c in fields]
+
+        haystacks = []
+        grams = {}
+        tokens = {}
+
+        for i, row in enumerate(records):
+            values = ["" if row.get(c) is None else str(row[c]).lower() for c in columns]
+            haystacks.append(_SEP.join(values))
+
+            row_grams = set()
+            row_tokens = set()
+            for v in values:
+                row_grams.update(v[j:j + GRAM] for j in range(len(v) - GRAM + 1))
+                row_tokens.update(_TOKEN.findall(v))
+
+            for g in row_grams:
+                grams.setdefault(g, []).append(i)
+            for t in row_tokens:
+                tokens.setdefault(t, []).append(i)
+
+        self.records = records
+        self.columns = columns
+        self.haystacks = haystacks
+        self.grams = {g: np.array(ids, dtype=np.int32) for g, ids in grams.items()}
+        self.tokens = {t: np.array(ids, dtype=np.int32) for t, ids in tokens.items()}
+
+    def _mirror_store(self):
+        # Never creates the mirror; it appears after the first sync
+        if self._mirror is None and self.mirror_path and os.path.exists(self.mirror_path):
+            self._mirror = ClinicalTrialsMirror(self.mirror_path)
+        return self._mirror
+
+    def _stamp(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        mirror = self._mirror_store()
+        return mtime, mirror.stamp() if mirror else None
+
+    def _load(self):
+        df = load_clinical_trials(self.path)
+        records = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+        fields = set(df.columns)
+
+        mirror = self._mirror_store()
+        if mirror:
+            mirrored = mirror.to_records()
+            records.extend(mirrored)
+            if mirrored:
+                fields.update(mirrored[0])
+
+        return records, fields
+
+    def refresh(self):
+        """
+        Reload if the CSV or the mirror changed since the last build.
+        """
+        stamp = self._stamp()
+        if stamp == self.stamp:
+            return
+
+        with self._lock:
+            if stamp == self.stamp:
+                return
+            self._build(*self._load())
+            self.stamp = stamp
+            if self.records:
+                print(f"✅ Clinical trials indexed: {len(self.records)} trials")
+
+    def __len__(self):
+        return len(self.records)
+
+    @staticmethod
+    def _intersect(postings):
+        """
+        Row ids in every posting list, ascending, produced lazily in
+        growing chunks so a search with a limit stops early.
+        """
+        postings = sorted(postings, key=len)
+        base, others = postings[0], postings[1:]
+        start, step = 0, CANDIDATE_CHUNK
+
+        while start < len(base):
+            ids = base[start:start + step]
+            for p in others:
+                pos = np.minimum(np.searchsorted(p, ids), len(p) - 1)
+                ids = ids[p[pos] == ids]
+                if not len(ids):
+                    break
+            yield from ids.tolist()
+            start += step
+            step *= 2
+
+    def candidates(self, q: str, whole_word: bool = False):
+        """
+        Row ids that may match, ascending; a superset of the true matches.
+        """
+        if whole_word:
+            keys, postings = set(_TOKEN.findall(q)), self.tokens
+        elif len(q) >= GRAM:
+            keys = {q[j:j + GRAM] for j in range(len(q) - GRAM + 1)}
+            postings = self.grams
+        elif q.isascii() and q.isalnum():
+            # Shorter than an n-gram: rows with a token containing q
+            mask = np.zeros(len(self.records), dtype=bool)
+            for token, ids in self.tokens.items():
+                if q in token:
+                    mask[ids] = True
+            return np.flatnonzero(mask)
+        else:
+            keys = None
+
+        if not keys:
+            # Nothing indexable → check every row
+            return range(len(self.records))
+
+        lists = [postings.get(k) for k in keys]
+        if any(p is None for p in lists):
+            return []
+        return self._intersect(lists)
+
+    def search(self, query: str, whole_word: bool = False, limit: int | None = None):
+        """
+        Trials whose condition / intervention / target / gene contain
+        the query (case-insensitive), or the query as whole words.
+
+        Returns:
+            list[dict]
+        """
+        self.refresh()
+        if not self.columns:
+            return []
+
+        q = query.lower()
+
+        if whole_word:
+            pattern = re.compile(rf"(?<![a-z0-9]){re.escape(q.strip())}(?![a-z0-9])")
+            match = pattern.search
+        else:
+            match = lambda hay: q in hay
+
+        hits = []
+        for i in self.candidates(q, whole_word=whole_word):
+            if match(self.haystacks[i]):
+                hits.append(dict(self.records[i]))
+                if limit and len(hits) >= limit:
+                    break
+        return hits
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_trials_index():
+    global _INDEX
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            _INDEX = TrialsIndex()
+    return _INDEX
+
+
 # ------------------------------------------------------------
 # QUERY TRIALS (USED BY FASTAPI & DISCOVERY AGENT)
 # ------------------------------------------------------------
 
-def get_trials_for_query(query: str):
+def get_trials_for_query(query: str, whole_word: bool = False, limit: int | None = None):
     """
     Find clinical trials related to a disease / gene / compound.
 
     Returns:
         list[dict]
     """
-    df = load_clinical_trials()
-    if df.empty:
-        return []
-
-    q = query.lower()
-
-    hits = df[
-        df.apply(
-            lambda row: any(
-                q in str(row[col]).lower()
-                for col in ["condition", "intervention", "target", "gene"]
-                if col in df.columns
-            ),
-            axis=1
-        )
-    ]
-
-    return hits.to_dict(orient="records")
+    return get_trials_index().search(query, whole_word=whole_word, limit=limit)
 
 
 # ------------------------------------------------------------
@@ -0,0 +1,419 @@
+# ============================================================
+# LOCAL CLINICALTRIALS.GOV MIRROR (PAGED V2 SYNC → SQLITE)
+# ============================================================
+#
+# Usage (from the project root, e.g. nightly):
+#   python -m tools.clinical_trials_mirror [--full] [term ...]
+#
+# CTGOV_FIXTURE=path/to/studies.json replaces the remote API with a
+# local file in the v2 response format (tests, offline runs).
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+from tools.clinical_trials_v2 import BASE_URL
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+CTGOV_DB = os.path.join("data", "ctgov", "trials.sqlite")
+
+CTGOV_FIXTURE = os.getenv("CTGOV_FIXTURE")
+CTGOV_PAGE_SIZE = 1000           # v2 API maximum
+
+SYNC_CONDITIONS = [
+    "Alzheimer's disease",
+    "Parkinson's disease",
+    "Huntington's disease",
+    "Amyotrophic lateral sclerosis",
+    "Multiple sclerosis",
+    "Pancreatic cancer",
+]
+SYNC_GENES = [
+    "APP", "PSEN1", "PSEN2", "BACE1", "MAPT",
+    "SNCA", "LRRK2", "SOD1", "FUS", "TARDBP", "HTT",
+]
+
+
+def _env_list(name, default):
+    value = os.getenv(name)
+    return [v.strip() for v in value.split(",") if v.strip()] if value else list(default)
+
+
+CONDITIONS = _env_list("CTGOV_CONDITIONS", SYNC_CONDITIONS)
+GENES = _env_list("CTGOV_GENES", SYNC_GENES)
+
+STUDY_FIELDS = ",".join([
+    "NCTId", "BriefTitle", "OverallStatus", "Condition", "Keyword",
+    "InterventionName", "Phase", "LastUpdatePostDate",
+])
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    nct_id       TEXT PRIMARY KEY,
+    title        TEXT,
+    condition    TEXT,
+    intervention TEXT,
+    target       TEXT,           -- study keywords
+    phase        TEXT,           -- "Phase 2", "Phase 1, Phase 2", ...
+    status       TEXT,
+    last_update  TEXT,           -- YYYY-MM-DD
+    fetched_at   REAL
+);
+
+CREATE TABLE IF NOT EXISTS trial_genes (
+    gene    TEXT,
+    nct_id  TEXT,
+    PRIMARY KEY (gene, nct_id)
+);
+
+CREATE TABLE IF NOT EXISTS sync_terms (
+    term         TEXT PRIMARY KEY,
+    last_update  TEXT,           -- newest LastUpdatePostDate seen
+    synced_at    REAL,
+    studies      INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key    TEXT PRIMARY KEY,
+    value  TEXT
+);
+"""
+
+
+# ------------------------------------------------------------
+# STUDY PARSING (V2 JSON → FLAT ROW)
+# ------------------------------------------------------------
+
+def _phase_label(phase: str) -> str:
+    # PHASE2 → Phase 2, EARLY_PHASE1 → Early Phase 1, NA → N/A
+    if phase == "NA":
+        return "N/A"
+    label = phase.replace("_", " ").title()
+    return label.replace("Phase", "Phase ").replace("  ", " ").strip()
+
+
+def parse_study(study: dict) -> dict:
+    protocol = study.get("protocolSection", {})
+    ident = protocol.get("identificationModule", {})
+    status = protocol.get("statusModule", {})
+    conditions = protocol.get("conditionsModule", {})
+    design = protocol.get("designModule", {})
+    arms = protocol.get("armsInterventionsModule", {})
+
+    return {
+        "nct_id": ident.get("nctId"),
+        "title": ident.get("briefTitle", ""),
+        "condition": "; ".join(conditions.get("conditions", [])),
+        "intervention": "; ".join(
+            i.get("name", "") for i in arms.get("interventions", []) if i.get("name")
+        ),
+        "target": "; ".join(conditions.get("keywords", [])),
+        "phase": ", ".join(_phase_label(p) for p in design.get("phases", [])),
+        "status": status.get("overallStatus", ""),
+        "last_update": status.get("lastUpdatePostDateStruct", {}).get("date", ""),
+    }
+
+
+def _last_update(study: dict) -> str:
+    return (
+        study.get("protocolSection", {})
+        .get("statusModule", {})
+        .get("lastUpdatePostDateStruct", {})
+        .get("date", "")
+    )
+
+
+# ------------------------------------------------------------
+# SOURCES (REMOTE API / LOCAL FIXTURE)
+# ------------------------------------------------------------
+
+class ApiSource:
+    """
+    Pages through /api/v2/studies for one term.
+    """
+
+    def pages(self, term: str, since: str | None = None, page_size: int = CTGOV_PAGE_SIZE):
+        from tools.http_client import http_get
+
+        query = term
+        if since:
+            query = f"({term}) AND AREA[LastUpdatePostDate]RANGE[{since},MAX]"
+
+        params = {
+            "query.term": query,
+            "pageSize": page_size,
+            "fields": STUDY_FIELDS,
+            "format": "json",
+        }
+
+        while True:
+            r = http_get(BASE_URL, params=params, timeout=60)
+            r.raise_for_status()
+            data = r.json()
+
+            yield data.get("studies", [])
+
+            token = data.get("nextPageToken")
+            if not token:
+                return
+            params["pageToken"] = token
+
+
+class FixtureSource:
+    """
+    Stands in for the API: a JSON file holding {"studies": [...]} (or a
+    bare list) in the v2 format, filtered and paged the same way.
+    """
+
+    def __init__(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.studies = data.get("studies", []) if isinstance(data, dict) else data
+        self._text = [json.dumps(s).lower() for s in self.studies]
+
+    def pages(self, term: str, since: str | None = None, page_size: int = CTGOV_PAGE_SIZE):
+        term = term.lower()
+        matches = [
+            s for s, text in zip(self.studies, self._text)
+            if term in text and (not since or _last_update(s) >= since)
+        ]
+        for start in range(0, len(matches), page_size):
+            yield matches[start:start + page_size]
+
+
+def default_source():
+    return FixtureSource(CTGOV_FIXTURE) if CTGOV_FIXTURE else ApiSource()
+
+
+# ------------------------------------------------------------
+# MIRROR
+# ------------------------------------------------------------
+
+class ClinicalTrialsMirror:
+    """
+    ClinicalTrials.gov studies for the configured conditions and genes.
+
+    ✔ Paged bulk sync (1000 studies per request, fields trimmed)
+    ✔ Incremental refresh: per term, only studies updated since the
+      newest LastUpdatePostDate already stored
+    ✔ Flat rows in the clinical_trials.csv layout, read by
+      tools.clinical_trials.get_trials_for_query
+    """
+
+    def __init__(self, path: str = CTGOV_DB, source=None):
+        self.path = path
+        self.source = source
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        with self._write_lock:
+            conn = self._conn()
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def add_studies(self, studies, gene: str | None = None):
+        rows = [parse_study(s) for s in studies]
+        rows = [r for r in rows if r["nct_id"]]
+        if not rows:
+            return 0
+
+        now = time.time()
+        with self._write_lock:
+            conn = self._conn()
+            conn.executemany(
+                "INSERT INTO trials(nct_id, title, condition, intervention, target, "
+                "phase, status, last_update, fetched_at) "
+                "VALUES (:nct_id, :title, :condition, :intervention, :target, "
+                ":phase, :status, :last_update, :fetched_at) "
+                "ON CONFLICT(nct_id) DO UPDATE SET title=excluded.title, "
+                "condition=excluded.condition, intervention=excluded.intervention, "
+                "target=excluded.target, phase=excluded.phase, status=excluded.status, "
+                "last_update=excluded.last_update, fetched_at=excluded.fetched_at",
+                [{**r, "fetched_at": now} for r in rows]
+            )
+            if gene:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO trial_genes(gene, nct_id) VALUES (?, ?)",
+                    [(gene, r["nct_id"]) for r in rows]
+                )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES ('updated_at', ?)",
+                (str(now),)
+            )
+            conn.commit()
+        return len(rows)
+
+    def _mark_synced(self, term, last_update, studies):
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT INTO sync_terms(term, last_update, synced_at, studies) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET "
+                "last_update=MAX(COALESCE(sync_terms.last_update, ''), excluded.last_update), "
+                "synced_at=excluded.synced_at, "
+                "studies=COALESCE(sync_terms.studies, 0) + excluded.studies",
+                (term, last_update, time.time(), studies)
+            )
+            conn.commit()
+
+    # -------------------------
+    # Sync
+    # -------------------------
+    def term_state(self, term: str):
+        row = self._conn().execute(
+            "SELECT last_update, synced_at, studies FROM sync_terms WHERE term = ?",
+            (term,)
+        ).fetchone()
+        if not row:
+            return None
+        return {"last_update": row[0], "synced_at": row[1], "studies": row[2]}
+
+    def sync_term(self, term: str, gene: bool = False, full: bool = False):
+        """
+        Fetch one term; incremental unless full=True or never synced.
+
+        Returns:
+            dict: {"term", "since", "pages", "studies"}
+        """
+        source = self.source or default_source()
+        state = None if full else self.term_state(term)
+        since = state["last_update"] if state and state["last_update"] else None
+
+        pages = 0
+        studies = 0
+        newest = since or ""
+
+        for page in source.pages(term, since=since):
+            pages += 1
+            studies += self.add_studies(page, gene=term if gene else None)
+            newest = max([newest] + [_last_update(s) for s in page])
+
+        self._mark_synced(term, newest, studies)
+        return {"term": term, "since": since, "pages": pages, "studies": studies}
+
+    def sync(self, conditions=None, genes=None, full: bool = False, progress=None):
+        """
+        Sync every configured condition and gene.
+
+        Returns:
+            dict: {"terms": [...per-term results], "trials": total stored}
+        """
+        conditions = CONDITIONS if conditions is None else conditions
+        genes = GENES if genes is None else genes
+
+        results = []
+        for term, is_gene in [(c, False) for c in conditions] + [(g, True) for g in genes]:
+            try:
+                result = self.sync_term(term, gene=is_gene, full=full)
+            except Exception as e:
+                print(f"⚠️ ClinicalTrials.gov sync failed for {term}:", e)
+                result = {"term": term, "error": str(e)}
+            results.append(result)
+            if progress:
+                progress("term", **result)
+
+        return {"terms": results, "trials": len(self)}
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM trials").fetchone()[0]
+
+    def stamp(self):
+        """
+        Changes whenever studies are written; used for index reloads.
+        """
+        row = self._conn().execute(
+            "SELECT value FROM meta WHERE key = 'updated_at'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def to_records(self):
+        """
+        All stored trials as flat dicts (condition, intervention,
+        target, gene, phase, ...), gene being the synced gene terms
+        that returned the study.
+        """
+        rows = self._conn().execute(
+            "SELECT t.nct_id, t.title, t.condition, t.intervention, t.target, "
+            "COALESCE(GROUP_CONCAT(g.gene, '; '), ''), t.phase, t.status, t.last_update "
+            "FROM trials t LEFT JOIN trial_genes g ON g.nct_id = t.nct_id "
+            "GROUP BY t.nct_id ORDER BY t.nct_id"
+        )
+        keys = [
+            "nct_id", "title", "condition", "intervention", "target",
+            "gene", "phase", "status", "last_update",
+        ]
+        return [dict(zip(keys, row)) for row in rows]
+
+    def stats(self):
+        conn = self._conn()
+        return {
+            "trials": len(self),
+            "terms": conn.execute("SELECT COUNT(*) FROM sync_terms").fetchone()[0],
+            "last_sync": conn.execute("SELECT MAX(synced_at) FROM sync_terms").fetchone()[0],
+        }
+
+
+# ------------------------------------------------------------
+# SHARED INSTANCE
+# ------------------------------------------------------------
+
+_MIRROR = None
+_MIRROR_LOCK = threading.Lock()
+
+
+def get_trials_mirror():
+    global _MIRROR
+    with _MIRROR_LOCK:
+        if _MIRROR is None:
+            _MIRROR = ClinicalTrialsMirror()
+    return _MIRROR
+
+
+def sync_clinical_trials(progress=None, full: bool = False, terms=None):
+    """
+    Entry point for the CLI and the background job queue
+    (progress first, as job handlers receive it).
+    """
+    mirror = get_trials_mirror()
+    if terms:
+        return mirror.sync(conditions=terms, genes=[], full=full, progress=progress)
+    return mirror.sync(full=full, progress=progress)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    full = "--full" in args
+    terms = [a for a in args if a != "--full"]
+
+    started = datetime.utcnow()
+    summary = sync_clinical_trials(full=full, terms=terms or None)
+    for r in summary["terms"]:
+        print(r)
+    print(f"✅ {summary['trials']} trials mirrored in {(datetime.utcnow() - started).seconds} s")
@@ -1,4 +1,4 @@
-import requests
+from tools.http_client import http_get
 
 BASE_URL = "https://clinicaltrials.gov/api/v2/studies"
 
@@ -7,7 +7,7 @@ def fetch_clinical_trials(disease, limit=20):
         "query.term": disease,
         "pageSize": limit
     }
-    r = requests.get(BASE_URL, params=params, timeout=10)
+    r = http_get(BASE_URL, params=params, timeout=10)
     r.raise_for_status()
 
     trials = []
@@ -0,0 +1,38 @@
+# ============================================================
+# PACKED COLUMNS (SHARED BY COMPOUND STORE, FINGERPRINT AND HGNC INDEXES)
+# ============================================================
+
+import numpy as np
+
+
+# ------------------------------------------------------------
+# PACKED STRING COLUMN
+# ------------------------------------------------------------
+
+class StringColumn:
+    """
+    Variable-length strings stored as one UTF-8 byte buffer plus an
+    offsets array, so memory is proportional to the text itself.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    @classmethod
+    def from_strings(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(data, offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def nonempty(self):
+        return np.diff(self.offsets) > 0
@@ -3,8 +3,6 @@
 # ============================================================
 
 import os
-import csv
-import random
 
 # ------------------------------------------------------------
 # CONFIG
@@ -12,8 +10,53 @@ import random
 
 COMPOUND_FILE = os.path.join("data", "ligands_for_docking.csv")
 
-DEFAULT_ACTIVITY_TYPE = "IC50"
-DEFAULT_ACTIVITY_UNITS = "nM"
+
+# ------------------------------------------------------------
+# STORE ACCESS
+# ------------------------------------------------------------
+
+def _store():
+    """
+    Shared columnar store for COMPOUND_FILE (None if unusable).
+    """
+    # Imported here: numpy is not needed until compounds are read
+    from tools.compound_store import get_compound_store
+
+    if not os.path.exists(COMPOUND_FILE):
+        print("❌ Missing data/ligands_for_docking.csv")
+        return None
+
+    try:
+        return get_compound_store(COMPOUND_FILE)
+    except ValueError as e:
+        print(e)
+        return None
+
+
+# ------------------------------------------------------------
+# STREAMING API
+# ------------------------------------------------------------
+
+def iter_compound_batches(
+    batch_size: int = 1000,
+    target: str | None = None,
+    require_smiles: bool = True
+):
+    """
+    Yield compounds lazily in lists of at most batch_size.
+
+    Same record layout as load_compounds(); only the current batch is
+    materialized, so large libraries stream with bounded memory.
+    """
+    store = _store()
+    if store is None:
+        return
+
+    yield from store.iter_batches(
+        batch_size=batch_size,
+        target=target,
+        require_smiles=require_smiles
+    )
 
 
 # ------------------------------------------------------------
@@ -28,7 +71,7 @@ def load_compounds(
     Load compounds from CSV in a discovery-safe format WITH activity.
 
     Supported CSV columns (flexible):
-    - compound / name / molecule
+    - compound / name / molecule / chembl_id
     - smiles
     - target / gene
     - activity_type (optional)
@@ -40,75 +83,14 @@ def load_compounds(
         list[dict]
     """
 
-    compounds = []
+    store = _store()
+    if store is None:
+        return []
 
-    if not os.path.exists(COMPOUND_FILE):
-        print("❌ Missing data/ligands_for_docking.csv")
-        return compounds
-
-    with open(COMPOUND_FILE, encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        for row in reader:
-
-            # -----------------------------
-            # Core identifiers
-            # -----------------------------
-            name = (
-                row.get("compound")
-                or row.get("name")
-                or row.get("molecule")
-            )
-
-            smiles = row.get("smiles")
-            target = row.get("target") or row.get("gene")
-            source = row.get("source", "csv")
-
-            if not name:
-                continue
-
-            if require_smiles and not smiles:
-                continue
-
-            # -----------------------------
-            # Activity (REAL OR FALLBACK)
-            # -----------------------------
-            activity_type = row.get("activity_type") or DEFAULT_ACTIVITY_TYPE
-            activity_units = row.get("activity_units") or DEFAULT_ACTIVITY_UNITS
-
-            try:
-                activity_value = float(row.get("activity_value"))
-            except Exception:
-                # fallback: realistic in-silico IC50 range
-                activity_value = round(random.uniform(5, 5000), 2)
-
-            compound = {
-                # 🔑 REQUIRED FOR UI
-                "compound_id": {
-                    "name": name.strip(),
-                    "activity_type": activity_type,
-                    "activity_value": activity_value,
-                    "activity_units": activity_units
-                },
-
-                # Extra fields
-                "smiles": smiles.strip() if smiles else None,
-                "source": source,
-                "target": target.strip().upper() if target else None,
-
-                # Scores (safe defaults)
-                "admet": round(random.uniform(0.45, 0.7), 2),
-                "qsar_score": round(random.uniform(0.85, 0.95), 3),
-            }
-
-            compound["final_score"] = round(
-                0.4 * compound["qsar_score"] + 0.6 * compound["admet"], 3
-            )
-
-            compounds.append(compound)
-
-            if limit and len(compounds) >= limit:
-                break
+    compounds = list(store.iter_compounds(
+        require_smiles=require_smiles,
+        limit=limit
+    ))
 
     print(f"✅ Loaded {len(compounds)} compounds from CSV (with activity)")
     return compounds
@@ -125,18 +107,15 @@ def load_compounds_for_target(
     """
     Load only compounds associated with a specific gene/target.
     Activity is GUARANTEED.
-    """
 
-    gene = gene.upper()
-    all_compounds = load_compounds(limit=None)
+    Uses the store's per-target index instead of reloading the file.
+    """
 
-    filtered = [
-        c for c in all_compounds
-        if c.get("target") == gene
-    ]
+    store = _store()
+    if store is None:
+        return []
 
-    if limit:
-        filtered = filtered[:limit]
+    filtered = list(store.iter_compounds(target=gene, limit=limit))
 
-    print(f"🎯 {len(filtered)} compounds matched for target {gene}")
+    print(f"🎯 {len(filtered)} compounds matched for target {gene.upper()}")
     return filtered
@@ -0,0 +1,160 @@
+"""
+descriptors.py: Batch RDKit descriptor engine shared by QSAR, ADMET and drug-likeness filters.
+
+Each SMILES is parsed once, descriptors are memoized by canonical SMILES,
+and large batches are computed across a process pool.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+DESCRIPTOR_NAMES = [
+    "MW", "LogP", "HBD", "HBA", "RotB", "TPSA", "QED",
+    "HeavyAtoms", "AromaticRings", "FractionCSP3",
+]
+
+# Batches smaller than this are computed in-process (pool startup dominates)
+PARALLEL_THRESHOLD = 2000
+CHUNK_SIZE = 500
+MEMO_SIZE = 200_000
+
+_memo = OrderedDict()          # canonical SMILES -> descriptor row
+_canonical = {}                # input SMILES -> canonical SMILES (or None)
+_lock = threading.Lock()
+
+
+def descriptor_index(name):
+    return DESCRIPTOR_NAMES.index(name)
+
+
+def _compute_one(smiles):
+    """
+    Parse once and compute all descriptors.
+
+    Returns:
+        (canonical SMILES | None, list[float] | None)
+    """
+    from rdkit import Chem
+    from rdkit.Chem import Descriptors, Crippen, Lipinski, rdMolDescriptors, QED
+
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        return None, None
+
+    try:
+        qed = QED.qed(mol)
+    except Exception:
+        qed = float("nan")
+
+    row = [
+        Descriptors.MolWt(mol),
+        Crippen.MolLogP(mol),
+        Lipinski.NumHDonors(mol),
+        Lipinski.NumHAcceptors(mol),
+        Lipinski.NumRotatableBonds(mol),
+        rdMolDescriptors.CalcTPSA(mol),
+        qed,
+        mol.GetNumHeavyAtoms(),
+        rdMolDescriptors.CalcNumAromaticRings(mol),
+        rdMolDescriptors.CalcFractionCSP3(mol),
+    ]
+    return Chem.MolToSmiles(mol), row
+
+
+def _compute_chunk(smiles_chunk):
+    return [_compute_one(s) for s in smiles_chunk]
+
+
+def _remember(smiles, canonical, row):
+    with _lock:
+        _canonical[smiles] = canonical
+        if canonical is None:
+            return
+        _memo[canonical] = row
+        _memo.move_to_end(canonical)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+        if len(_canonical) > 2 * MEMO_SIZE:
+            _canonical.clear()
+
+
+def _lookup(smiles):
+    with _lock:
+        if smiles not in _canonical:
+            return False, None
+        canonical = _canonical[smiles]
+        if canonical is None:
+            return True, None          # known-invalid SMILES
+        row = _memo.get(canonical)
+        if row is None:
+            return False, None         # evicted
+        return True, row
+
+
+def compute_descriptors(smiles_list, n_jobs=None, as_frame=False):
+    """
+    Descriptor matrix for a list of SMILES.
+
+    Args:
+        smiles_list: iterable of SMILES strings
+        n_jobs: worker processes for large batches (default: all cores)
+        as_frame: return a pandas DataFrame indexed by input SMILES
+
+    Returns:
+        np.ndarray of shape (n, len(DESCRIPTOR_NAMES)); rows of NaN for
+        SMILES that do not parse.
+    """
+    smiles_list = list(smiles_list)
+    out = np.full((len(smiles_list), len(DESCRIPTOR_NAMES)), np.nan)
+
+    todo = {}
+    for i, smi in enumerate(smiles_list):
+        found, row = _lookup(smi)
+        if found:
+            if row is not None:
+                out[i] = row
+        else:
+            todo.setdefault(smi, []).append(i)
+
+    pending = list(todo)
+    if pending:
+        if len(pending) >= PARALLEL_THRESHOLD:
+            workers = n_jobs or os.cpu_count() or 1
+            chunks = [
+                pending[i:i + CHUNK_SIZE]
+                for i in range(0, len(pending), CHUNK_SIZE)
+            ]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = [r for chunk in pool.map(_compute_chunk, chunks) for r in chunk]
+        else:
+            results = _compute_chunk(pending)
+
+        for smi, (canonical, row) in zip(pending, results):
+            _remember(smi, canonical, row)
+            if row is not None:
+                out[todo[smi]] = row
+
+    if as_frame:
+        import pandas as pd
+        return pd.DataFrame(out, columns=DESCRIPTOR_NAMES, index=smiles_list)
+
+    return out
+
+
+def descriptors_for(smiles):
+    """
+    Descriptor dict for one SMILES, or None if it does not parse.
+    """
+    row = compute_descriptors([smiles])[0]
+    if np.isnan(row[0]):
+        return None
+    return dict(zip(DESCRIPTOR_NAMES, row.tolist()))
+
+
+def clear_memo():
+    with _lock:
+        _memo.clear()
+        _canonical.clear()
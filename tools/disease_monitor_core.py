@@ -1,10 +1,17 @@
+import os
+import re
+import json
 from collections import defaultdict
 from datetime import datetime
-from tools.pubmed_live import fetch_pubmed_articles
-from tools.gene_extraction import extract_genes
+from tools.pubmed_live import fetch_pubmed_articles, fetch_pubmed_articles_since
+from tools.gene_extraction import iter_gene_mentions
 
 CURRENT_YEAR = datetime.utcnow().year
 
+MONITOR_STATE_DIR = os.path.join("data", "cache", "disease_monitor")
+
+MONITOR_MAX_RESULTS = 25          # articles per snapshot (first / non-incremental run)
+
 
 def _fake_timeline_for_gene(gene: str):
     """
@@ -25,47 +32,137 @@ def _fake_timeline_for_gene(gene: str):
     return timeline
 
 
-def run_disease_monitor(disease: str):
+# ============================================================
+# MENTION TABLE (ONE EXTRACTION PASS PER ARTICLE)
+# ============================================================
+
+def build_mention_table(articles):
+    """
+    Extract genes once per article.
+
+    Returns:
+        list[tuple]: (gene, year, pmid) rows, one per gene per article
+    """
+    usable = [
+        a for a in articles
+        if a.get("abstract") and a.get("year") and a["year"] <= CURRENT_YEAR
+    ]
+
+    docs = iter_gene_mentions(
+        (a["abstract"] for a in usable),
+        ner=True,
+        include_aliases=False
+    )
+
+    table = []
+    for article, doc in zip(usable, docs):
+        for gene in sorted(doc["counts"]):
+            table.append((gene, article["year"], str(article.get("pmid", ""))))
+    return table
+
+
+def aggregate_mentions(table):
+    """
+    Gene list and per-year article counts from a mention table.
+
+    Returns:
+        (genes: list[str], timeline: {gene: {year: n_articles}})
+    """
+    articles = defaultdict(lambda: defaultdict(set))
+    for gene, year, pmid in table:
+        articles[gene][year].add(pmid)
+
+    timeline = {
+        gene: {year: len(pmids) for year, pmids in years.items()}
+        for gene, years in articles.items()
+    }
+    return sorted(timeline), timeline
+
+
+# ============================================================
+# INCREMENTAL STATE (PER DISEASE)
+# ============================================================
+
+def _state_path(disease: str):
+    slug = re.sub(r"[^a-z0-9]+", "_", disease.lower()).strip("_") or "disease"
+    return os.path.join(MONITOR_STATE_DIR, f"{slug}.json")
+
+
+def load_monitor_state(disease: str):
+    try:
+        with open(_state_path(disease), encoding="utf-8") as f:
+            state = json.load(f)
+        state["mentions"] = [tuple(m) for m in state.get("mentions", [])]
+        return state
+    except (OSError, ValueError):
+        return {"last_run": None, "pmids": [], "mentions": []}
+
+
+def save_monitor_state(disease: str, state: dict):
+    path = _state_path(disease)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        print("⚠️ Could not save disease monitor state:", e)
+
+
+# ============================================================
+# DISEASE MONITOR
+# ============================================================
+
+def run_disease_monitor(disease: str, incremental: bool = False):
     """
     Disease monitor core with:
-    - Gene extraction
+    - Gene extraction (once per article → (gene, year, pmid) table)
     - REAL timeline if usable
     - SYNTHETIC timeline if not
-    """
 
-    articles = fetch_pubmed_articles(disease, max_results=25)
+    incremental=True only fetches and processes articles added to PubMed
+    since the last run for this disease (every page of them), and merges
+    them into the stored mention table. Non-incremental runs work on a
+    fresh snapshot and leave that stored state alone.
+    """
 
-    texts = []
-    year_to_texts = defaultdict(list)
+    today = datetime.utcnow().strftime("%Y/%m/%d")
 
-    for a in articles:
-        abstract = a.get("abstract")
-        year = a.get("year")
+    if incremental:
+        state = load_monitor_state(disease)
+        seen = set(state["pmids"])
 
-        if abstract and year and year <= CURRENT_YEAR:
-            texts.append(abstract)
-            year_to_texts[year].append(abstract)
+        if state["last_run"]:
+            articles, complete = fetch_pubmed_articles_since(disease, state["last_run"])
+        else:
+            articles, complete = fetch_pubmed_articles(
+                disease, max_results=MONITOR_MAX_RESULTS
+            ), True
+        new_articles = [a for a in articles if str(a.get("pmid", "")) not in seen]
+
+        table = state["mentions"] + build_mention_table(new_articles)
+        pmids = sorted(seen | {str(a.get("pmid", "")) for a in new_articles})
+
+        # Offline, nothing new could be listed → keep the old watermark
+        save_monitor_state(disease, {
+            "last_run": today if complete else state["last_run"],
+            "pmids": pmids,
+            "mentions": table
+        })
+    else:
+        articles = fetch_pubmed_articles(disease, max_results=MONITOR_MAX_RESULTS)
+        table = build_mention_table(articles)
 
     # ----------------------------
-    # Gene extraction
+    # Aggregate: genes + REAL timeline
     # ----------------------------
-    genes = extract_genes(texts) if texts else []
+    genes, real_timeline = aggregate_mentions(table)
 
     # Fallback genes (never empty UI)
     if not genes:
         genes = ["NLRP3", "TLR2", "PYCARD", "BDNF", "GFAP", "TSPO"]
 
-    # ----------------------------
-    # Build REAL timeline
-    # ----------------------------
-    real_timeline = defaultdict(lambda: defaultdict(int))
-
-    for year, abstracts in year_to_texts.items():
-        yearly_genes = extract_genes(abstracts)
-        for g in yearly_genes:
-            if g in genes:
-                real_timeline[g][year] += 1
-
     # ----------------------------
     # FINAL timeline (hybrid)
     # ----------------------------
@@ -0,0 +1,195 @@
+# ============================================================
+# DOCKING RESULT CACHE (CONTENT-ADDRESSED, ON DISK)
+# ============================================================
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+# ============================================================
+# PATH CONFIGURATION
+# ============================================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+CACHE_DIR = os.path.join(BASE_DIR, "data", "docking_cache")
+
+# Size bound for the whole cache directory (bytes)
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+# ============================================================
+# KEYING
+# ============================================================
+
+def _file_digest(path: str):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def docking_cache_key(receptor_path: str, ligand_path: str, box: dict, params: dict):
+    """
+    Build a content-addressed key for one docking run.
+
+    The key changes whenever the receptor bytes, ligand bytes, search
+    box or vina parameters change — file names do not matter.
+    """
+    payload = json.dumps(
+        {
+            "receptor": _file_digest(receptor_path),
+            "ligand": _file_digest(ligand_path),
+            "box": box,
+            "params": params,
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ============================================================
+# CACHE
+# ============================================================
+
+class DockingCache:
+    """
+    Persistent docking cache.
+
+    ✔ One JSON file per key under data/docking_cache/<key[:2]>/
+    ✔ Hit / miss counters
+    ✔ LRU eviction (by file mtime) once max_bytes is exceeded
+    ✔ Thread-safe (used by the batch docking pool)
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._size = None   # lazily computed on first write
+
+    def _path(self, key: str):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _entries(self):
+        if not os.path.isdir(self.cache_dir):
+            return []
+
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def get(self, key: str):
+        """
+        Returns:
+            dict | None: {"affinity": float | None, "poses": str | None, ...}
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)   # mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, affinity, poses=None, meta=None):
+        entry = {
+            "affinity": affinity,
+            "poses": poses,
+            "meta": meta or {},
+            "created": time.time(),
+        }
+        data = json.dumps(entry).encode("utf-8")
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+
+        with self._lock:
+            # Overwriting a key replaces its bytes rather than adding to them
+            try:
+                old_size = os.path.getsize(path)
+            except OSError:
+                old_size = 0
+            os.replace(tmp, path)
+
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data) - old_size
+
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Drop least-recently-used entries until under 90% of max_bytes.
+        Caller holds the lock.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.evictions += 1
+            except OSError:
+                continue
+
+        self._size = total
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries()),
+                "size_bytes": sum(size for _, size, _ in self._entries()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Shared process-wide instance
+DOCKING_CACHE = DockingCache()
@@ -3,15 +3,21 @@
 # ============================================================
 
 import os
+import time
+import tempfile
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from tools.docking_cache import DOCKING_CACHE, docking_cache_key
+from tools.pocket_detection import get_pocket_box
 
 
 # ============================================================
 # PATH CONFIGURATION
 # ============================================================
 
-# Expected directory structure
-BASE_DIR = os.getcwd()
+# Expected directory structure (project root, like the preparation tools)
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
 ALPHAFOLD_DIR = os.path.join(BASE_DIR, "data", "alphafold_structures")
 LIGAND_DIR = os.path.join(BASE_DIR, "data", "ligands")
@@ -19,6 +25,15 @@ LIGAND_DIR = os.path.join(BASE_DIR, "data", "ligands")
 # Vina executable (works in WSL OR Windows PATH)
 VINA_CMD = "vina"
 
+VINA_TIMEOUT = 300      # seconds per docking job
+VINA_CPU_PER_JOB = 1    # passed to vina --cpu in batch mode
+
+# Fallback search box (Å) when no pocket is detected
+DEFAULT_BOX = {
+    "center_x": 0, "center_y": 0, "center_z": 0,
+    "size_x": 25, "size_y": 25, "size_z": 25,
+}
+
 
 # ============================================================
 # SAFETY CHECKS
@@ -32,56 +47,281 @@ def _exists(path):
 # DOCKING FUNCTION
 # ============================================================
 
-def run_docking_vina(gene: str, ligand_name: str):
+def _parse_affinity(output: str):
     """
-    Runs AutoDock Vina docking and returns binding affinity (kcal/mol)
+    Extract the best (first pose) affinity from vina stdout.
+    """
+    for line in output.splitlines():
+        line = line.strip()
+        if line.startswith("1 "):  # first docking pose
+            return float(line.split()[1])
+
+    return None
+
+
+def resolve_box(receptor_pdb: str, box: dict | None = None):
+    """
+    Pick the docking box: explicit > detected pocket > DEFAULT_BOX.
+    """
+    box = box or get_pocket_box(receptor_pdb) or DEFAULT_BOX
+    return {k: box[k] for k in DEFAULT_BOX}
+
+
+def dock_vina(
+    gene: str,
+    ligand_name: str,
+    cpu: int | None = None,
+    timeout: int = VINA_TIMEOUT,
+    use_cache: bool = True,
+    box: dict | None = None
+):
+    """
+    Run (or recall from cache) one AutoDock Vina docking.
+
+    Args:
+        cpu (int | None): vina --cpu (None = let vina use all cores)
+        timeout (int): subprocess timeout in seconds
+        use_cache (bool): consult / fill the on-disk docking cache
+        box (dict | None): explicit search box; default is the detected
+            pocket of the receptor, then DEFAULT_BOX
 
     Returns:
-        float | None
+        dict:
+        {
+          "affinity": float | None,   # kcal/mol, best pose
+          "poses": str | None,        # vina output PDBQT (all modes)
+          "cached": bool,
+          "box": dict                 # search box actually used
+        }
     """
 
     receptor_pdb = os.path.join(ALPHAFOLD_DIR, f"{gene}.pdb")
     ligand_pdbqt = os.path.join(LIGAND_DIR, f"{ligand_name}.pdbqt")
 
+    failed = {"affinity": None, "poses": None, "cached": False, "box": None}
+
     # ---------- SAFETY ----------
     if not _exists(receptor_pdb):
         print(f"⚠️ Receptor missing: {receptor_pdb}")
-        return None
+        return failed
 
     if not _exists(ligand_pdbqt):
         print(f"⚠️ Ligand missing: {ligand_pdbqt}")
-        return None
+        return failed
+
+    box = resolve_box(receptor_pdb, box)
+
+    # ---------- CACHE LOOKUP ----------
+    key = None
+    if use_cache:
+        key = docking_cache_key(
+            receptor_pdb,
+            ligand_pdbqt,
+            box,
+            {"vina": VINA_CMD}
+        )
+        hit = DOCKING_CACHE.get(key)
+        if hit is not None:
+            return {
+                "affinity": hit.get("affinity"),
+                "poses": hit.get("poses"),
+                "cached": True,
+                "box": box
+            }
 
     # ---------- VINA COMMAND ----------
+    # Poses go to a private temp dir: a failed run can never pick up old
+    # poses, and nothing is left on disk once the text is in the cache
+    with tempfile.TemporaryDirectory(prefix="vina_") as work_dir:
+        out_pdbqt = os.path.join(work_dir, f"{gene}_{ligand_name}_out.pdbqt")
+        run = _run_vina(receptor_pdb, ligand_pdbqt, box, out_pdbqt, cpu, timeout)
+
+    if run is None:
+        return failed
+    affinity, poses = run
+
+    # Only successful runs are worth remembering
+    if key and affinity is not None:
+        DOCKING_CACHE.put(
+            key,
+            affinity,
+            poses=poses,
+            meta={"gene": gene, "ligand": ligand_name}
+        )
+
+    return {"affinity": affinity, "poses": poses, "cached": False, "box": box}
+
+
+def _run_vina(receptor_pdb, ligand_pdbqt, box, out_pdbqt, cpu, timeout):
+    """
+    One vina subprocess.
+
+    Returns:
+        (affinity | None, poses PDBQT text | None), or None if vina
+        could not be run
+    """
     cmd = [
         VINA_CMD,
         "--receptor", receptor_pdb,
         "--ligand", ligand_pdbqt,
-        "--center_x", "0",
-        "--center_y", "0",
-        "--center_z", "0",
-        "--size_x", "25",
-        "--size_y", "25",
-        "--size_z", "25"
+        "--center_x", str(box["center_x"]),
+        "--center_y", str(box["center_y"]),
+        "--center_z", str(box["center_z"]),
+        "--size_x", str(box["size_x"]),
+        "--size_y", str(box["size_y"]),
+        "--size_z", str(box["size_z"]),
+        "--out", out_pdbqt
     ]
 
+    if cpu:
+        cmd += ["--cpu", str(cpu)]
+
     try:
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
-            timeout=300
+            timeout=timeout
         )
 
         output = result.stdout + result.stderr
 
         # ---------- PARSE SCORE ----------
-        for line in output.splitlines():
-            line = line.strip()
-            if line.startswith("1 "):  # first docking pose
-                return float(line.split()[1])
+        affinity = _parse_affinity(output)
 
     except Exception as e:
         print("❌ Docking error:", e)
+        return None
 
-    return None
+    poses = None
+    if _exists(out_pdbqt):
+        with open(out_pdbqt, encoding="utf-8", errors="ignore") as f:
+            poses = f.read()
+
+    return affinity, poses
+
+
+def run_docking_vina(
+    gene: str,
+    ligand_name: str,
+    cpu: int | None = None,
+    timeout: int = VINA_TIMEOUT,
+    use_cache: bool = True,
+    box: dict | None = None
+):
+    """
+    Runs AutoDock Vina docking and returns binding affinity (kcal/mol)
+
+    Returns:
+        float | None
+    """
+    return dock_vina(
+        gene,
+        ligand_name,
+        cpu=cpu,
+        timeout=timeout,
+        use_cache=use_cache,
+        box=box
+    )["affinity"]
+
+
+# ============================================================
+# BATCH DOCKING (PARALLEL)
+# ============================================================
+
+def _default_workers(cpu_per_job: int):
+    """
+    Size the pool so that workers × vina --cpu ≈ machine cores.
+    """
+    cores = os.cpu_count() or 1
+    return max(1, cores // max(1, cpu_per_job))
+
+
+def _dock_job(gene: str, ligand_name: str, cpu_per_job: int, timeout: int):
+    start = time.perf_counter()
+    result = dock_vina(
+        gene,
+        ligand_name,
+        cpu=cpu_per_job,
+        timeout=timeout
+    )
+
+    return {
+        "gene": gene,
+        "ligand": ligand_name,
+        "affinity": result["affinity"],
+        "cached": result["cached"],
+        "wall_time": round(time.perf_counter() - start, 3)
+    }
+
+
+def iter_docking_batch(
+    jobs,
+    cpu_per_job: int = VINA_CPU_PER_JOB,
+    max_workers: int | None = None,
+    timeout: int = VINA_TIMEOUT
+):
+    """
+    Dock many (gene, ligand_name) pairs on a bounded worker pool and
+    yield each result as soon as its vina run finishes.
+
+    Each worker only waits on a vina subprocess, so threads are enough;
+    the real parallelism comes from the concurrent vina processes.
+
+    Yields:
+        dict:
+        {
+          "gene": str,
+          "ligand": str,
+          "affinity": float | None,
+          "cached": bool,
+          "wall_time": float   # seconds
+        }
+    """
+
+    jobs = list(jobs)
+    if not jobs:
+        return
+
+    workers = max_workers or _default_workers(cpu_per_job)
+    workers = min(workers, len(jobs))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_dock_job, gene, ligand, cpu_per_job, timeout): (gene, ligand)
+            for gene, ligand in jobs
+        }
+
+        for future in as_completed(futures):
+            gene, ligand = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                print("❌ Docking job error:", gene, ligand, e)
+                yield {
+                    "gene": gene,
+                    "ligand": ligand,
+                    "affinity": None,
+                    "cached": False,
+                    "wall_time": None
+                }
+
+
+def run_docking_batch(
+    jobs,
+    cpu_per_job: int = VINA_CPU_PER_JOB,
+    max_workers: int | None = None,
+    timeout: int = VINA_TIMEOUT
+):
+    """
+    Blocking wrapper around iter_docking_batch.
+
+    Returns:
+        list[dict] in completion order
+    """
+    return list(iter_docking_batch(
+        jobs,
+        cpu_per_job=cpu_per_job,
+        max_workers=max_workers,
+        timeout=timeout
+    ))
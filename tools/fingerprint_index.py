@@ -0,0 +1,207 @@
+# ============================================================
+# MEMORY-MAPPED FINGERPRINT INDEX (SHARED BY SIMILARITY / SUBSTRUCTURE)
+# ============================================================
+
+import os
+import json
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from tools.columns import StringColumn
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+INDEX_DIR = os.path.join("data", "index")
+
+BUILD_CHUNK = 2000
+
+
+# ------------------------------------------------------------
+# INDEX
+# ------------------------------------------------------------
+
+class FingerprintIndex:
+    """
+    Packed fingerprints for the compound library, one row per molecule.
+
+    Files in INDEX_DIR, all prefixed with PREFIX:
+      - {PREFIX}_fps.npy                     uint8[n, FP_BYTES] fingerprints
+      - {PREFIX}_{array}.npy                 per-row arrays from extra_arrays()
+      - {PREFIX}_{ids,smiles}_{data,offsets}.npy
+                                             packed ids / SMILES (StringColumn)
+      - {PREFIX}_meta.json                   settings and the source CSV stamp
+
+    Everything except the small meta file is memory-mapped, so opening
+    a million-compound index does not parse or copy its strings.
+
+    Subclasses set PREFIX, FP_BYTES, ARRAYS and fingerprint_chunk (a
+    module-level function, so the build can run in a process pool).
+    """
+
+    PREFIX = None
+    FP_BYTES = None
+    ARRAYS = ()                  # names of extra per-row arrays
+    LABEL = "Fingerprint"
+
+    fingerprint_chunk = None     # smiles list → (uint8[n, FP_BYTES], ok mask)
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        self.index_dir = index_dir
+        self.fps = None
+        self.ids = []
+        self.smiles = []
+        self.source = None
+        for name in self.ARRAYS:
+            setattr(self, name, None)
+
+    def _path(self, name):
+        return os.path.join(self.index_dir, f"{self.PREFIX}_{name}")
+
+    def files(self):
+        names = ["fps.npy", "meta.json"]
+        names += [f"{a}.npy" for a in self.ARRAYS]
+        names += [f"{c}_{part}.npy" for c in ("ids", "smiles") for part in ("data", "offsets")]
+        return [self._path(n) for n in names]
+
+    # -------------------------
+    # Subclass hooks
+    # -------------------------
+    def extra_arrays(self, fps: np.ndarray) -> dict:
+        return {}
+
+    def meta(self) -> dict:
+        return {}
+
+    # -------------------------
+    # Build
+    # -------------------------
+    def build(self, records, source: dict | None = None, n_jobs: int | None = None):
+        """
+        Build the index from (id, smiles) pairs and write it to disk.
+        """
+        records = [(str(i), s) for i, s in records if s]
+        smiles = [s for _, s in records]
+
+        chunks = [
+            smiles[i:i + BUILD_CHUNK]
+            for i in range(0, len(smiles), BUILD_CHUNK)
+        ]
+
+        fingerprint_chunk = type(self).fingerprint_chunk
+        if len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count() or 1) as pool:
+                parts = list(pool.map(fingerprint_chunk, chunks))
+        else:
+            parts = [fingerprint_chunk(c) for c in chunks]
+
+        if parts:
+            fps = np.concatenate([p[0] for p in parts])
+            ok = np.concatenate([p[1] for p in parts])
+        else:
+            fps = np.zeros((0, self.FP_BYTES), dtype=np.uint8)
+            ok = np.zeros(0, dtype=bool)
+
+        fps = fps[ok]
+        kept = [r for r, good in zip(records, ok) if good]
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        np.save(self._path("fps.npy"), fps)
+        for name, values in self.extra_arrays(fps).items():
+            np.save(self._path(f"{name}.npy"), values)
+        for name, column in (
+            ("ids", StringColumn.from_strings([i for i, _ in kept])),
+            ("smiles", StringColumn.from_strings([s for _, s in kept])),
+        ):
+            np.save(self._path(f"{name}_data.npy"), column.data)
+            np.save(self._path(f"{name}_offsets.npy"), column.offsets)
+        with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"source": source, "count": len(kept), **self.meta()}, f)
+
+        print(f"✅ {self.LABEL} index built: {len(kept)} fingerprints")
+        return self.open()
+
+    # -------------------------
+    # Open (memory-mapped)
+    # -------------------------
+    def open(self):
+        self.fps = np.load(self._path("fps.npy"), mmap_mode="r")
+        for name in self.ARRAYS:
+            setattr(self, name, np.load(self._path(f"{name}.npy"), mmap_mode="r"))
+        self.ids, self.smiles = (
+            StringColumn(
+                np.load(self._path(f"{name}_data.npy"), mmap_mode="r"),
+                np.load(self._path(f"{name}_offsets.npy"), mmap_mode="r"),
+            )
+            for name in ("ids", "smiles")
+        )
+        with open(self._path("meta.json"), encoding="utf-8") as f:
+            self.source = json.load(f).get("source")
+        return self
+
+    def exists(self):
+        return all(os.path.exists(p) for p in self.files())
+
+    def __len__(self):
+        return 0 if self.fps is None else len(self.fps)
+
+
+# ------------------------------------------------------------
+# SHARED INDEXES OVER THE COMPOUND LIBRARY
+# ------------------------------------------------------------
+
+_INDEXES = {}                # index class → opened index
+_LOCKS = {}                  # index class → build lock
+_LOCKS_LOCK = threading.Lock()
+
+
+def library_stamp(path: str) -> dict:
+    """
+    Identity of a library file; an index is reused only while it matches.
+    """
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def get_library_index(index_cls, rebuild: bool = False):
+    """
+    index_cls over the compound loader's library, built on first use and
+    rebuilt when the compound CSV changes.
+
+    Returns:
+        FingerprintIndex | None (if the library is missing)
+    """
+    from tools.compound_loader import COMPOUND_FILE
+    from tools.compound_store import get_compound_store
+
+    if not os.path.exists(COMPOUND_FILE):
+        return None
+
+    stamp = library_stamp(COMPOUND_FILE)
+
+    with _LOCKS_LOCK:
+        lock = _LOCKS.setdefault(index_cls, threading.Lock())
+
+    with lock:
+        index = _INDEXES.get(index_cls)
+        if index is not None and index.source == stamp and not rebuild:
+            return index
+
+        index = index_cls()
+        if not rebuild and index.exists():
+            index.open()
+            if index.source == stamp:
+                _INDEXES[index_cls] = index
+                return index
+
+        store = get_compound_store(COMPOUND_FILE)
+        names, smiles = store.columns["name"], store.columns["smiles"]
+        records = ((names[i], smiles[i]) for i in range(len(store)))
+
+        index = index.build(records, source=stamp)
+        _INDEXES[index_cls] = index
+        return index
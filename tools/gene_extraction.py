@@ -2,77 +2,31 @@
 # HGNC-AWARE, VERSION-PROOF GENE EXTRACTION MODULE
 # ============================================================
 
-import os
 import re
-from typing import List, Set
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set
 
-# ------------------------------------------------------------
-# 1. Locate HGNC file
-# ------------------------------------------------------------
-
-def find_hgnc_file() -> str:
-    base = os.path.dirname(os.path.dirname(__file__))
-    data_dir = os.path.join(base, "data")
-
-    for f in os.listdir(data_dir):
-        if "hgnc" in f.lower() and f.lower().endswith(".txt"):
-            return os.path.join(data_dir, f)
-
-    raise FileNotFoundError("❌ No HGNC .txt file found in data/")
+from tools.hgnc_index import APPROVED_SYMBOLS, find_hgnc_file, get_hgnc_index
 
 # ------------------------------------------------------------
-# 2. Load HGNC gene symbols (AUTO COLUMN DETECTION)
+# 1–2. HGNC symbols (precompiled index, opened lazily)
 # ------------------------------------------------------------
 
 def load_hgnc_genes() -> Set[str]:
-    path = find_hgnc_file()
-    genes = set()
-
-    with open(path, encoding="utf-8", errors="ignore") as f:
-        header = f.readline().strip().lower().split("\t")
-
-        symbol_candidates = {
-            "approved symbol",
-            "symbol",
-            "gene symbol",
-            "approved_symbol",
-            "hgnc symbol",
-        }
-
-        symbol_idx = None
-        for i, col in enumerate(header):
-            if col.strip() in symbol_candidates:
-                symbol_idx = i
-                break
-
-        if symbol_idx is None:
-            raise RuntimeError(
-                f"❌ HGNC symbol column not found.\n"
-                f"Found columns: {header[:10]}"
-            )
-
-        for line in f:
-            parts = line.rstrip("\n").split("\t")
-            if len(parts) <= symbol_idx:
-                continue
-
-            gene = parts[symbol_idx].upper().strip()
-
-            if (
-                2 <= len(gene) <= 10
-                and gene[0].isalpha()
-                and gene.isalnum()
-            ):
-                genes.add(gene)
+    genes = {
+        gene for gene in get_hgnc_index().symbols()
+        if 2 <= len(gene) <= 10 and gene[0].isalpha() and gene.isalnum()
+    }
 
     if not genes:
         raise RuntimeError("❌ HGNC parsed but ZERO genes extracted.")
 
-    print(f"✅ HGNC loaded successfully: {len(genes)} genes")
     return genes
 
 
-HGNC_GENES = load_hgnc_genes()
+# Set-like; nothing is read until the first membership test
+HGNC_GENES = APPROVED_SYMBOLS
 
 # ------------------------------------------------------------
 # 3. STOPWORDS (NEVER genes)
@@ -111,24 +65,18 @@ GENE_REGEX = re.compile(r"\b[A-Z][A-Z0-9]{1,9}\b")
 # 5. Optional Biomedical NER (SAFE)
 # ------------------------------------------------------------
 
-NER_PIPELINE = None
+NER_MODEL = "d4data/biomedical-ner-all"
 
-def load_ner():
-    global NER_PIPELINE
-    if NER_PIPELINE:
-        return NER_PIPELINE
 
-    try:
-        from transformers import pipeline
-        NER_PIPELINE = pipeline(
-            "ner",
-            model="d4data/biomedical-ner-all",
-            aggregation_strategy="simple"
-        )
-    except Exception:
-        NER_PIPELINE = None
+def load_ner():
+    """
+    Shared NER service (model loaded once per process), or None if
+    transformers / the model are unavailable.
+    """
+    from tools.ner_service import get_ner_service
 
-    return NER_PIPELINE
+    service = get_ner_service(NER_MODEL)
+    return service if service.available() else None
 
 # ------------------------------------------------------------
 # 6. OPTIONAL FALLBACK (BIOLOGICALLY VERIFIED)
@@ -148,42 +96,206 @@ KNOWN_DISEASE_GENES = {
 
 def extract_genes(texts: List[str], disease: str = None) -> List[str]:
     found = set()
-    ner = load_ner()
 
-    for text in texts:
-        text_u = text.upper()
+    # -------- RULE-BASED PASS + NER ASSIST (BATCHED) --------
+    for doc in iter_gene_mentions(texts, ner=True, include_aliases=False):
+        found.update(doc["counts"])
+
+    # -------- SAFE FALLBACK (OPTIONAL) --------
+    if not found and disease:
+        found.update(KNOWN_DISEASE_GENES.get(disease.lower(), []))
+
+    return sorted(found)
 
-        # -------- RULE-BASED PASS --------
-        for token in GENE_REGEX.findall(text_u):
 
-            if len(token) < 4 and token not in SHORT_GENE_WHITELIST:
-                continue
+# ------------------------------------------------------------
+# 8. HGNC VOCABULARY (SYMBOLS + ALIASES + PREVIOUS SYMBOLS)
+# ------------------------------------------------------------
 
-            if token in STOPWORDS:
-                continue
+MENTION_FORM = re.compile(r"^[A-Z][A-Z0-9-]{1,14}$")
 
-            if token not in HGNC_GENES:
-                continue
 
-            found.add(token)
+def _valid_mention_form(form: str) -> bool:
+    if not MENTION_FORM.match(form):
+        return False
+    if form in STOPWORDS:
+        return False
+    return len(form) >= 4 or form in SHORT_GENE_WHITELIST
 
-        # -------- NER ASSIST (STRICT FILTER) --------
-        if ner:
-            try:
-                for ent in ner(text):
-                    word = ent.get("word", "").replace("##", "").upper()
 
-                    if (
-                        word in HGNC_GENES
-                        and word not in STOPWORDS
-                        and (len(word) >= 4 or word in SHORT_GENE_WHITELIST)
-                    ):
-                        found.add(word)
-            except Exception:
-                pass
+def load_hgnc_vocabulary(include_aliases: bool = True) -> Dict[str, str]:
+    """
+    Surface form → approved HGNC symbol.
 
-    # -------- SAFE FALLBACK (OPTIONAL) --------
-    if not found and disease:
-        found.update(KNOWN_DISEASE_GENES.get(disease.lower(), []))
+    Approved symbols always win over aliases; aliases shared by several
+    genes are dropped as ambiguous.
+    """
+    vocabulary = get_hgnc_index().vocabulary(include_aliases=include_aliases)
+    return {
+        form: symbol
+        for form, symbol in vocabulary.items()
+        if _valid_mention_form(form)
+    }
 
-    return sorted(found)
+
+# ------------------------------------------------------------
+# 9. TRIE-COMPILED MULTI-PATTERN MATCHER
+# ------------------------------------------------------------
+
+# Length-preserving ASCII uppercasing, so match offsets index the original text
+_ASCII_UPPER = str.maketrans("abcdefghijklmnopqrstuvwxyz", "ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+
+def _trie_pattern(node: dict) -> str:
+    """
+    Serialize a character trie into a regex; shared prefixes are matched
+    once, and the greedy optional tails make the longest form win.
+    """
+    end = "" in node
+    branches = []
+    leaves = []
+
+    for ch in sorted(k for k in node if k):
+        tail = _trie_pattern(node[ch])
+        if tail:
+            branches.append(re.escape(ch) + tail)
+        else:
+            leaves.append(re.escape(ch))
+
+    if leaves:
+        branches.append(leaves[0] if len(leaves) == 1 else "[" + "".join(leaves) + "]")
+
+    if not branches:
+        return ""
+
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if end else body
+
+
+class GeneMatcher:
+    """
+    One compiled automaton over every surface form.
+
+    Matching runs inside the regex engine (C), one pass per document,
+    at word boundaries only.
+    """
+
+    def __init__(self, vocabulary: Dict[str, str]):
+        self.vocabulary = vocabulary
+
+        trie = {}
+        for form in vocabulary:
+            node = trie
+            for ch in form:
+                node = node.setdefault(ch, {})
+            node[""] = True
+
+        self.pattern = re.compile(
+            r"(?<![A-Z0-9])(" + _trie_pattern(trie) + r")(?![A-Z0-9])"
+        ) if vocabulary else None
+
+    def finditer(self, text: str):
+        """
+        Yield (symbol, start, end, surface form) for one document.
+        """
+        if not text or self.pattern is None:
+            return
+        for m in self.pattern.finditer(text.translate(_ASCII_UPPER)):
+            form = m.group(1)
+            yield self.vocabulary[form], m.start(1), m.end(1), form
+
+
+@lru_cache(maxsize=2)
+def _compiled_matcher(include_aliases: bool) -> GeneMatcher:
+    vocabulary = load_hgnc_vocabulary(include_aliases=include_aliases)
+    matcher = GeneMatcher(vocabulary)
+    print(f"✅ Gene matcher compiled: {len(vocabulary)} surface forms")
+    return matcher
+
+
+def get_gene_matcher(include_aliases: bool = True) -> GeneMatcher:
+    """
+    Process-wide matcher, compiled once per vocabulary variant.
+    """
+    return _compiled_matcher(bool(include_aliases))
+
+
+# ------------------------------------------------------------
+# 10. STREAMING EXTRACTION (PER-DOCUMENT COUNTS + OFFSETS)
+# ------------------------------------------------------------
+
+def _ner_mentions(ner, texts: List[str]):
+    """
+    NER second pass; one list of (symbol, start, end, word) per text.
+    """
+    mentions = []
+    for ents in ner.analyze(texts):
+        found = []
+        for ent in ents:
+            word = ent.get("word", "").replace("##", "").upper()
+            if word in HGNC_GENES and _valid_mention_form(word):
+                found.append((word, ent.get("start"), ent.get("end"), word))
+        mentions.append(found)
+    return mentions
+
+
+def iter_gene_mentions(
+    texts: Iterable[str],
+    ner: bool = False,
+    ner_batch_size: int = 256,
+    include_aliases: bool = True
+):
+    """
+    Stream gene mentions document by document.
+
+    Args:
+        texts: any iterable of abstracts (consumed lazily)
+        ner: add transformer NER hits as a second pass, batched
+        ner_batch_size: documents buffered per NER call
+        include_aliases: match HGNC aliases / previous symbols too
+
+    Yields:
+        {
+          "doc": int,                              # position in the stream
+          "counts": {symbol: int},
+          "mentions": [(symbol, start, end, surface)],
+        }
+    """
+    matcher = get_gene_matcher(include_aliases=include_aliases)
+    pipeline = load_ner() if ner else None
+
+    def result(doc, mentions):
+        return {
+            "doc": doc,
+            "counts": dict(Counter(m[0] for m in mentions)),
+            "mentions": mentions,
+        }
+
+    if pipeline is None:
+        for doc, text in enumerate(texts):
+            yield result(doc, list(matcher.finditer(text or "")))
+        return
+
+    buffer = []
+
+    def flush():
+        extra = _ner_mentions(pipeline, [t for _, t, _ in buffer])
+        for (doc, _, mentions), ner_hits in zip(buffer, extra):
+            spans = {(m[1], m[2]) for m in mentions}
+            mentions += [m for m in ner_hits if (m[1], m[2]) not in spans]
+            mentions.sort(key=lambda m: (m[1] is None, m[1] or 0))
+            yield result(doc, mentions)
+        buffer.clear()
+
+    for doc, text in enumerate(texts):
+        text = text or ""
+        buffer.append((doc, text, list(matcher.finditer(text))))
+        if len(buffer) >= ner_batch_size:
+            yield from flush()
+
+    if buffer:
+        yield from flush()
+
+
+def extract_gene_mentions(texts: Iterable[str], **kwargs) -> List[dict]:
+    return list(iter_gene_mentions(texts, **kwargs))
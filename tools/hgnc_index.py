@@ -0,0 +1,397 @@
+# ============================================================
+# HGNC INDEX (SYMBOLS / PREVIOUS / ALIASES / IDS → SORTED ARRAYS)
+# ============================================================
+
+import os
+import json
+import threading
+
+import numpy as np
+
+from tools.columns import StringColumn
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+HGNC_FILE = os.path.join(BASE_DIR, "data", "hgnc_complete_set.txt")
+SYMBOLS_FILE = os.path.join(BASE_DIR, "tools", "hgnc_symbols.txt")
+HGNC_INDEX_DIR = os.path.join(BASE_DIR, "data", "index", "hgnc")
+
+# Key kinds, in resolution priority order
+SYMBOL, PREVIOUS, ALIAS, HGNC_ID, ENTREZ_ID, UNIPROT_ID = range(6)
+
+# Accepted header names (HGNC complete set and custom downloads)
+COLUMNS = {
+    "symbol": {"symbol", "approved symbol", "approved_symbol", "gene symbol", "hgnc symbol"},
+    "hgnc_id": {"hgnc_id", "hgnc id"},
+    "prev_symbol": {"prev_symbol", "previous symbols", "previous symbol"},
+    "alias_symbol": {"alias_symbol", "alias symbols", "alias symbol", "synonyms"},
+    "entrez_id": {"entrez_id", "ncbi gene id", "ncbi gene id(supplied by ncbi)", "entrez gene id"},
+    "uniprot_ids": {"uniprot_ids", "uniprot id", "uniprot id(supplied by uniprot)"},
+}
+
+
+# ------------------------------------------------------------
+# SOURCE FILE
+# ------------------------------------------------------------
+
+def find_hgnc_file() -> str:
+    """
+    HGNC TSV in data/ (hgnc_complete_set.txt preferred).
+    """
+    if os.path.exists(HGNC_FILE):
+        return HGNC_FILE
+
+    data_dir = os.path.dirname(HGNC_FILE)
+    if os.path.isdir(data_dir):
+        for f in sorted(os.listdir(data_dir)):
+            if "hgnc" in f.lower() and f.lower().endswith(".txt"):
+                return os.path.join(data_dir, f)
+
+    raise FileNotFoundError("❌ No HGNC .txt file found in data/")
+
+
+def _find_source():
+    try:
+        return find_hgnc_file()
+    except FileNotFoundError:
+        # Symbols-only list shipped with the repo
+        return SYMBOLS_FILE if os.path.exists(SYMBOLS_FILE) else None
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def _split(field: str):
+    return [
+        v.strip().strip('"')
+        for v in field.strip().strip('"').replace(",", "|").split("|")
+        if v.strip().strip('"')
+    ]
+
+
+def _read_genes(path: str):
+    """
+    Yield gene dicts from an HGNC TSV, or from a one-symbol-per-line list.
+    """
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        first = f.readline().rstrip("\n")
+        header = [c.strip().lower() for c in first.split("\t")]
+
+        idx = {
+            name: next((i for i, c in enumerate(header) if c in aliases), None)
+            for name, aliases in COLUMNS.items()
+        }
+
+        if idx["symbol"] is None:
+            if "\t" in first:
+                raise RuntimeError(
+                    f"❌ HGNC symbol column not found.\n"
+                    f"Found columns: {header[:10]}"
+                )
+            # Plain symbol list (no header)
+            for line in [first] + list(f):
+                symbol = line.strip().upper()
+                if symbol:
+                    yield {"symbol": symbol}
+            return
+
+        for line in f:
+            parts = line.rstrip("\n").split("\t")
+
+            def field(name):
+                i = idx[name]
+                return parts[i] if i is not None and i < len(parts) else ""
+
+            symbol = field("symbol").strip().upper()
+            if not symbol:
+                continue
+
+            yield {
+                "symbol": symbol,
+                "hgnc_id": field("hgnc_id").strip(),
+                "prev_symbol": [s.upper() for s in _split(field("prev_symbol"))],
+                "alias_symbol": [s.upper() for s in _split(field("alias_symbol"))],
+                "entrez_id": field("entrez_id").strip(),
+                "uniprot_ids": [s.upper() for s in _split(field("uniprot_ids"))],
+            }
+
+
+# ------------------------------------------------------------
+# INDEX
+# ------------------------------------------------------------
+
+class HGNCIndex:
+    """
+    Compact, memory-mapped HGNC lookup tables.
+
+    Files in HGNC_INDEX_DIR:
+      - genes_*.npy   per-gene columns (symbol, hgnc_id, entrez_id, uniprot_ids),
+                      genes sorted by approved symbol
+      - keys.npy      every lookup key (symbol, previous, alias, IDs) as a
+                      sorted fixed-width byte array
+      - key_gene.npy  int32 gene row per key
+      - key_kind.npy  int8 key kind (SYMBOL … UNIPROT_ID)
+      - meta.json     source stamp and counts
+
+    Lookups are np.searchsorted over the sorted keys; opening the index
+    only maps the files.
+    """
+
+    GENE_COLUMNS = ("symbol", "hgnc_id", "entrez_id", "uniprot_ids")
+
+    def __init__(self, index_dir: str = HGNC_INDEX_DIR):
+        self.index_dir = index_dir
+        self.genes = {}
+        self.keys = None
+        self.key_gene = None
+        self.key_kind = None
+        self.source = None
+
+    def _path(self, name):
+        return os.path.join(self.index_dir, name)
+
+    # -------------------------
+    # Build
+    # -------------------------
+    def build(self, source_path: str):
+        genes = sorted(_read_genes(source_path), key=lambda g: g["symbol"].encode("utf-8"))
+
+        # Duplicate symbols (rare, e.g. withdrawn entries): keep the first
+        unique = []
+        for g in genes:
+            if not unique or unique[-1]["symbol"] != g["symbol"]:
+                unique.append(g)
+        genes = unique
+
+        entries = set()
+        for row, g in enumerate(genes):
+            entries.add((g["symbol"], SYMBOL, row))
+            for s in g.get("prev_symbol", []):
+                entries.add((s, PREVIOUS, row))
+            for s in g.get("alias_symbol", []):
+                entries.add((s, ALIAS, row))
+            if g.get("hgnc_id"):
+                entries.add((g["hgnc_id"].upper(), HGNC_ID, row))
+            if g.get("entrez_id"):
+                entries.add((g["entrez_id"], ENTREZ_ID, row))
+            for s in g.get("uniprot_ids", []):
+                entries.add((s, UNIPROT_ID, row))
+
+        entries = sorted(entries, key=lambda e: (e[0].encode("utf-8"), e[1], e[2]))
+
+        arrays = {}
+        for c in self.GENE_COLUMNS:
+            values = [
+                "|".join(g.get(c, [])) if isinstance(g.get(c), list) else g.get(c, "")
+                for g in genes
+            ]
+            col = StringColumn.from_strings(values)
+            arrays[f"genes_{c}_data"] = col.data
+            arrays[f"genes_{c}_offsets"] = col.offsets
+
+        arrays["keys"] = np.array([e[0].encode("utf-8") for e in entries], dtype=bytes)
+        arrays["key_kind"] = np.array([e[1] for e in entries], dtype=np.int8)
+        arrays["key_gene"] = np.array([e[2] for e in entries], dtype=np.int32)
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        for name, arr in arrays.items():
+            np.save(self._path(f"{name}.npy"), arr)
+
+        with open(self._path("meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "source": _stamp(source_path),
+                "genes": len(genes),
+                "keys": len(entries),
+            }, f)
+
+        print(f"✅ HGNC index built: {len(genes)} genes, {len(entries)} keys")
+        return self.open()
+
+    # -------------------------
+    # Open (memory-mapped)
+    # -------------------------
+    def open(self):
+        def load(name):
+            return np.load(self._path(f"{name}.npy"), mmap_mode="r")
+
+        self.genes = {
+            c: StringColumn(load(f"genes_{c}_data"), load(f"genes_{c}_offsets"))
+            for c in self.GENE_COLUMNS
+        }
+        self.keys = load("keys")
+        self.key_kind = load("key_kind")
+        self.key_gene = load("key_gene")
+
+        with open(self._path("meta.json"), encoding="utf-8") as f:
+            self.source = json.load(f).get("source")
+        return self
+
+    def exists(self):
+        return os.path.exists(self._path("meta.json"))
+
+    def __len__(self):
+        return len(self.genes["symbol"]) if self.genes else 0
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def lookup(self, key: str):
+        """
+        All (gene row, kind) pairs for a key, best kind first.
+        """
+        if not key:
+            return []
+        k = key.strip().upper().encode("utf-8")
+        if len(k) > self.keys.dtype.itemsize:
+            return []
+
+        lo = int(np.searchsorted(self.keys, k, side="left"))
+        hi = int(np.searchsorted(self.keys, k, side="right"))
+
+        return list(zip(
+            self.key_gene[lo:hi].tolist(),
+            self.key_kind[lo:hi].tolist()
+        ))
+
+    def __contains__(self, symbol):
+        """
+        True if symbol is an approved HGNC symbol.
+        """
+        if not isinstance(symbol, str):
+            return False
+        return any(kind == SYMBOL for _, kind in self.lookup(symbol))
+
+    def symbols(self):
+        column = self.genes["symbol"]
+        return (column[i] for i in range(len(column)))
+
+    def normalize(self, name: str):
+        """
+        Approved symbol for a symbol, previous symbol, alias or ID.
+        Returns None if unknown or ambiguous at the best matching level.
+        """
+        hits = self.lookup(name)
+        if not hits:
+            return None
+
+        best = min(kind for _, kind in hits)
+        rows = {row for row, kind in hits if kind == best}
+        if len(rows) != 1:
+            return None
+        return self.genes["symbol"][rows.pop()]
+
+    def record(self, name: str):
+        """
+        Gene record for any resolvable name, or None.
+        """
+        symbol = self.normalize(name)
+        if symbol is None:
+            return None
+
+        row = next(r for r, kind in self.lookup(symbol) if kind == SYMBOL)
+        g = self.genes
+        return {
+            "symbol": symbol,
+            "hgnc_id": g["hgnc_id"][row] or None,
+            "entrez_id": g["entrez_id"][row] or None,
+            "uniprot_ids": [u for u in g["uniprot_ids"][row].split("|") if u],
+        }
+
+    def vocabulary(self, include_aliases: bool = True):
+        """
+        Surface form → approved symbol for text matching.
+
+        Approved symbols always win; previous symbols / aliases shared by
+        several genes are dropped as ambiguous.
+        """
+        kinds = (SYMBOL, PREVIOUS, ALIAS) if include_aliases else (SYMBOL,)
+        symbols = self.genes["symbol"]
+
+        forms = {}
+        for key, kind, row in zip(
+            self.keys.tolist(), self.key_kind.tolist(), self.key_gene.tolist()
+        ):
+            if kind in kinds:
+                forms.setdefault(key.decode("utf-8"), []).append((kind, row))
+
+        vocabulary = {}
+        for form, hits in forms.items():
+            best = min(kind for kind, _ in hits)
+            rows = {row for kind, row in hits if kind == best}
+            if best == SYMBOL or len(rows) == 1:
+                vocabulary[form] = symbols[min(rows)]
+        return vocabulary
+
+
+# ------------------------------------------------------------
+# SHARED INDEX (BUILT ONCE, REBUILT WHEN THE SOURCE CHANGES)
+# ------------------------------------------------------------
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_hgnc_index(rebuild: bool = False):
+    """
+    Process-wide HGNC index.
+
+    Opens the prebuilt index if it matches the source file, otherwise
+    compiles it from data/hgnc_complete_set.txt (or tools/hgnc_symbols.txt).
+    """
+    global _INDEX
+
+    with _INDEX_LOCK:
+        if _INDEX is not None and not rebuild:
+            return _INDEX
+
+        index = HGNCIndex()
+        source = _find_source()
+
+        if not rebuild and index.exists():
+            index.open()
+            if source is None or index.source == _stamp(source):
+                _INDEX = index
+                return _INDEX
+
+        if source is None:
+            raise FileNotFoundError("❌ No HGNC source file or prebuilt index found")
+
+        _INDEX = index.build(source)
+        return _INDEX
+
+
+class ApprovedSymbols:
+    """
+    Set-like view of approved symbols; the index opens on first use.
+    """
+
+    def __contains__(self, symbol):
+        return symbol in get_hgnc_index()
+
+    def __iter__(self):
+        return get_hgnc_index().symbols()
+
+    def __len__(self):
+        return len(get_hgnc_index())
+
+
+APPROVED_SYMBOLS = ApprovedSymbols()
+
+
+def hgnc_symbols():
+    return set(get_hgnc_index().symbols())
+
+
+def normalize_gene(name: str):
+    return get_hgnc_index().normalize(name)
+
+
+def gene_record(name: str):
+    return get_hgnc_index().record(name)
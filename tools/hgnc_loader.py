@@ -1,8 +1,8 @@
-import pandas as pd
 from pathlib import Path
 
-HGNC_PATH = Path("data/hgnc_complete_set.txt")
+from tools.hgnc_index import HGNC_FILE, hgnc_symbols
+
+HGNC_PATH = Path(HGNC_FILE)
 
 def load_hgnc_symbols():
-    df = pd.read_csv(HGNC_PATH, sep="\t", low_memory=False)
-    return set(df["symbol"].dropna().str.upper())
+    return hgnc_symbols()
@@ -0,0 +1,137 @@
+# ============================================================
+# BACKGROUND BATCHED HISTORY WRITER (MONGO insert_many)
+# ============================================================
+
+import os
+import time
+import queue
+import threading
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "100"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))    # seconds
+HISTORY_MAX_PENDING = int(os.getenv("HISTORY_MAX_PENDING", "10000"))
+
+_STOP = object()
+
+
+# ------------------------------------------------------------
+# WRITER
+# ------------------------------------------------------------
+
+class HistoryWriter:
+    """
+    Takes history documents off the request path.
+
+    ✔ submit() only enqueues; never blocks, never touches the network
+    ✔ One thread serializes and writes with insert_many, flushing when
+      batch_size documents are pending or flush_interval has passed
+    ✔ Bounded queue: when Mongo falls behind, new documents are dropped
+      (and counted) instead of growing memory
+    """
+
+    def __init__(
+        self,
+        collection,
+        serialize=None,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+        max_pending: int = HISTORY_MAX_PENDING
+    ):
+        self.collection = collection
+        self.serialize = serialize or (lambda doc: doc)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="history-writer", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def submit(self, doc: dict):
+        try:
+            self._queue.put_nowait(doc)
+        except queue.Full:
+            self.dropped += 1
+
+    # -------------------------
+    # Writer thread
+    # -------------------------
+    def _flush(self, batch):
+        if not batch:
+            return
+        try:
+            docs = [self.serialize(doc) for doc in batch]
+            self.collection.insert_many(docs, ordered=False)
+            self.written += len(docs)
+        except Exception as e:
+            print(f"⚠️ History write failed ({len(batch)} docs):", e)
+            self.failed += len(batch)
+        self.batches += 1
+
+    def _run(self):
+        while True:
+            doc = self._queue.get()
+            if doc is _STOP:
+                return
+
+            batch = [doc]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    doc = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if doc is _STOP:
+                    stop = True
+                    break
+                batch.append(doc)
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def close(self, timeout: float = 10):
+        """
+        Flush pending documents and stop the writer thread.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+
+    def stats(self):
+        return {
+            "pending": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
@@ -0,0 +1,242 @@
+# ============================================================
+# SHARED HTTP CLIENT (POOLED, RATE-LIMITED, RETRYING, METERED)
+# ============================================================
+
+import os
+import time
+import random
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+NCBI_API_KEY = os.getenv("NCBI_API_KEY")
+
+# host → (requests per second, burst). NCBI allows 3 rps, 10 with an API key.
+SERVICE_LIMITS = {
+    "eutils.ncbi.nlm.nih.gov": (10.0 if NCBI_API_KEY else 3.0, 3),
+    "pubchem.ncbi.nlm.nih.gov": (5.0, 5),
+    "www.ebi.ac.uk": (5.0, 5),
+    "alphafold.ebi.ac.uk": (5.0, 5),
+    "rest.kegg.jp": (3.0, 3),
+    "clinicaltrials.gov": (10.0, 10),
+    "api-inference.huggingface.co": (5.0, 5),
+}
+DEFAULT_LIMIT = (10.0, 10)
+
+POOL_SIZE = 10                       # keep-alive connections per host
+DEFAULT_TIMEOUT = 30                 # seconds, when the caller sets none
+MAX_RETRIES = 2
+BACKOFF_BASE = 0.5                   # seconds; doubled per retry, plus jitter
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+LATENCY_WINDOW = 1000                # samples kept per service for percentiles
+
+
+# ------------------------------------------------------------
+# TOKEN BUCKET
+# ------------------------------------------------------------
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; acquire() blocks until a token is free.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+
+                delay = (1 - self.tokens) / self.rate
+
+            time.sleep(delay)
+            waited += delay
+
+
+# ------------------------------------------------------------
+# METRICS
+# ------------------------------------------------------------
+
+class ServiceMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttled_s = 0.0
+        self.total_s = 0.0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, latency, ok, retries, throttled):
+        with self.lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.retries += retries
+            self.throttled_s += throttled
+            self.total_s += latency
+            self.latencies.append(latency)
+
+    def snapshot(self):
+        with self.lock:
+            samples = sorted(self.latencies)
+
+            def pct(p):
+                if not samples:
+                    return None
+                return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "throttled_s": round(self.throttled_s, 3),
+                "mean_ms": round(self.total_s / self.requests * 1000, 1) if self.requests else None,
+                "p50_ms": pct(0.50),
+                "p95_ms": pct(0.95),
+            }
+
+
+# ------------------------------------------------------------
+# CLIENT
+# ------------------------------------------------------------
+
+class HttpClient:
+    """
+    One requests.Session per host (keep-alive pool), a token bucket per
+    host, retries with exponential backoff for transient failures, and
+    per-host latency metrics.
+
+    Responses are plain requests.Response objects, and exceptions are
+    requests' own, so callers keep their existing error handling.
+    """
+
+    def __init__(self, limits: dict = None, max_retries: int = MAX_RETRIES):
+        self.limits = dict(SERVICE_LIMITS if limits is None else limits)
+        self.max_retries = max_retries
+        self._sessions = {}
+        self._buckets = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+
+                rate, burst = self.limits.get(host, DEFAULT_LIMIT)
+                self._sessions[host] = session
+                self._buckets[host] = TokenBucket(rate, burst)
+                self._metrics[host] = ServiceMetrics()
+
+            return self._sessions[host], self._buckets[host], self._metrics[host]
+
+    @staticmethod
+    def _backoff(attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 30.0)
+        return BACKOFF_BASE * (2 ** attempt) + random.uniform(0, BACKOFF_BASE)
+
+    def request(self, method: str, url: str, retries: int = None, **kwargs):
+        host = urlsplit(url).hostname or ""
+        session, bucket, metrics = self._host_state(host)
+        retries = self.max_retries if retries is None else retries
+
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        if host == "eutils.ncbi.nlm.nih.gov" and NCBI_API_KEY:
+            kwargs["params"] = {**(kwargs.get("params") or {}), "api_key": NCBI_API_KEY}
+
+        throttled = 0.0
+        start = time.perf_counter()
+        attempt = 0
+
+        while True:
+            throttled += bucket.acquire()
+            try:
+                response = session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= retries:
+                    metrics.record(time.perf_counter() - start, False, attempt, throttled)
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                time.sleep(self._backoff(attempt, response))
+                attempt += 1
+                continue
+
+            metrics.record(
+                time.perf_counter() - start,
+                response.status_code < 400,
+                attempt,
+                throttled
+            )
+            return response
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def metrics(self):
+        with self._lock:
+            items = list(self._metrics.items())
+        return {host: m.snapshot() for host, m in sorted(items)}
+
+
+# ------------------------------------------------------------
+# SHARED CLIENT
+# ------------------------------------------------------------
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client():
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = HttpClient()
+    return _CLIENT
+
+
+def http_get(url: str, **kwargs):
+    return get_http_client().get(url, **kwargs)
+
+
+def http_post(url: str, **kwargs):
+    return get_http_client().post(url, **kwargs)
+
+
+def http_metrics():
+    return get_http_client().metrics()
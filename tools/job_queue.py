@@ -0,0 +1,459 @@
+# ============================================================
+# BACKGROUND JOB QUEUE (BOUNDED WORKERS, PROGRESS EVENTS, SQLITE)
+# ============================================================
+
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.response_cache import json_default
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+JOB_DB = os.path.join("data", "cache", "jobs.sqlite")
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(7 * 24 * 3600)))    # seconds
+JOB_HEARTBEAT = float(os.getenv("JOB_HEARTBEAT", "10"))    # seconds between lease renewals
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))            # unrenewed this long → owner is gone
+JOB_POLL_INTERVAL = 1.0    # event polling for jobs owned by another worker process
+JOB_SHUTDOWN_GRACE = float(os.getenv("JOB_SHUTDOWN_GRACE", "10"))   # wait for running jobs
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    kind        TEXT,
+    params      TEXT,
+    status      TEXT,
+    created_at  REAL,
+    updated_at  REAL,
+    events      TEXT,
+    result      TEXT,
+    error       TEXT,
+    owner       TEXT,           -- worker process running the job
+    heartbeat   REAL            -- last lease renewal by the owner
+);
+"""
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+# ------------------------------------------------------------
+# JOB
+# ------------------------------------------------------------
+
+class Job:
+    def __init__(self, kind, params, job_id=None, status=QUEUED, created_at=None,
+                 updated_at=None, events=None, result=None, error=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = status
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+        self.events = events or []
+        self.result = result
+        self.error = error
+
+    def to_dict(self, include_result: bool = False):
+        job = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "stage": self.events[-1]["stage"] if self.events else None,
+            "events": len(self.events),
+            "error": self.error,
+        }
+        if include_result:
+            job["result"] = self.result
+        return job
+
+
+# ------------------------------------------------------------
+# QUEUE
+# ------------------------------------------------------------
+
+class JobQueue:
+    """
+    Runs registered workflows in the background.
+
+    ✔ Bounded worker pool; submissions beyond JOB_MAX_QUEUED are rejected
+    ✔ Progress events per stage (partial results ride along in event data)
+    ✔ Jobs, events and results persisted in SQLite
+    ✔ Pending jobs leased to their worker process; only jobs whose owner
+      stopped renewing the lease are failed, so workers sharing the
+      database do not fail each other's jobs
+    ✔ Blocking event reads for long-polling, async ones for SSE streams
+    """
+
+    def __init__(self, path: str = JOB_DB, max_workers: int = JOB_WORKERS,
+                 max_queued: int = JOB_MAX_QUEUED):
+        self.path = path
+        self.max_queued = max_queued
+        self._handlers = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._active = {}                    # job_id → Job (queued or running)
+        self._changed = threading.Condition()
+        self._waiters = set()                # (loop, asyncio.Event) of open streams
+        self._stop = threading.Event()
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers),
+            thread_name_prefix="job"
+        )
+
+        with self._write_lock:
+            conn = self._conn()
+            conn.executescript(SCHEMA)
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+                if column not in columns:
+                    # Databases created before jobs were leased
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            conn.execute(
+                "DELETE FROM jobs WHERE updated_at < ?",
+                (time.time() - JOB_RETENTION,)
+            )
+            conn.commit()
+
+        self._recover()
+        threading.Thread(
+            target=self._keep_leases, name="job-heartbeat", daemon=True
+        ).start()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # -------------------------
+    # Leases
+    # -------------------------
+    def _recover(self):
+        """
+        Fail pending jobs whose owner stopped renewing its lease (crashed
+        or restarted); jobs of live workers are left alone.
+        """
+        now = time.time()
+        with self._write_lock:
+            conn = self._conn()
+            recovered = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? "
+                "WHERE status IN (?, ?) AND COALESCE(heartbeat, updated_at) < ?",
+                (FAILED, "Interrupted: worker process stopped.", now,
+                 QUEUED, RUNNING, now - JOB_LEASE)
+            ).rowcount
+            conn.commit()
+        if recovered:
+            print(f"⚠️ Marked {recovered} interrupted job(s) as failed")
+
+    def _renew(self):
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE owner = ? AND status IN (?, ?)",
+                (time.time(), self.owner, QUEUED, RUNNING)
+            )
+            conn.commit()
+
+    def _keep_leases(self):
+        while not self._stop.wait(JOB_HEARTBEAT):
+            try:
+                self._renew()
+                self._recover()
+            except sqlite3.Error as e:
+                print("⚠️ Job lease renewal failed:", e)
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _save(self, job: Job):
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs"
+                "(id, kind, params, status, created_at, updated_at, events, result, error, "
+                "owner, heartbeat) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, job.kind, json.dumps(job.params), job.status,
+                    job.created_at, job.updated_at,
+                    json.dumps(job.events, default=json_default),
+                    None if job.result is None else json.dumps(job.result, default=json_default),
+                    job.error, self.owner, time.time()
+                )
+            )
+            conn.commit()
+
+    def _load(self, job_id: str):
+        row = self._conn().execute(
+            "SELECT id, kind, params, status, created_at, updated_at, events, result, error "
+            "FROM jobs WHERE id = ?",
+            (job_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return Job(
+            row[1], json.loads(row[2]), job_id=row[0], status=row[3],
+            created_at=row[4], updated_at=row[5], events=json.loads(row[6] or "[]"),
+            result=json.loads(row[7]) if row[7] else None, error=row[8]
+        )
+
+    def _job(self, job_id: str):
+        with self._changed:
+            job = self._active.get(job_id)
+        return job if job is not None else self._load(job_id)
+
+    def _notify(self):
+        # Caller holds self._changed
+        self._changed.notify_all()
+        for loop, wake in list(self._waiters):
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:             # stream's event loop already closed
+                self._waiters.discard((loop, wake))
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def register(self, kind: str, handler):
+        """
+        handler(progress, **params) → result; progress(stage, **data)
+        records an event while the job runs.
+        """
+        self._handlers[kind] = handler
+
+    def _event(self, job: Job, stage: str, data=None):
+        with self._changed:
+            job.events.append({
+                "seq": len(job.events) + 1,
+                "stage": stage,
+                "time": time.time(),
+                "data": data or {}
+            })
+            job.updated_at = time.time()
+            self._notify()
+        self._save(job)
+
+    def _set_status(self, job: Job, status: str, result=None, error=None):
+        with self._changed:
+            job.status = status
+            job.result = result
+            job.error = error
+        self._event(job, status)
+
+    def _run(self, job: Job):
+        self._set_status(job, RUNNING)
+
+        def progress(stage, **data):
+            self._event(job, stage, data)
+
+        try:
+            result = self._handlers[job.kind](progress, **job.params)
+            self._set_status(job, DONE, result=result)
+        except Exception as e:
+            print(f"❌ Job {job.id} ({job.kind}) failed:", e)
+            self._set_status(job, FAILED, error=str(e))
+        finally:
+            with self._changed:
+                self._active.pop(job.id, None)
+                self._notify()
+
+    def submit(self, kind: str, **params):
+        """
+        Queue a job and return immediately.
+
+        Returns:
+            dict: job summary (job_id, status, ...)
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(kind, params)
+        with self._changed:
+            if self._stop.is_set():
+                raise RuntimeError("Job queue is shut down")
+            if len(self._active) >= self.max_queued:
+                raise JobQueueFull(f"{len(self._active)} jobs already pending")
+            self._active[job.id] = job
+
+        self._event(job, QUEUED)
+        self._executor.submit(self._run, job)
+        return job.to_dict()
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def status(self, job_id: str, include_result: bool = False):
+        job = self._job(job_id)
+        return job.to_dict(include_result=include_result) if job else None
+
+    def events(self, job_id: str, after: int = 0, timeout: float = 0):
+        """
+        Events with seq > after, waiting up to timeout seconds for new
+        ones while the job is still pending. Jobs run by another worker
+        process are polled from the database.
+
+        Returns:
+            tuple: (events, finished) or (None, True) for an unknown job
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._changed:
+                job = self._active.get(job_id)
+                if job is not None:
+                    if len(job.events) > after:
+                        return job.events[after:], False
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return [], False
+                    self._changed.wait(remaining)
+                    continue
+
+            job = self._load(job_id)
+            if job is None:
+                return None, True
+            finished = job.status in (DONE, FAILED)
+            if finished or len(job.events) > after:
+                return job.events[after:], finished
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return [], False
+            time.sleep(min(remaining, JOB_POLL_INTERVAL))
+
+    async def stream(self, job_id: str, after: int = 0, heartbeat: float = 15):
+        """
+        Server-sent events for a job, ending after its final event.
+
+        Waits on the event loop (woken by _notify, or every
+        JOB_POLL_INTERVAL for other workers' jobs), so an idle stream
+        does not hold a threadpool thread.
+        """
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+        waiter = (loop, wake)
+        with self._changed:
+            self._waiters.add(waiter)
+
+        try:
+            idle_since = loop.time()
+            while True:
+                wake.clear()
+                events, finished = await asyncio.to_thread(self.events, job_id, after)
+                if events is None:
+                    yield "event: error\ndata: {\"error\": \"Unknown job\"}\n\n"
+                    return
+
+                for event in events:
+                    after = event["seq"]
+                    yield (
+                        f"id: {event['seq']}\n"
+                        f"event: {event['stage']}\n"
+                        f"data: {json.dumps(event, default=json_default)}\n\n"
+                    )
+
+                if finished:
+                    return
+                if events:
+                    idle_since = loop.time()
+                    continue
+                if loop.time() - idle_since >= heartbeat:
+                    yield ": keep-alive\n\n"
+                    idle_since = loop.time()
+
+                try:
+                    await asyncio.wait_for(wake.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._changed:
+                self._waiters.discard(waiter)
+
+    # -------------------------
+    # Shutdown
+    # -------------------------
+    def close(self, grace: float = JOB_SHUTDOWN_GRACE):
+        """
+        Stop taking jobs, drop queued ones, give running ones up to
+        grace seconds, and mark whatever is left as interrupted — so
+        nothing stays "running" until its lease runs out.
+        """
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        deadline = time.monotonic() + grace
+        with self._changed:
+            while any(j.status == RUNNING for j in self._active.values()):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            # Finished jobs linger in _active until _run pops them
+            leftover = [j for j in self._active.values() if j.status in (QUEUED, RUNNING)]
+
+        for job in leftover:
+            self._set_status(job, FAILED, error="Interrupted by server shutdown.")
+        if leftover:
+            print(f"⚠️ {len(leftover)} job(s) interrupted by shutdown")
+
+    def stats(self):
+        with self._changed:
+            active = list(self._active.values())
+        return {
+            "queued": sum(j.status == QUEUED for j in active),
+            "running": sum(j.status == RUNNING for j in active),
+            "max_queued": self.max_queued,
+        }
+
+
+# ------------------------------------------------------------
+# SHARED INSTANCE
+# ------------------------------------------------------------
+
+_QUEUE = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_job_queue():
+    global _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None:
+            _QUEUE = JobQueue()
+    return _QUEUE
+
+
+def close_job_queue(grace: float = JOB_SHUTDOWN_GRACE):
+    global _QUEUE
+    with _QUEUE_LOCK:
+        queue, _QUEUE = _QUEUE, None
+    if queue is not None:
+        queue.close(grace=grace)
@@ -0,0 +1,258 @@
+# ============================================================
+# KEGG CLIENT (BATCHED LINK QUERIES, CONCURRENT, SQLITE TTL CACHE)
+# ============================================================
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.http_client import http_get
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+KEGG_REST = "https://rest.kegg.jp"
+KEGG_CACHE_DB = os.path.join("data", "cache", "kegg.sqlite")
+
+KEGG_CACHE_TTL = int(os.getenv("KEGG_CACHE_TTL", str(30 * 24 * 3600)))    # seconds
+KEGG_BATCH = 10            # KEGG accepts up to 10 "+"-joined entries per request
+KEGG_CONCURRENCY = 3       # requests in flight; the rate itself is http_client's (3 rps)
+KEGG_ORGANISM = "hsa"
+
+# Cache kinds
+FIND_DISEASE = "find_disease"          # disease name  → [ds:H...]
+DISEASE_PATHWAYS = "disease_pathways"  # ds:H...       → [hsa05010, ...]
+PATHWAY_GENES = "pathway_genes"        # hsa05010      → [hsa:351, ...]
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kegg_cache (
+    kind        TEXT,
+    key         TEXT,
+    value       TEXT,           -- JSON list
+    fetched_at  REAL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+
+def _strip_prefix(entry: str, prefix: str = "path:") -> str:
+    return entry[len(prefix):] if entry.startswith(prefix) else entry
+
+
+def _organism_pathway(pathway_id: str) -> str:
+    # Reference maps (map05010) → organism pathways (hsa05010) for gene links
+    if pathway_id.startswith("map"):
+        return KEGG_ORGANISM + pathway_id[3:]
+    return pathway_id
+
+
+def _parse_links(text: str):
+    """
+    {source: [target, ...]} from a KEGG link response.
+    """
+    links = {}
+    for line in text.strip().split("\n"):
+        parts = line.split("\t")
+        if len(parts) == 2:
+            links.setdefault(parts[0].strip(), []).append(parts[1].strip())
+    return links
+
+
+# ------------------------------------------------------------
+# CLIENT
+# ------------------------------------------------------------
+
+class KEGGClient:
+    """
+    Disease → pathway → gene lookups against the KEGG REST API.
+
+    ✔ Multi-ID link queries (KEGG_BATCH entries per request)
+    ✔ Remaining requests run concurrently, under http_client's KEGG rate limit
+    ✔ Every mapping persisted in SQLite with a TTL; stale entries are
+      still served when KEGG is unreachable
+    """
+
+    def __init__(self, path: str = KEGG_CACHE_DB, ttl: int = KEGG_CACHE_TTL,
+                 max_workers: int = KEGG_CONCURRENCY):
+        self.path = path
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        with self._write_lock:
+            conn = self._conn()
+            conn.executescript(SCHEMA)
+            conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # -------------------------
+    # Cache
+    # -------------------------
+    def _cached(self, kind, keys, include_stale=False):
+        """
+        {key: value} for cached keys (fresh only, unless include_stale).
+        """
+        keys = list(keys)
+        found = {}
+        oldest = 0 if include_stale else time.time() - self.ttl
+        conn = self._conn()
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            for key, value in conn.execute(
+                "SELECT key, value FROM kegg_cache WHERE kind = ? AND fetched_at >= ? "
+                f"AND key IN ({','.join('?' * len(batch))})",
+                [kind, oldest, *batch]
+            ):
+                found[key] = json.loads(value)
+        return found
+
+    def _store(self, kind, mapping: dict):
+        if not mapping:
+            return
+        now = time.time()
+        with self._write_lock:
+            conn = self._conn()
+            conn.executemany(
+                "INSERT OR REPLACE INTO kegg_cache(kind, key, value, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(kind, k, json.dumps(v), now) for k, v in mapping.items()]
+            )
+            conn.commit()
+
+    # -------------------------
+    # HTTP
+    # -------------------------
+    @staticmethod
+    def _get(path: str):
+        """
+        Response text, "" for no results (KEGG answers 404), None on failure.
+        """
+        try:
+            r = http_get(f"{KEGG_REST}/{path}", timeout=15)
+        except Exception as e:
+            print(f"⚠️ KEGG request failed ({path}):", e)
+            return None
+        if r.status_code == 404:
+            return ""
+        if r.status_code != 200:
+            print(f"⚠️ KEGG {r.status_code} for {path}")
+            return None
+        return r.text
+
+    def _link_batches(self, kind, target_db, keys, to_query=lambda k: k, parse=lambda t: t):
+        """
+        Resolve keys with "+"-joined link queries, concurrently; cache
+        hits are not requested. Keys KEGG has no links for map to [].
+        """
+        keys = list(dict.fromkeys(keys))
+        result = self._cached(kind, keys)
+        missing = [k for k in keys if k not in result]
+
+        if missing:
+            batches = [missing[i:i + KEGG_BATCH] for i in range(0, len(missing), KEGG_BATCH)]
+
+            def fetch(batch):
+                text = self._get(f"link/{target_db}/" + "+".join(to_query(k) for k in batch))
+                if text is None:
+                    return {}
+                links = _parse_links(text)
+                return {
+                    k: sorted({parse(t) for t in links.get(to_query(k), [])})
+                    for k in batch
+                }
+
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+                for fetched in pool.map(fetch, batches):
+                    self._store(kind, fetched)
+                    result.update(fetched)
+
+            # KEGG unreachable → fall back to expired entries
+            still_missing = [k for k in missing if k not in result]
+            if still_missing:
+                result.update(self._cached(kind, still_missing, include_stale=True))
+
+        return {k: result[k] for k in keys if k in result}
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    def find_diseases(self, name: str):
+        key = " ".join(name.lower().split())
+        cached = self._cached(FIND_DISEASE, [key])
+        if key in cached:
+            return cached[key]
+
+        text = self._get(f"find/disease/{quote(key)}")
+        if text is None:
+            return self._cached(FIND_DISEASE, [key], include_stale=True).get(key, [])
+
+        ids = [line.split("\t")[0] for line in text.strip().split("\n") if line.strip()]
+        self._store(FIND_DISEASE, {key: ids})
+        return ids
+
+    def disease_pathways(self, disease_ids):
+        """
+        {disease id: [pathway id, ...]} for KEGG disease entries (ds:H...).
+        """
+        return self._link_batches(
+            DISEASE_PATHWAYS, "pathway", disease_ids, parse=_strip_prefix
+        )
+
+    def pathway_genes(self, pathway_ids):
+        """
+        {pathway id: [KEGG gene id, ...]} for the organism (hsa:351, ...).
+        """
+        return self._link_batches(
+            PATHWAY_GENES, KEGG_ORGANISM, pathway_ids,
+            to_query=lambda p: "path:" + _organism_pathway(p)
+        )
+
+    def pathways_for_disease(self, name: str):
+        """
+        Pathway IDs linked to any KEGG disease matching the name.
+        """
+        ids = self.find_diseases(name)
+        if not ids:
+            return []
+        links = self.disease_pathways(ids)
+        return sorted({p for pathways in links.values() for p in pathways})
+
+    def stats(self):
+        rows = self._conn().execute(
+            "SELECT kind, COUNT(*), MIN(fetched_at) FROM kegg_cache GROUP BY kind"
+        ).fetchall()
+        return {kind: {"entries": n, "oldest": oldest} for kind, n, oldest in rows}
+
+
+# ------------------------------------------------------------
+# SHARED INSTANCE
+# ------------------------------------------------------------
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_kegg_client():
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = KEGGClient()
+    return _CLIENT
@@ -3,10 +3,12 @@
 # ============================================================
 
 import os
+import time
 import shutil
+import hashlib
 import subprocess
-from rdkit import Chem
-from rdkit.Chem import AllChem
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
 
 # NEW: compound loader connection
 from tools.compound_loader import load_compounds, load_compounds_for_target
@@ -20,18 +22,50 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
 LIGAND_DIR = os.path.join(BASE_DIR, "data", "ligands")
 TMP_DIR = os.path.join(BASE_DIR, "data", "tmp")
+CONFORMER_DIR = os.path.join(BASE_DIR, "data", "conformers")
 
-os.makedirs(LIGAND_DIR, exist_ok=True)
-os.makedirs(TMP_DIR, exist_ok=True)
+# "native" = in-process RDKit writer, "adt" = prepare_ligand4.py subprocess
+PDBQT_METHOD = "native"
+
+# Batches smaller than this are prepared in-process (pool startup and
+# the RDKit import in every worker cost more than a few embeddings)
+PARALLEL_THRESHOLD = 8
+
+
+@lru_cache(maxsize=None)
+def _ensure_dirs():
+    """
+    Create output directories on first use (not at import).
+    """
+    for d in (LIGAND_DIR, TMP_DIR, CONFORMER_DIR):
+        os.makedirs(d, exist_ok=True)
 
 
 # ============================================================
-# FIND AutoDockTools SCRIPT
+# LAZY RDKit IMPORT
 # ============================================================
 
+@lru_cache(maxsize=None)
+def _rdkit():
+    """
+    Import RDKit on first use; importing this module stays cheap.
+    """
+    from rdkit import Chem
+    from rdkit.Chem import AllChem
+    return Chem, AllChem
+
+
+# ============================================================
+# FIND AutoDockTools SCRIPT (LAZY, MEMOIZED)
+# ============================================================
+
+@lru_cache(maxsize=None)
 def find_prepare_ligand():
     """
     Locate prepare_ligand4.py safely.
+
+    Only called when the AutoDockTools route is actually used; the
+    result is memoized. Raises RuntimeError if the script is missing.
     """
     candidates = [
         "prepare_ligand4.py",
@@ -49,105 +83,243 @@ def find_prepare_ligand():
     )
 
 
-PREPARE_LIGAND = find_prepare_ligand()
+# ============================================================
+# LARGEST FRAGMENT (SALTS / COUNTERIONS / MIXTURES)
+# ============================================================
+
+def largest_fragment(mol):
+    """
+    The connected component with the most heavy atoms (the first one
+    on ties), and how many components the input had.
+    """
+    Chem, _ = _rdkit()
+    frags = Chem.GetMolFrags(mol, asMols=True)
+    if len(frags) == 1:
+        return mol, 1
+    return max(frags, key=lambda f: f.GetNumHeavyAtoms()), len(frags)
+
+
+# ============================================================
+# CONFORMER CACHE (KEYED BY CANONICAL SMILES)
+# ============================================================
+
+def canonical_smiles(smiles: str):
+    """
+    RDKit canonical SMILES, or None if the SMILES does not parse.
+    """
+    Chem, _ = _rdkit()
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        return None
+    return Chem.MolToSmiles(mol)
+
+
+def _conformer_path(canonical: str):
+    digest = hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+    return os.path.join(CONFORMER_DIR, f"{digest}.mol")
+
+
+def load_cached_conformer(canonical: str):
+    """
+    Return the cached optimized 3D molecule (with Hs), or None.
+    """
+    path = _conformer_path(canonical)
+    if not os.path.exists(path):
+        return None
+
+    Chem, _ = _rdkit()
+    try:
+        with open(path, encoding="utf-8") as f:
+            return Chem.MolFromMolBlock(f.read(), removeHs=False)
+    except Exception:
+        return None
+
+
+def save_cached_conformer(canonical: str, mol):
+    Chem, _ = _rdkit()
+    _ensure_dirs()
+    path = _conformer_path(canonical)
+    tmp = f"{path}.{os.getpid()}.tmp"
+
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(Chem.MolToMolBlock(mol))
+    os.replace(tmp, path)
+
+
+# ============================================================
+# PREPARATION STAGES
+# ============================================================
+
+def _embed(mol):
+    """
+    Add hydrogens and generate one 3D conformer (ETKDG).
+    """
+    Chem, AllChem = _rdkit()
+    mol = Chem.AddHs(mol)
+    if AllChem.EmbedMolecule(mol, AllChem.ETKDG()) != 0:
+        AllChem.EmbedMolecule(mol)
+    return mol
+
+
+def _optimize(mol):
+    _, AllChem = _rdkit()
+    AllChem.UFFOptimizeMolecule(mol)
+    return mol
+
+
+def _convert_native(mol, ligand_name: str, pdbqt_path: str):
+    """
+    3D MOL → PDBQT in-process (AD4 types + Gasteiger charges)
+    """
+    from tools.pdbqt_writer import ligand_to_pdbqt
+
+    text = ligand_to_pdbqt(mol, name=ligand_name)
+
+    tmp = f"{pdbqt_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, pdbqt_path)
+
+
+def _convert_adt(mol, ligand_name: str, pdbqt_path: str):
+    """
+    3D MOL → PDBQT via AutoDockTools prepare_ligand4.py
+    """
+    Chem, _ = _rdkit()
+    _ensure_dirs()
+    mol_file = os.path.join(TMP_DIR, f"{ligand_name}.mol")
+    Chem.MolToMolFile(mol, mol_file)
+
+    cmd = [
+        find_prepare_ligand(),
+        "-l", mol_file,
+        "-o", pdbqt_path,
+        "-A", "hydrogens"
+    ]
+
+    subprocess.run(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True
+    )
+
+
+def _convert(mol, ligand_name: str, pdbqt_path: str, method: str = PDBQT_METHOD):
+    """
+    Write PDBQT with the requested method; the native writer falls back
+    to AutoDockTools if it cannot handle a molecule.
+    """
+    if method == "adt":
+        _convert_adt(mol, ligand_name, pdbqt_path)
+        return
+
+    try:
+        _convert_native(mol, ligand_name, pdbqt_path)
+    except Exception as e:
+        print(f"⚠️ Native PDBQT writer failed for {ligand_name} ({e}), using prepare_ligand4.py")
+        _convert_adt(mol, ligand_name, pdbqt_path)
 
 
 # ============================================================
 # CORE FUNCTION
 # ============================================================
 
-def smiles_to_pdbqt(smiles: str, ligand_name: str, force: bool = False):
+def smiles_to_pdbqt(
+    smiles: str,
+    ligand_name: str,
+    force: bool = False,
+    method: str = PDBQT_METHOD
+):
     """
     Convert SMILES → 3D PDBQT for docking
 
+    Args:
+        method (str): "native" (in-process writer) or "adt" (prepare_ligand4.py)
+
     Returns:
         dict:
         {
           "status": "ok" | "error",
           "path": str | None,
-          "message": str
+          "message": str,
+          "timings": {"embed": s, "optimize": s, "convert": s},
+          "conformer_cached": bool
         }
     """
 
+    Chem, _ = _rdkit()
+    _ensure_dirs()
+
     pdbqt_path = os.path.join(LIGAND_DIR, f"{ligand_name}.pdbqt")
+    timings = {"embed": 0.0, "optimize": 0.0, "convert": 0.0}
 
-    if os.path.exists(pdbqt_path) and not force:
+    def _result(status, path, message, cached=False):
         return {
-            "status": "ok",
-            "path": pdbqt_path,
-            "message": "Ligand already prepared"
+            "status": status,
+            "path": path,
+            "message": message,
+            "timings": {k: round(v, 4) for k, v in timings.items()},
+            "conformer_cached": cached
         }
 
+    if os.path.exists(pdbqt_path) and not force:
+        return _result("ok", pdbqt_path, "Ligand already prepared")
+
     # --------------------------------------------------------
     # 1️⃣ SMILES → RDKit molecule
     # --------------------------------------------------------
-    mol = Chem.MolFromSmiles(smiles)
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
     if mol is None:
-        return {
-            "status": "error",
-            "path": None,
-            "message": f"Invalid SMILES: {smiles}"
-        }
+        return _result("error", None, f"Invalid SMILES: {smiles}")
 
-    mol = Chem.AddHs(mol)
+    # Dock one molecule: salts and mixtures keep their largest component
+    mol, n_frags = largest_fragment(mol)
+    note = f" (largest of {n_frags} fragments kept)" if n_frags > 1 else ""
 
-    # --------------------------------------------------------
-    # 2️⃣ 3D embedding
-    # --------------------------------------------------------
-    try:
-        if AllChem.EmbedMolecule(mol, AllChem.ETKDG()) != 0:
-            AllChem.EmbedMolecule(mol)
-        AllChem.UFFOptimizeMolecule(mol)
-    except Exception as e:
-        return {
-            "status": "error",
-            "path": None,
-            "message": f"RDKit embedding failed: {e}"
-        }
+    canonical = Chem.MolToSmiles(mol)
 
     # --------------------------------------------------------
-    # 3️⃣ Write temporary MOL
+    # 2️⃣ 3D embedding + UFF (or conformer cache)
     # --------------------------------------------------------
-    mol_file = os.path.join(TMP_DIR, f"{ligand_name}.mol")
-    Chem.MolToMolFile(mol, mol_file)
+    cached = load_cached_conformer(canonical)
+
+    if cached is not None:
+        mol = cached
+    else:
+        try:
+            t0 = time.perf_counter()
+            mol = _embed(mol)
+            timings["embed"] = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            mol = _optimize(mol)
+            timings["optimize"] = time.perf_counter() - t0
+        except Exception as e:
+            return _result("error", None, f"RDKit embedding failed: {e}")
+
+        try:
+            save_cached_conformer(canonical, mol)
+        except OSError:
+            pass
 
     # --------------------------------------------------------
-    # 4️⃣ MOL → PDBQT (AutoDockTools)
+    # 3️⃣ MOL → PDBQT (native writer or AutoDockTools)
     # --------------------------------------------------------
     try:
-        cmd = [
-            PREPARE_LIGAND,
-            "-l", mol_file,
-            "-o", pdbqt_path,
-            "-A", "hydrogens"
-        ]
-
-        subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            check=True
-        )
+        t0 = time.perf_counter()
+        _convert(mol, ligand_name, pdbqt_path, method=method)
+        timings["convert"] = time.perf_counter() - t0
 
         if os.path.exists(pdbqt_path):
-            return {
-                "status": "ok",
-                "path": pdbqt_path,
-                "message": "Ligand prepared successfully"
-            }
+            return _result(
+                "ok", pdbqt_path, f"Ligand prepared successfully{note}", cached is not None
+            )
 
     except Exception as e:
-        return {
-            "status": "error",
-            "path": None,
-            "message": f"prepare_ligand4.py failed: {e}"
-        }
+        return _result("error", None, f"PDBQT conversion failed: {e}")
 
-    return {
-        "status": "error",
-        "path": None,
-        "message": "Unknown ligand preparation error"
-    }
+    return _result("error", None, "Unknown ligand preparation error")
 
 
 # ============================================================
@@ -193,16 +365,88 @@ def prepare_ligands_for_target(
 
 
 # ============================================================
-# BATCH MODE (GENERIC)
+# PARALLEL ENGINE (PROCESS POOL)
 # ============================================================
 
-def batch_prepare_ligands(smiles_dict: dict):
+def _prepare_job(args):
+    name, smiles, force, method = args
+    return name, smiles_to_pdbqt(smiles, name, force=force, method=method)
+
+
+def parallel_prepare_ligands(
+    smiles_dict: dict,
+    max_workers: int | None = None,
+    force: bool = False,
+    method: str = PDBQT_METHOD
+):
     """
-    Convert multiple SMILES → PDBQT
+    Prepare many ligands across a process pool (in-process below
+    PARALLEL_THRESHOLD ligands; never more workers than ligands).
+
+    Molecules are grouped by canonical SMILES: one representative per
+    group is embedded first, the remaining names of the same molecule
+    then reuse its cached conformer and only pay for conversion.
+
+    Returns:
+        dict:
+        {
+          "results": {name: smiles_to_pdbqt result},
+          "stage_totals": {"embed": s, "optimize": s, "convert": s},
+          "wall_time": s
+        }
     """
-    results = {}
+    start = time.perf_counter()
+
+    first_pass, second_pass = [], []
+    seen = set()
 
     for name, smiles in smiles_dict.items():
-        results[name] = smiles_to_pdbqt(smiles, name)
+        key = canonical_smiles(smiles) or smiles
+        if key in seen:
+            second_pass.append((name, smiles, force, method))
+        else:
+            seen.add(key)
+            first_pass.append((name, smiles, force, method))
+
+    results = {}
+    total = len(first_pass) + len(second_pass)
+    workers = min(max_workers or os.cpu_count() or 1, total) or 1
+
+    if total < PARALLEL_THRESHOLD or workers == 1:
+        workers = 1
+        for jobs in (first_pass, second_pass):
+            for name, result in map(_prepare_job, jobs):
+                results[name] = result
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for jobs in (first_pass, second_pass):
+                if not jobs:
+                    continue
+                chunksize = max(1, len(jobs) // (workers * 4))
+                for name, result in pool.map(_prepare_job, jobs, chunksize=chunksize):
+                    results[name] = result
+
+    stage_totals = {"embed": 0.0, "optimize": 0.0, "convert": 0.0}
+    for r in results.values():
+        for stage, t in r.get("timings", {}).items():
+            stage_totals[stage] += t
+
+    ok = sum(1 for r in results.values() if r["status"] == "ok")
+    print(f"✅ Prepared {ok}/{len(results)} ligands with {workers} workers")
+
+    return {
+        "results": {name: results[name] for name in smiles_dict if name in results},
+        "stage_totals": {k: round(v, 3) for k, v in stage_totals.items()},
+        "wall_time": round(time.perf_counter() - start, 3)
+    }
 
-    return results
+
+# ============================================================
+# BATCH MODE (GENERIC)
+# ============================================================
+
+def batch_prepare_ligands(smiles_dict: dict, max_workers: int | None = None):
+    """
+    Convert multiple SMILES → PDBQT (in parallel)
+    """
+    return parallel_prepare_ligands(smiles_dict, max_workers=max_workers)["results"]
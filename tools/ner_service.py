@@ -0,0 +1,248 @@
+# ============================================================
+# SHARED BIOMEDICAL NER SERVICE (LOAD ONCE, BATCHED, DISK-CACHED)
+# ============================================================
+
+import os
+import json
+import hashlib
+import threading
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+NER_CACHE_DIR = os.path.join("data", "cache", "ner")
+
+DEFAULT_MODEL = "d4data/biomedical-ner-all"
+NER_BATCH_SIZE = 32
+NER_THREADS = int(os.getenv("NER_THREADS", "0")) or None   # None → torch default
+
+
+# ------------------------------------------------------------
+# SERVICE
+# ------------------------------------------------------------
+
+class NERService:
+    """
+    Token-classification pipeline shared by every caller in the process.
+
+    ✔ Model / tokenizer loaded once, on first use
+    ✔ Texts sorted by token length and batched (less padding)
+    ✔ torch.inference_mode + configurable intra-op threads
+    ✔ Entities cached on disk per (model, abstract) hash
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        batch_size: int = NER_BATCH_SIZE,
+        num_threads: int | None = NER_THREADS,
+        cache_dir: str = NER_CACHE_DIR
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.cache_dir = cache_dir
+
+        self._pipeline = None
+        self._failed = False
+        self._load_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    # -------------------------
+    # Model
+    # -------------------------
+    def _load(self):
+        if self._pipeline is not None or self._failed:
+            return self._pipeline
+
+        with self._load_lock:
+            if self._pipeline is not None or self._failed:
+                return self._pipeline
+            try:
+                import torch
+                from transformers import pipeline
+
+                if self.num_threads:
+                    torch.set_num_threads(self.num_threads)
+
+                self._pipeline = pipeline(
+                    "ner",
+                    model=self.model_name,
+                    aggregation_strategy="simple"
+                )
+                print(f"✅ NER model loaded: {self.model_name}")
+            except Exception as e:
+                print(f"⚠️ NER unavailable ({self.model_name}): {e}")
+                self._failed = True
+
+        return self._pipeline
+
+    def available(self) -> bool:
+        return self._load() is not None
+
+    # -------------------------
+    # Disk cache
+    # -------------------------
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(
+            f"{self.model_name}\n{text}".encode("utf-8")
+        ).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _cache_get(self, key: str):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cache_put(self, key: str, entities: list):
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entities, f)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    # -------------------------
+    # Inference
+    # -------------------------
+    @staticmethod
+    def _clean(entities):
+        """
+        JSON-safe entity dicts (pipeline scores are numpy floats).
+        """
+        return [
+            {
+                "entity_group": e.get("entity_group", ""),
+                "word": e.get("word", ""),
+                "start": None if e.get("start") is None else int(e["start"]),
+                "end": None if e.get("end") is None else int(e["end"]),
+                "score": float(e.get("score", 0.0)),
+            }
+            for e in entities or []
+        ]
+
+    def _by_token_length(self, texts):
+        try:
+            lengths = [
+                len(ids) for ids in
+                self._pipeline.tokenizer(texts, add_special_tokens=False)["input_ids"]
+            ]
+        except Exception:
+            lengths = [len(t) for t in texts]
+        return sorted(range(len(texts)), key=lengths.__getitem__)
+
+    def _infer(self, texts):
+        """
+        Entities per text; None for texts whose batch raised (not cached,
+        so a transient failure is retried on the next call).
+        """
+        import torch
+
+        order = self._by_token_length(texts)
+        results = [None] * len(texts)
+
+        with self._run_lock, torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                idx = order[start:start + self.batch_size]
+                batch = [texts[i] for i in idx]
+                try:
+                    outputs = self._pipeline(batch, batch_size=len(batch))
+                except Exception as e:
+                    print("⚠️ NER batch failed:", e)
+                    with self._stats_lock:
+                        self.failures += len(batch)
+                    continue
+                for i, ents in zip(idx, outputs):
+                    results[i] = self._clean(ents)
+
+        return results
+
+    def analyze(self, texts):
+        """
+        Entities for each text, cached per abstract.
+
+        Returns:
+            list[list[dict]]: [{"entity_group", "word", "start", "end", "score"}]
+            per text; empty lists if the model cannot be loaded or the
+            text's batch failed (neither is cached).
+        """
+        texts = [t or "" for t in texts]
+        results = [None] * len(texts)
+
+        pending = {}
+        hits = 0
+        for i, text in enumerate(texts):
+            key = self._key(text)
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = cached
+                hits += 1
+            else:
+                pending.setdefault(key, []).append(i)
+
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += len(pending)
+
+        if pending:
+            keys = list(pending)
+
+            if self._load() is None:
+                computed = [None for _ in keys]
+            else:
+                computed = self._infer([texts[pending[k][0]] for k in keys])
+                for key, entities in zip(keys, computed):
+                    if entities is not None:
+                        self._cache_put(key, entities)
+
+            for key, entities in zip(keys, computed):
+                for i in pending[key]:
+                    results[i] = entities if entities is not None else []
+
+        return results
+
+    def __call__(self, texts, **kwargs):
+        # Drop-in for a HuggingFace pipeline call
+        if isinstance(texts, str):
+            return self.analyze([texts])[0]
+        return self.analyze(texts)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "model": self.model_name,
+                "hits": self.hits,
+                "misses": self.misses,
+                "failures": self.failures,
+            }
+
+
+# ------------------------------------------------------------
+# SHARED INSTANCES (ONE PER MODEL)
+# ------------------------------------------------------------
+
+_SERVICES = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_ner_service(model_name: str = DEFAULT_MODEL):
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(model_name)
+        if service is None:
+            service = NERService(model_name)
+            _SERVICES[model_name] = service
+    return service
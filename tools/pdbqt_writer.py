@@ -0,0 +1,280 @@
+# ============================================================
+# NATIVE PDBQT WRITER (RDKit → AutoDock PDBQT, NO SUBPROCESS)
+# ============================================================
+
+from collections import deque
+
+from rdkit import Chem
+from rdkit.Chem import AllChem
+
+
+# ============================================================
+# ATOM TYPING (AutoDock 4 types, as used by Vina)
+# ============================================================
+
+# Amide C–N bonds are kept rigid, as AutoDockTools does by default
+AMIDE_BOND = Chem.MolFromSmarts("C(=O)-&!@[NX3]")
+
+
+def _n_is_acceptor(atom):
+    if atom.GetFormalCharge() > 0 or atom.GetTotalNumHs(includeNeighbors=True) > 0:
+        return False
+    if atom.GetIsAromatic():
+        return atom.GetDegree() == 2
+    # sp / sp2 nitrogens with a free lone pair, or tertiary amines
+    return atom.GetDegree() < 3 or atom.GetHybridization() == Chem.HybridizationType.SP3
+
+
+def autodock_type(atom):
+    """
+    AutoDock atom type for an RDKit atom (explicit-H molecule).
+    """
+    symbol = atom.GetSymbol()
+
+    if symbol == "C":
+        return "A" if atom.GetIsAromatic() else "C"
+    if symbol == "N":
+        return "NA" if _n_is_acceptor(atom) else "N"
+    if symbol == "O":
+        return "OA"
+    if symbol == "S":
+        return "SA"
+    if symbol == "H":
+        heavy = atom.GetNeighbors()
+        if heavy and heavy[0].GetSymbol() in ("N", "O", "S"):
+            return "HD"
+        return "H"
+
+    return symbol
+
+
+def _is_nonpolar_h(atom):
+    return atom.GetSymbol() == "H" and autodock_type(atom) == "H"
+
+
+# ============================================================
+# CHARGES (GASTEIGER, NON-POLAR H MERGED)
+# ============================================================
+
+def _merged_charges(mol):
+    """
+    Gasteiger charges with non-polar hydrogens folded into their carbon,
+    mirroring AutoDockTools' "merge nphs" step.
+    """
+    AllChem.ComputeGasteigerCharges(mol)
+
+    charges = {}
+    for atom in mol.GetAtoms():
+        try:
+            q = float(atom.GetProp("_GasteigerCharge"))
+        except (KeyError, ValueError):
+            q = 0.0
+        if q != q:   # NaN for exotic elements
+            q = 0.0
+        charges[atom.GetIdx()] = q
+
+    for atom in mol.GetAtoms():
+        if _is_nonpolar_h(atom) and atom.GetDegree():
+            heavy = atom.GetNeighbors()[0].GetIdx()
+            charges[heavy] += charges.pop(atom.GetIdx())
+
+    return charges
+
+
+# ============================================================
+# LINE FORMATTING
+# ============================================================
+
+def _atom_line(serial, name, resname, chain, resnum, xyz, charge, atype, record="ATOM"):
+    return (
+        f"{record:<6s}{serial:5d} {name:<4s} {resname:>3s} {chain:1s}{resnum:4d}    "
+        f"{xyz.x:8.3f}{xyz.y:8.3f}{xyz.z:8.3f}{1.0:6.2f}{0.0:6.2f}    "
+        f"{charge:6.3f} {atype:<2s}"
+    )
+
+
+def _atom_name(atom, counters):
+    info = atom.GetPDBResidueInfo()
+    if info is not None and info.GetName().strip():
+        return info.GetName().strip()
+
+    symbol = atom.GetSymbol()
+    counters[symbol] = counters.get(symbol, 0) + 1
+    return f"{symbol}{counters[symbol]}"[:4]
+
+
+# ============================================================
+# LIGAND (TORSION TREE)
+# ============================================================
+
+def _heavy_degree(atom):
+    return sum(1 for nb in atom.GetNeighbors() if nb.GetAtomicNum() > 1)
+
+
+def _rotatable_bonds(mol):
+    """
+    Active torsions: single, acyclic bonds between heavy atoms that both
+    carry another heavy substituent (no terminal groups, no triple-bond
+    neighbours, no amides).
+    """
+    amides = {
+        frozenset((m[0], m[2]))
+        for m in mol.GetSubstructMatches(AMIDE_BOND)
+    }
+
+    bonds = []
+    for bond in mol.GetBonds():
+        if bond.GetBondType() != Chem.BondType.SINGLE or bond.IsInRing():
+            continue
+
+        a, b = bond.GetBeginAtom(), bond.GetEndAtom()
+        if a.GetAtomicNum() == 1 or b.GetAtomicNum() == 1:
+            continue
+        if _heavy_degree(a) < 2 or _heavy_degree(b) < 2:
+            continue
+        if any(
+            x.GetBondType() == Chem.BondType.TRIPLE
+            for atom in (a, b) for x in atom.GetBonds()
+        ):
+            continue
+        if frozenset((a.GetIdx(), b.GetIdx())) in amides:
+            continue
+
+        bonds.append((a.GetIdx(), b.GetIdx()))
+    return bonds
+
+
+def ligand_to_pdbqt(mol, name: str = "LIG"):
+    """
+    Write a 3D RDKit molecule (explicit Hs, one conformer) as a flexible
+    ligand PDBQT string with ROOT / BRANCH torsion tree.
+    """
+    if mol.GetNumConformers() == 0:
+        raise ValueError("Molecule has no 3D conformer")
+    n_frags = len(Chem.GetMolFrags(mol))
+    if n_frags > 1:
+        # One torsion tree per ligand; silently keeping one part would
+        # drop atoms (e.g. decane from CCCCCCCCCC.c1ccccc1)
+        raise ValueError(
+            f"Molecule has {n_frags} disconnected fragments; "
+            "reduce it to one component before writing"
+        )
+
+    conf = mol.GetConformer()
+    charges = _merged_charges(mol)
+
+    keep = [a.GetIdx() for a in mol.GetAtoms() if not _is_nonpolar_h(a)]
+    keep_set = set(keep)
+
+    # ---------- Rigid fragments ----------
+    rotatable = _rotatable_bonds(mol)
+    cut = {frozenset(b) for b in rotatable}
+
+    fragment_of = {}
+    fragments = []
+    for start in keep:
+        if start in fragment_of:
+            continue
+        frag = []
+        queue = deque([start])
+        fragment_of[start] = len(fragments)
+        while queue:
+            i = queue.popleft()
+            frag.append(i)
+            for nb in mol.GetAtomWithIdx(i).GetNeighbors():
+                j = nb.GetIdx()
+                if j not in keep_set or j in fragment_of:
+                    continue
+                if frozenset((i, j)) in cut:
+                    continue
+                fragment_of[j] = len(fragments)
+                queue.append(j)
+        fragments.append(frag)
+
+    # Fragment graph along rotatable bonds
+    links = {i: [] for i in range(len(fragments))}
+    for a, b in rotatable:
+        fa, fb = fragment_of[a], fragment_of[b]
+        links[fa].append((a, b, fb))
+        links[fb].append((b, a, fa))
+
+    root = max(range(len(fragments)), key=lambda i: len(fragments[i]))
+
+    # ---------- Emit ----------
+    lines = [f"REMARK  Name = {name}", f"REMARK  {len(rotatable)} active torsions"]
+    serial_of = {}
+    counters = {}
+
+    def emit(frag_idx, first_atom=None):
+        atoms = fragments[frag_idx]
+        if first_atom is not None:
+            atoms = [first_atom] + [i for i in atoms if i != first_atom]
+        for i in atoms:
+            atom = mol.GetAtomWithIdx(i)
+            serial_of[i] = len(serial_of) + 1
+            lines.append(_atom_line(
+                serial_of[i],
+                _atom_name(atom, counters),
+                "UNL", "", 1,
+                conf.GetAtomPosition(i),
+                charges.get(i, 0.0),
+                autodock_type(atom),
+                record="HETATM"
+            ))
+
+    def walk(frag_idx, parent):
+        for a, b, child in links[frag_idx]:
+            if child == parent:
+                continue
+            lines.append(f"BRANCH {serial_of[a]:3d} {len(serial_of) + 1:3d}")
+            branch_start = len(serial_of) + 1
+            emit(child, first_atom=b)
+            walk(child, frag_idx)
+            lines.append(f"ENDBRANCH {serial_of[a]:3d} {branch_start:3d}")
+
+    lines.append("ROOT")
+    emit(root)
+    lines.append("ENDROOT")
+    walk(root, None)
+    lines.append(f"TORSDOF {len(rotatable)}")
+
+    return "\n".join(lines) + "\n"
+
+
+# ============================================================
+# RECEPTOR (RIGID)
+# ============================================================
+
+def receptor_to_pdbqt(mol):
+    """
+    Write a protein RDKit molecule (explicit Hs, PDB residue info) as a
+    rigid receptor PDBQT string.
+    """
+    conf = mol.GetConformer()
+    charges = _merged_charges(mol)
+
+    lines = []
+    counters = {}
+    serial = 0
+
+    for atom in mol.GetAtoms():
+        if _is_nonpolar_h(atom):
+            continue
+
+        info = atom.GetPDBResidueInfo()
+        resname = info.GetResidueName() if info else "UNK"
+        chain = info.GetChainId() if info else "A"
+        resnum = info.GetResidueNumber() if info else 1
+
+        serial += 1
+        lines.append(_atom_line(
+            serial,
+            _atom_name(atom, counters),
+            resname, chain, resnum,
+            conf.GetAtomPosition(atom.GetIdx()),
+            charges.get(atom.GetIdx(), 0.0),
+            autodock_type(atom)
+        ))
+
+    lines.append("TER")
+    return "\n".join(lines) + "\n"
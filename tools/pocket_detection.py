@@ -0,0 +1,316 @@
+# ============================================================
+# BINDING POCKET DETECTION (ALPHAFOLD PDB → DOCKING BOX)
+# ============================================================
+
+import os
+import json
+import hashlib
+import threading
+from collections import deque
+
+import numpy as np
+
+
+# ============================================================
+# PATH CONFIGURATION
+# ============================================================
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+ALPHAFOLD_DIR = os.path.join(BASE_DIR, "data", "alphafold_structures")
+POCKET_CACHE_FILE = os.path.join(BASE_DIR, "data", "pocket_boxes.json")
+
+
+# ============================================================
+# PARAMETERS
+# ============================================================
+
+PLDDT_CUTOFF = 70.0     # AlphaFold stores pLDDT in the B-factor column
+GRID_SPACING = 1.0      # Å
+PROBE_RADIUS = 3.0      # grid points closer than this to an atom are "protein"
+BURIED_RADIUS = 8       # voxels; half-width of the buriedness neighbourhood
+MIN_BURIEDNESS = 0.65   # fraction of occupied voxels around a pocket point
+MIN_POCKET_POINTS = 20
+
+BOX_PADDING = 4.0       # Å added on every side of the pocket
+MIN_BOX_SIZE = 12.0     # Å
+MAX_BOX_SIZE = 30.0     # Å
+
+
+# ============================================================
+# PDB PARSING
+# ============================================================
+
+def read_pdb_atoms(pdb_path: str):
+    """
+    Read heavy-atom coordinates and per-atom pLDDT from a PDB file.
+
+    Returns:
+        (coords: np.ndarray[N, 3], plddt: np.ndarray[N])
+    """
+    coords = []
+    plddt = []
+
+    with open(pdb_path, encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            if not line.startswith(("ATOM", "HETATM")):
+                continue
+
+            element = line[76:78].strip() or line[12:16].strip()[:1]
+            if element == "H":
+                continue
+
+            try:
+                coords.append((
+                    float(line[30:38]),
+                    float(line[38:46]),
+                    float(line[46:54])
+                ))
+                plddt.append(float(line[60:66]))
+            except ValueError:
+                continue
+
+    return np.asarray(coords, dtype=float), np.asarray(plddt, dtype=float)
+
+
+# ============================================================
+# GRID HELPERS
+# ============================================================
+
+def _sphere_offsets(radius_voxels: float):
+    r = int(np.ceil(radius_voxels))
+    ax = np.arange(-r, r + 1)
+    grid = np.stack(np.meshgrid(ax, ax, ax, indexing="ij"), axis=-1).reshape(-1, 3)
+    return grid[(grid ** 2).sum(axis=1) <= radius_voxels ** 2]
+
+
+def _box_sum(occupied: np.ndarray, half: int):
+    """
+    Count occupied voxels in a (2*half+1)^3 cube around every voxel
+    with a 3D summed-area table.
+    """
+    padded = np.pad(occupied.astype(np.int32), half + 1)
+    sat = padded.cumsum(0).cumsum(1).cumsum(2)
+
+    w = 2 * half + 1
+    nx, ny, nz = occupied.shape
+
+    def s(dx, dy, dz):
+        return sat[dx:dx + nx, dy:dy + ny, dz:dz + nz]
+
+    return (
+        s(w, w, w)
+        - s(0, w, w) - s(w, 0, w) - s(w, w, 0)
+        + s(0, 0, w) + s(0, w, 0) + s(w, 0, 0)
+        - s(0, 0, 0)
+    )
+
+
+def _enclosed_axes(occupied: np.ndarray):
+    """
+    LIGSITE-style protein–solvent–protein events along x, y and z.
+    """
+    count = np.zeros(occupied.shape, dtype=np.int8)
+
+    for axis in range(3):
+        before = np.maximum.accumulate(occupied, axis=axis)
+        after = np.flip(
+            np.maximum.accumulate(np.flip(occupied, axis=axis), axis=axis),
+            axis=axis
+        )
+        count += (before & after).astype(np.int8)
+
+    return count
+
+
+def _largest_cluster(points: np.ndarray):
+    """
+    Largest 26-connected cluster of voxel indices.
+    """
+    remaining = {tuple(p) for p in points}
+    best = []
+
+    neighbours = [
+        (dx, dy, dz)
+        for dx in (-1, 0, 1)
+        for dy in (-1, 0, 1)
+        for dz in (-1, 0, 1)
+        if (dx, dy, dz) != (0, 0, 0)
+    ]
+
+    while remaining:
+        seed = remaining.pop()
+        cluster = [seed]
+        queue = deque([seed])
+
+        while queue:
+            x, y, z = queue.popleft()
+            for dx, dy, dz in neighbours:
+                n = (x + dx, y + dy, z + dz)
+                if n in remaining:
+                    remaining.remove(n)
+                    cluster.append(n)
+                    queue.append(n)
+
+        if len(cluster) > len(best):
+            best = cluster
+
+    return np.asarray(best, dtype=int)
+
+
+# ============================================================
+# CORE FUNCTION
+# ============================================================
+
+def detect_pocket_box(pdb_path: str, plddt_cutoff: float = PLDDT_CUTOFF):
+    """
+    Find the most buried cavity of a structure and return a tight
+    docking box around it.
+
+    Returns:
+        dict | None:
+        {
+          "center_x": float, "center_y": float, "center_z": float,
+          "size_x": float, "size_y": float, "size_z": float,
+          "n_points": int        # pocket grid points
+        }
+    """
+    coords, plddt = read_pdb_atoms(pdb_path)
+    if len(coords) == 0:
+        return None
+
+    # Low-confidence regions are mostly disordered loops — skip them
+    confident = coords[plddt >= plddt_cutoff]
+    if len(confident) >= 50:
+        coords = confident
+
+    # ---------- Voxelize protein ----------
+    origin = coords.min(axis=0) - PROBE_RADIUS - GRID_SPACING
+    idx = np.floor((coords - origin) / GRID_SPACING).astype(int)
+    shape = tuple(idx.max(axis=0) + int(np.ceil(PROBE_RADIUS / GRID_SPACING)) + 2)
+
+    occupied = np.zeros(shape, dtype=bool)
+    for off in _sphere_offsets(PROBE_RADIUS / GRID_SPACING):
+        p = idx + off
+        occupied[p[:, 0], p[:, 1], p[:, 2]] = True
+
+    # ---------- Buried, empty grid points ----------
+    window = (2 * BURIED_RADIUS + 1) ** 3
+    buriedness = _box_sum(occupied, BURIED_RADIUS) / window
+    enclosed = _enclosed_axes(occupied)
+
+    candidates = np.argwhere(
+        ~occupied
+        & (enclosed >= 3)
+        & (buriedness >= MIN_BURIEDNESS)
+    )
+
+    if len(candidates) < MIN_POCKET_POINTS:
+        return None
+
+    pocket = _largest_cluster(candidates)
+    if len(pocket) < MIN_POCKET_POINTS:
+        return None
+
+    # Trim long tails of channel-like clusters (e.g. membrane proteins)
+    xyz = origin + (pocket + 0.5) * GRID_SPACING
+    lo = np.percentile(xyz, 10, axis=0)
+    hi = np.percentile(xyz, 90, axis=0)
+
+    center = (lo + hi) / 2
+    size = np.clip(hi - lo + 2 * BOX_PADDING, MIN_BOX_SIZE, MAX_BOX_SIZE)
+
+    return {
+        "center_x": round(float(center[0]), 3),
+        "center_y": round(float(center[1]), 3),
+        "center_z": round(float(center[2]), 3),
+        "size_x": round(float(size[0]), 1),
+        "size_y": round(float(size[1]), 1),
+        "size_z": round(float(size[2]), 1),
+        "n_points": int(len(pocket)),
+    }
+
+
+# ============================================================
+# CACHED LOOKUP (ONE BOX PER STRUCTURE)
+# ============================================================
+
+_BOX_CACHE = None
+_BOX_LOCK = threading.Lock()         # guards _BOX_CACHE and its file
+_DETECT_LOCKS = {}                   # PDB digest → lock (one detection per structure)
+
+
+def _load_box_cache():
+    global _BOX_CACHE
+    if _BOX_CACHE is None:
+        try:
+            with open(POCKET_CACHE_FILE, encoding="utf-8") as f:
+                _BOX_CACHE = json.load(f)
+        except (OSError, ValueError):
+            _BOX_CACHE = {}
+    return _BOX_CACHE
+
+
+def _save_box_cache():
+    os.makedirs(os.path.dirname(POCKET_CACHE_FILE), exist_ok=True)
+    tmp = POCKET_CACHE_FILE + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(_BOX_CACHE, f, indent=1, sort_keys=True)
+    os.replace(tmp, POCKET_CACHE_FILE)
+
+
+def get_pocket_box(pdb_path: str):
+    """
+    Cached pocket box for a structure.
+
+    Entries are keyed by the PDB content hash, so a re-downloaded
+    structure gets a fresh box. Structures without a detectable
+    pocket are cached as None.
+    """
+    if not pdb_path or not os.path.exists(pdb_path):
+        return None
+
+    with open(pdb_path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    with _BOX_LOCK:
+        cache = _load_box_cache()
+        if digest in cache:
+            return cache[digest]
+        lock = _DETECT_LOCKS.setdefault(digest, threading.Lock())
+
+    # Different receptors are detected in parallel (batch docking);
+    # concurrent callers for the same one wait for a single detection
+    with lock:
+        with _BOX_LOCK:
+            if digest in _BOX_CACHE:
+                return _BOX_CACHE[digest]
+
+        try:
+            box = detect_pocket_box(pdb_path)
+        except Exception as e:
+            print("⚠️ Pocket detection failed:", pdb_path, e)
+            box = None
+
+        with _BOX_LOCK:
+            _BOX_CACHE[digest] = box
+            _DETECT_LOCKS.pop(digest, None)
+            try:
+                _save_box_cache()
+            except OSError:
+                pass
+
+    return box
+
+
+def pocket_boxes_for_genes(genes: list):
+    """
+    Docking boxes for AlphaFold structures in data/alphafold_structures.
+
+    Returns:
+        dict: gene → box | None
+    """
+    return {
+        gene: get_pocket_box(os.path.join(ALPHAFOLD_DIR, f"{gene.strip().upper()}.pdb"))
+        for gene in genes
+    }
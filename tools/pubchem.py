@@ -1,6 +1,6 @@
 # tools/pubchem.py
 
-import requests
+from tools.http_client import http_get
 import re
 
 
@@ -72,7 +72,7 @@ class PubChemTool:
 
         # ---------- QUERY PUBCHEM ----------
         try:
-            r = requests.get(url, timeout=10)
+            r = http_get(url, timeout=10)
             if r.status_code != 200:
                 return {
                     "is_compound": False,
@@ -1,4 +1,4 @@
-import requests
+from tools.http_client import http_get
 
 def safe_pubchem_lookup(query: str):
     """
@@ -16,7 +16,7 @@ def safe_pubchem_lookup(query: str):
 
     url = f"https://pubchem.ncbi.nlm.nih.gov/rest/pug/compound/name/{query}/property/MolecularWeight,MolecularFormula,IUPACName/JSON"
     try:
-        r = requests.get(url, timeout=10)
+        r = http_get(url, timeout=10)
         r.raise_for_status()
         props = r.json()["PropertyTable"]["Properties"][0]
         return {
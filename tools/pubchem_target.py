@@ -3,7 +3,7 @@
 # PUBCHEM COMPOUND LOOKUP (COMPOUND-ONLY, SAFE)
 # ============================================================
 
-import requests
+from tools.http_client import http_get
 
 
 def get_compounds_for_target(query, max_results=5):
@@ -34,7 +34,7 @@ def get_compounds_for_target(query, max_results=5):
             f"compound/name/{query}/cids/JSON"
         )
 
-        cid_resp = requests.get(cid_url, timeout=10)
+        cid_resp = http_get(cid_url, timeout=10)
         if cid_resp.status_code != 200:
             return []
 
@@ -53,7 +53,7 @@ def get_compounds_for_target(query, max_results=5):
                 f"compound/cid/{cid}/property/IUPACName/JSON"
             )
 
-            prop_resp = requests.get(prop_url, timeout=10)
+            prop_resp = http_get(prop_url, timeout=10)
             if prop_resp.status_code == 200:
                 props = (
                     prop_resp.json()
@@ -3,8 +3,6 @@
 # PUBMED SEARCH TOOL (CLEAN, SAFE, HGNC-COMPATIBLE)
 # ============================================================
 
-import requests
-
 
 class PubMedTool:
     """
@@ -14,6 +12,7 @@ class PubMedTool:
     ✔ Never returns text errors
     ✔ Safe for gene extraction
     ✔ NCBI-compliant
+    ✔ Backed by the local article store (tools.pubmed_store)
     """
 
     def __init__(self, email="researcher@example.com", tool="drug-discovery-ai"):
@@ -32,23 +31,10 @@ class PubMedTool:
             list[str]: PubMed IDs
         """
 
-        base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-
-        params = {
-            "db": "pubmed",
-            "term": query,
-            "retmode": "json",
-            "retmax": retmax,
-            "tool": self.tool,
-            "email": self.email
-        }
-
         try:
-            response = requests.get(base_url, params=params, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-            return data.get("esearchresult", {}).get("idlist", [])
+            # Local article store: NCBI is only asked for what is new
+            from tools.pubmed_store import get_pubmed_store
+            return get_pubmed_store().search_pmids(query, retmax=retmax)
 
         except Exception:
             # Silent fail — NEVER return text
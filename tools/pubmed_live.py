@@ -1,4 +1,5 @@
-import requests
+import os
+from tools.http_client import http_get
 from xml.etree import ElementTree
 import re
 from datetime import datetime
@@ -38,32 +39,51 @@ def extract_year(article):
     return None
 
 
-def fetch_pubmed_articles(query, max_results=20):
-    """
-    Fetch PubMed articles with safe publication years
-    """
+EUTILS = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+EFETCH_BATCH = 200
 
-    search_url = (
-        "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-        f"?db=pubmed&term={query}&retmax={max_results}&retmode=json"
-    )
+# NCBI asks E-utilities clients to identify themselves
+NCBI_PARAMS = {
+    "tool": "drug-discovery-ai",
+    "email": os.getenv("NCBI_EMAIL", "researcher@example.com")
+}
 
-    r = requests.get(search_url, timeout=10)
-    r.raise_for_status()
 
-    ids = r.json().get("esearchresult", {}).get("idlist", [])
-    if not ids:
-        return []
+def esearch_pmids(query, max_results=20, mindate=None, retstart=0):
+    """
+    PMIDs for a query, straight from NCBI esearch.
 
-    fetch_url = (
-        "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-        f"?db=pubmed&id={','.join(ids)}&retmode=xml"
-    )
+    mindate ("YYYY/MM/DD") restricts the search to records added to
+    PubMed on or after that date (Entrez date); retstart skips that
+    many results (paging).
+    """
+    params = {
+        "db": "pubmed",
+        "term": query,
+        "retmax": max_results,
+        "retmode": "json",
+        **NCBI_PARAMS
+    }
+    if retstart:
+        params["retstart"] = retstart
+    if mindate:
+        params.update({
+            "datetype": "edat",
+            "mindate": mindate,
+            "maxdate": datetime.utcnow().strftime("%Y/%m/%d")
+        })
 
-    r = requests.get(fetch_url, timeout=10)
+    r = http_get(f"{EUTILS}/esearch.fcgi", params=params, timeout=10)
     r.raise_for_status()
 
-    root = ElementTree.fromstring(r.content)
+    return r.json().get("esearchresult", {}).get("idlist", [])
+
+
+def parse_pubmed_xml(content):
+    """
+    efetch XML → article dicts (articles without abstract or year skipped).
+    """
+    root = ElementTree.fromstring(content)
     articles = []
 
     for article in root.findall(".//PubmedArticle"):
@@ -90,3 +110,54 @@ def fetch_pubmed_articles(query, max_results=20):
         })
 
     return articles
+
+
+def efetch_articles(pmids):
+    """
+    Full records for PMIDs, fetched from NCBI in batches.
+    """
+    articles = []
+    pmids = list(pmids)
+
+    for i in range(0, len(pmids), EFETCH_BATCH):
+        batch = pmids[i:i + EFETCH_BATCH]
+        r = http_get(
+            f"{EUTILS}/efetch.fcgi",
+            params={"db": "pubmed", "id": ",".join(batch), "retmode": "xml", **NCBI_PARAMS},
+            timeout=10
+        )
+        r.raise_for_status()
+        articles.extend(parse_pubmed_xml(r.content))
+
+    return articles
+
+
+def fetch_pubmed_articles(query, max_results=20, mindate=None):
+    """
+    Fetch PubMed articles with safe publication years
+
+    Served from the local article store (tools.pubmed_store): only PMIDs
+    not seen before are fetched from NCBI.
+    """
+    from tools.pubmed_store import get_pubmed_store
+
+    return get_pubmed_store().articles_for_query(
+        query,
+        max_results=max_results,
+        mindate=mindate
+    )
+
+
+def fetch_pubmed_articles_since(query, mindate, max_records=None):
+    """
+    Every record added to PubMed for a query since mindate, paged
+    (at most max_records, if given).
+
+    Returns:
+        (articles, complete): complete is False when the listing was
+        cut short (max_records, offline), so callers should not move
+        their mindate watermark forward.
+    """
+    from tools.pubmed_store import get_pubmed_store
+
+    return get_pubmed_store().articles_since(query, mindate, max_records=max_records)
@@ -0,0 +1,422 @@
+# ============================================================
+# LOCAL PUBMED ARTICLE STORE (SQLITE + FTS5, INCREMENTAL SYNC)
+# ============================================================
+
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+PUBMED_DB = os.path.join("data", "pubmed", "pubmed.sqlite")
+
+# A query synced within this window is answered locally, without NCBI
+SYNC_TTL_SECONDS = int(os.getenv("PUBMED_SYNC_TTL", str(24 * 3600)))
+
+ESEARCH_PAGE_SIZE = 100
+
+# PUBMED_OFFLINE=1 → never call NCBI (tests, air-gapped runs)
+OFFLINE = os.getenv("PUBMED_OFFLINE", "0") == "1"
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    pmid        TEXT PRIMARY KEY,
+    title       TEXT,
+    abstract    TEXT,           -- NULL: fetched, but no usable abstract/year
+    year        INTEGER,
+    fetched_at  REAL
+);
+
+CREATE TABLE IF NOT EXISTS queries (
+    query       TEXT PRIMARY KEY,
+    last_sync   TEXT,           -- YYYY/MM/DD, for esearch mindate
+    synced_at   REAL,
+    max_results INTEGER         -- widest esearch done for this query
+);
+
+CREATE TABLE IF NOT EXISTS query_pmids (
+    query       TEXT,
+    pmid        TEXT,
+    position    REAL,           -- esearch order; newer incremental records < 0
+    PRIMARY KEY (query, pmid)
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, abstract, content='articles', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, abstract)
+    VALUES (new.rowid, new.title, new.abstract);
+END;
+
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, abstract)
+    VALUES ('delete', old.rowid, old.title, old.abstract);
+END;
+
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, abstract)
+    VALUES ('delete', old.rowid, old.title, old.abstract);
+    INSERT INTO articles_fts(rowid, title, abstract)
+    VALUES (new.rowid, new.title, new.abstract);
+END;
+"""
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def _row_to_article(row):
+    return {
+        "pmid": row[0],
+        "title": row[1] or "",
+        "abstract": row[2],
+        "year": row[3]
+    }
+
+
+# ------------------------------------------------------------
+# STORE
+# ------------------------------------------------------------
+
+class PubMedStore:
+    """
+    Efetch results cached by PMID in SQLite.
+
+    ✔ Per-query incremental sync (esearch since last sync, efetch only unseen PMIDs)
+    ✔ FTS5 index over titles and abstracts
+    ✔ Offline mode: reads only, never touches NCBI
+    """
+
+    def __init__(self, path: str = PUBMED_DB, offline: bool = OFFLINE):
+        self.path = path
+        self.offline = offline
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self.fts = True
+
+        with self._write_lock:
+            conn = self._conn()
+            conn.executescript(SCHEMA)
+            columns = {r[1] for r in conn.execute("PRAGMA table_info(query_pmids)")}
+            if "position" not in columns:
+                # Stores created before PMIDs kept their esearch order
+                conn.execute("ALTER TABLE query_pmids ADD COLUMN position REAL")
+            try:
+                conn.executescript(FTS_SCHEMA)
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5 → LIKE fallback in search()
+                self.fts = False
+            conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def add_articles(self, articles, requested=()):
+        """
+        Upsert articles; requested PMIDs missing from `articles` are
+        recorded as unusable so they are not fetched again.
+        """
+        now = time.time()
+        rows = {
+            str(a["pmid"]): (
+                str(a["pmid"]), a.get("title", ""), a.get("abstract"), a.get("year"), now
+            )
+            for a in articles if a.get("pmid")
+        }
+        for pmid in requested:
+            rows.setdefault(str(pmid), (str(pmid), "", None, None, now))
+
+        with self._write_lock:
+            conn = self._conn()
+            conn.executemany(
+                "INSERT INTO articles(pmid, title, abstract, year, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(pmid) DO UPDATE SET title=excluded.title, "
+                "abstract=excluded.abstract, year=excluded.year, "
+                "fetched_at=excluded.fetched_at",
+                list(rows.values())
+            )
+            conn.commit()
+
+    def _link(self, query, pmids, full=False):
+        """
+        Link PMIDs to a query, keeping esearch order.
+
+        full=True: pmids is the query's whole (top-N) listing and
+        replaces the stored order. Otherwise they are newer records:
+        unseen ones go ahead of everything already linked.
+        """
+        pmids = [str(p) for p in pmids]
+        with self._write_lock:
+            conn = self._conn()
+            if full:
+                # PMIDs that dropped out of the listing sort after it
+                conn.execute("UPDATE query_pmids SET position = NULL WHERE query = ?", (query,))
+                conn.executemany(
+                    "INSERT INTO query_pmids(query, pmid, position) VALUES (?, ?, ?) "
+                    "ON CONFLICT(query, pmid) DO UPDATE SET position=excluded.position",
+                    [(query, p, i) for i, p in enumerate(pmids)]
+                )
+            else:
+                first = conn.execute(
+                    "SELECT COALESCE(MIN(position), 0) FROM query_pmids WHERE query = ?",
+                    (query,)
+                ).fetchone()[0]
+                known = {r[0] for r in conn.execute(
+                    "SELECT pmid FROM query_pmids WHERE query = ?", (query,)
+                )}
+                new = [p for p in dict.fromkeys(pmids) if p not in known]
+                conn.executemany(
+                    "INSERT OR IGNORE INTO query_pmids(query, pmid, position) VALUES (?, ?, ?)",
+                    [(query, p, first - len(new) + i) for i, p in enumerate(new)]
+                )
+            conn.commit()
+
+    def _mark_synced(self, query, max_results):
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT INTO queries(query, last_sync, synced_at, max_results) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(query) DO UPDATE SET last_sync=excluded.last_sync, "
+                "synced_at=excluded.synced_at, "
+                "max_results=MAX(COALESCE(queries.max_results, 0), excluded.max_results)",
+                (query, datetime.utcnow().strftime("%Y/%m/%d"), time.time(), int(max_results))
+            )
+            conn.commit()
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def known_pmids(self, pmids):
+        pmids = [str(p) for p in pmids]
+        if not pmids:
+            return set()
+        conn = self._conn()
+        found = set()
+        for i in range(0, len(pmids), 500):
+            batch = pmids[i:i + 500]
+            found.update(r[0] for r in conn.execute(
+                f"SELECT pmid FROM articles WHERE pmid IN ({','.join('?' * len(batch))})",
+                batch
+            ))
+        return found
+
+    def get_articles(self, pmids):
+        """
+        Usable stored articles for PMIDs, in the given order.
+        """
+        pmids = [str(p) for p in pmids]
+        if not pmids:
+            return []
+        conn = self._conn()
+        by_pmid = {}
+        for i in range(0, len(pmids), 500):
+            batch = pmids[i:i + 500]
+            for row in conn.execute(
+                "SELECT pmid, title, abstract, year FROM articles "
+                f"WHERE abstract IS NOT NULL AND pmid IN ({','.join('?' * len(batch))})",
+                batch
+            ):
+                by_pmid[row[0]] = _row_to_article(row)
+        return [by_pmid[p] for p in pmids if p in by_pmid]
+
+    def query_state(self, query):
+        row = self._conn().execute(
+            "SELECT last_sync, synced_at, max_results FROM queries WHERE query = ?",
+            (_normalize_query(query),)
+        ).fetchone()
+        if not row:
+            return None
+        return {"last_sync": row[0], "synced_at": row[1], "max_results": row[2] or 0}
+
+    def local_pmids(self, query, limit=None):
+        """
+        PMIDs linked to a query in esearch order, records added by
+        incremental syncs first (newest first).
+        """
+        sql = (
+            "SELECT pmid FROM query_pmids WHERE query = ? "
+            "ORDER BY position IS NULL, position, CAST(pmid AS INTEGER) DESC"
+        )
+        params = [_normalize_query(query)]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [r[0] for r in self._conn().execute(sql, params)]
+
+    def search(self, text: str, limit: int = 20):
+        """
+        Full-text search over stored titles and abstracts (BM25 ranked).
+        """
+        conn = self._conn()
+        if self.fts:
+            terms = " ".join(f'"{t}"' for t in text.replace('"', " ").split())
+            if not terms:
+                return []
+            rows = conn.execute(
+                "SELECT a.pmid, a.title, a.abstract, a.year "
+                "FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid "
+                "WHERE articles_fts MATCH ? AND a.abstract IS NOT NULL "
+                "ORDER BY bm25(articles_fts) LIMIT ?",
+                (terms, int(limit))
+            )
+        else:
+            like = f"%{text}%"
+            rows = conn.execute(
+                "SELECT pmid, title, abstract, year FROM articles "
+                "WHERE abstract IS NOT NULL AND (title LIKE ? OR abstract LIKE ?) "
+                "LIMIT ?",
+                (like, like, int(limit))
+            )
+        return [_row_to_article(r) for r in rows]
+
+    # -------------------------
+    # Sync with NCBI
+    # -------------------------
+    def _fetch_missing(self, pmids):
+        from tools.pubmed_live import efetch_articles
+
+        known = self.known_pmids(pmids)
+        missing = [p for p in pmids if p not in known]
+        if missing:
+            self.add_articles(efetch_articles(missing), requested=missing)
+        return missing
+
+    def sync(self, query: str, max_results: int = 20, force: bool = False):
+        """
+        Bring a query up to date.
+
+        First sync (or a wider max_results than before): esearch + efetch.
+        Later syncs (after SYNC_TTL_SECONDS, or force=True): esearch only
+        for records added since the last sync, efetch only PMIDs not
+        already stored.
+
+        Returns:
+            dict: {"query", "new_pmids", "fetched", "skipped"}
+        """
+        from tools.pubmed_live import esearch_pmids
+
+        key = _normalize_query(query)
+        state = self.query_state(key)
+
+        wider = state is None or max_results > state["max_results"]
+        fresh = state and time.time() - state["synced_at"] < SYNC_TTL_SECONDS
+
+        if self.offline or (fresh and not wider and not force):
+            return {"query": key, "new_pmids": 0, "fetched": 0, "skipped": True}
+
+        mindate = None if wider else state["last_sync"]
+        pmids = [str(p) for p in esearch_pmids(query, max_results=max_results, mindate=mindate)]
+
+        fetched = self._fetch_missing(pmids)
+        self._link(key, pmids, full=wider)
+        self._mark_synced(key, max_results)
+
+        return {"query": key, "new_pmids": len(pmids), "fetched": len(fetched), "skipped": False}
+
+    def articles_for_query(self, query: str, max_results: int = 20, mindate=None):
+        """
+        Articles for a query, synced incrementally and read locally.
+
+        With mindate, returns only records added to PubMed since then
+        (esearch with mindate; bodies still come from the store). That
+        capped listing is linked to the query but does not count as a
+        sync, so the next sync() still covers everything since the last.
+        """
+        if mindate and not self.offline:
+            from tools.pubmed_live import esearch_pmids
+
+            pmids = [str(p) for p in esearch_pmids(query, max_results=max_results, mindate=mindate)]
+            self._fetch_missing(pmids)
+            self._link(_normalize_query(query), pmids)
+            return self.get_articles(pmids)
+
+        self.sync(query, max_results=max_results)
+        return self.get_articles(self.local_pmids(query, limit=max_results))
+
+    def articles_since(self, query: str, mindate: str, page_size: int | None = None,
+                       max_records: int | None = None):
+        """
+        Every record added to PubMed for a query since mindate, paged
+        through esearch with retstart (bodies come from the store).
+
+        Returns:
+            (articles, complete): complete is False if max_records cut
+            the listing short, or offline (nothing could be checked)
+        """
+        if self.offline:
+            return [], False
+
+        from tools.pubmed_live import esearch_pmids
+
+        page_size = page_size or ESEARCH_PAGE_SIZE
+        pmids, complete = [], False
+        while max_records is None or len(pmids) < max_records:
+            size = page_size if max_records is None else min(page_size, max_records - len(pmids))
+            page = [
+                str(p) for p in esearch_pmids(
+                    query, max_results=size, mindate=mindate, retstart=len(pmids)
+                )
+            ]
+            pmids.extend(page)
+            if len(page) < size:
+                complete = True
+                break
+
+        pmids = list(dict.fromkeys(pmids))
+        self._fetch_missing(pmids)
+        self._link(_normalize_query(query), pmids)
+        return self.get_articles(pmids), complete
+
+    def search_pmids(self, query: str, retmax: int = 5):
+        self.sync(query, max_results=retmax)
+        return self.local_pmids(query, limit=retmax)
+
+    def stats(self):
+        conn = self._conn()
+        return {
+            "articles": conn.execute(
+                "SELECT COUNT(*) FROM articles WHERE abstract IS NOT NULL"
+            ).fetchone()[0],
+            "queries": conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0],
+            "fts": self.fts
+        }
+
+
+# ------------------------------------------------------------
+# SHARED INSTANCE
+# ------------------------------------------------------------
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_pubmed_store():
+    global _STORE
+    with _STORE_LOCK:
+        if _STORE is None:
+            _STORE = PubMedStore()
+    return _STORE
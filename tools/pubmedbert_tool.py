@@ -1,5 +1,5 @@
 import os
-import requests
+from tools.http_client import http_post
 
 HF_API_TOKEN = os.getenv("HF_API_TOKEN")
 
@@ -30,7 +30,7 @@ def pubmedbert_summarize(text):
     }
 
     try:
-        response = requests.post(
+        response = http_post(
             HF_API_URL,
             headers=HEADERS,
             json=payload,
@@ -1,14 +1,144 @@
 # tools/qsar.py
 
-import math
+import os
+import time
 import random
+import threading
+
+import numpy as np
+
+from tools.descriptors import compute_descriptors, descriptor_index, DESCRIPTOR_NAMES
+
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))
+
+QSAR_MODEL_PATH = os.path.join(BASE_DIR, "data", "models", "qsar_rf.joblib")
+
+
+# ------------------------------------------------------------
+# TRAINING (compound_features.csv-style tables)
+# ------------------------------------------------------------
+
+def train_qsar_model(
+    csv_path: str,
+    target_column: str,
+    feature_columns: list | None = None,
+    model_path: str = QSAR_MODEL_PATH,
+    random_state: int = 42
+):
+    """
+    Fit a RandomForest QSAR regressor and save it with joblib.
+
+    Features are either the table's numeric columns (like
+    data/compound_features.csv) or, if the table has a "smiles" column,
+    the RDKit descriptors from tools.descriptors.
+
+    Returns:
+        dict: {"model_path", "features", "n_train", "n_test", "test_mse"}
+    """
+    import joblib
+    import pandas as pd
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_squared_error
+
+    df = pd.read_csv(csv_path)
+    df = df[df[target_column].notna()]
+    y = df[target_column].to_numpy(dtype=float)
+
+    if feature_columns is None and "smiles" in df.columns:
+        X = compute_descriptors(df["smiles"].astype(str))
+        features = list(DESCRIPTOR_NAMES)
+    else:
+        features = feature_columns or [
+            c for c in df.select_dtypes("number").columns if c != target_column
+        ]
+        X = df[features].to_numpy(dtype=float)
+
+    fill_values = np.nan_to_num(np.nanmedian(X, axis=0), nan=0.0)
+    X = np.where(np.isnan(X), fill_values, X)
+
+    if len(X) >= 5:
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=random_state
+        )
+    else:
+        X_train, X_test, y_train, y_test = X, X, y, y
+
+    model = RandomForestRegressor(
+        n_estimators=200,
+        random_state=random_state,
+        n_jobs=-1
+    )
+    model.fit(X_train, y_train)
+    test_mse = float(mean_squared_error(y_test, model.predict(X_test)))
+
+    bundle = {
+        "model": model,
+        "features": features,
+        "target": target_column,
+        "fill_values": fill_values,
+        "y_min": float(y.min()),
+        "y_max": float(y.max()),
+    }
+
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    joblib.dump(bundle, model_path)
+    _MODELS.pop(model_path, None)
+
+    print(f"✅ QSAR model saved → {model_path} (test MSE {test_mse:.4f})")
+    return {
+        "model_path": model_path,
+        "features": features,
+        "n_train": len(X_train),
+        "n_test": len(X_test),
+        "test_mse": round(test_mse, 4),
+    }
+
+
+# ------------------------------------------------------------
+# MODEL LOADING (ONCE PER PROCESS)
+# ------------------------------------------------------------
+
+_MODELS = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def load_qsar_model(model_path: str = QSAR_MODEL_PATH):
+    """
+    Load the serialized QSAR bundle once per process (reloaded only if
+    the file changes). Returns None if no model has been trained.
+    """
+    if not os.path.exists(model_path):
+        return None
+
+    mtime = os.stat(model_path).st_mtime_ns
+
+    with _MODELS_LOCK:
+        cached = _MODELS.get(model_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        import joblib
+        bundle = joblib.load(model_path)
+        # Single-row calls are latency-bound; avoid spawning threads
+        bundle["model"].set_params(n_jobs=1)
+        _MODELS[model_path] = (mtime, bundle)
+        return bundle
+
 
 class QSARTool:
     """
-    Lightweight QSAR proxy (NOT claiming trained ML model).
-    Produces chemically reasonable, non-constant scores.
+    QSAR scoring.
+
+    ✔ predict(): lightweight heuristic proxy for single compounds
+    ✔ predict_batch(): trained RandomForest (data/models/qsar_rf.joblib)
+      over a whole descriptor matrix, deterministic
     """
 
+    def __init__(self, model_path: str = QSAR_MODEL_PATH):
+        self.model_path = model_path
+        self.last_stats = {}
+
     def _safe_float(self, x, default):
         try:
             return float(x)
@@ -45,3 +175,151 @@ class QSARTool:
         jitter = random.uniform(-0.05, 0.05)
 
         return round(max(0.3, min(base + jitter, 1.0)), 3)
+
+    def predict_descriptors(self, X, jitter: bool = True):
+        """
+        Vectorized form of predict() over a descriptor matrix
+        (rows from tools.descriptors.compute_descriptors) or a list
+        of SMILES. Missing descriptors use the same defaults.
+        """
+        if not isinstance(X, np.ndarray):
+            X = compute_descriptors(X)
+
+        mw = np.nan_to_num(X[:, descriptor_index("MW")], nan=350)
+        logp = np.nan_to_num(X[:, descriptor_index("LogP")], nan=2.5)
+
+        mw_penalty = np.abs(mw - 350) / 350
+        logp_penalty = np.abs(logp - 2.5) / 2.5
+
+        base = np.clip(1.0 - (0.4 * mw_penalty + 0.3 * logp_penalty), 0.3, 0.9)
+        if jitter:
+            base = base + np.random.uniform(-0.05, 0.05, size=len(base))
+
+        return np.round(np.clip(base, 0.3, 1.0), 3)
+
+    # --------------------------------------------------------
+    # BATCH SCORING (TRAINED MODEL)
+    # --------------------------------------------------------
+
+    def _feature_matrix(self, compounds, features, fill_values):
+        """
+        Build the model's feature matrix from a matrix, SMILES or dicts.
+
+        Returns:
+            (X, scorable): scorable marks rows with at least one of the
+            model's features present; X is None when the input cannot
+            be mapped onto those features at all.
+        """
+        n = len(compounds)
+        named = all(f in DESCRIPTOR_NAMES for f in features)
+
+        if isinstance(compounds, np.ndarray):
+            X = compounds.astype(float)
+            if X.shape[1] == len(DESCRIPTOR_NAMES) and len(features) != X.shape[1]:
+                if not named:
+                    return None, np.zeros(n, dtype=bool)
+                X = X[:, [descriptor_index(f) for f in features]]
+            elif X.shape[1] != len(features):
+                return None, np.zeros(n, dtype=bool)
+
+        elif compounds and isinstance(compounds[0], dict):
+            X = np.array([
+                [self._safe_float(c.get(f), np.nan) for f in features]
+                for c in compounds
+            ])
+
+        else:
+            if not named:
+                return None, np.zeros(n, dtype=bool)
+            D = compute_descriptors(compounds)
+            X = D[:, [descriptor_index(f) for f in features]]
+
+        scorable = ~np.isnan(X).all(axis=1)
+        return np.where(np.isnan(X), fill_values, X), scorable
+
+    def _heuristic_batch(self, compounds):
+        """
+        predict_descriptors() without jitter, for matrices, SMILES or dicts.
+        """
+        if isinstance(compounds, np.ndarray) or not isinstance(compounds[0], dict):
+            X = compounds
+        else:
+            X = np.full((len(compounds), len(DESCRIPTOR_NAMES)), np.nan)
+            for i, c in enumerate(compounds):
+                X[i, descriptor_index("MW")] = self._safe_float(c.get("MW"), 350)
+                X[i, descriptor_index("LogP")] = self._safe_float(
+                    c.get("LogP", c.get("logP")), 2.5
+                )
+        return self.predict_descriptors(X, jitter=False)
+
+    def predict_batch(self, compounds, raw: bool = False):
+        """
+        Score many compounds in one call.
+
+        Args:
+            compounds: descriptor matrix, list of SMILES, or list of
+                dicts keyed by feature name (e.g. {"MW": .., "LogP": ..})
+            raw: return the regressor output instead of a 0–1 score
+
+        Returns:
+            np.ndarray (deterministic). Without a trained model the
+            heuristic of predict() is used, minus its random jitter;
+            the same goes for inputs that share none of the model's
+            features (e.g. a model trained on feature1..3 given
+            {"MW", "LogP"} dicts).
+        """
+        start = time.perf_counter()
+        n = len(compounds)
+
+        if n == 0:
+            return np.array([])
+
+        bundle = load_qsar_model(self.model_path)
+        X, scorable = (None, None) if bundle is None else self._feature_matrix(
+            compounds, bundle["features"], bundle["fill_values"]
+        )
+
+        if X is None or not scorable.any():
+            if bundle is not None:
+                _warn_feature_mismatch(self.model_path, bundle["features"])
+            scores = self._heuristic_batch(compounds)
+            source = "heuristic"
+        else:
+            scores = bundle["model"].predict(X)
+            if not raw:
+                span = (bundle["y_max"] - bundle["y_min"]) or 1.0
+                scores = np.round(np.clip((scores - bundle["y_min"]) / span, 0, 1), 3)
+
+            # Rows with none of the model's features: heuristic, not medians
+            if not scorable.all():
+                missing = ~scorable
+                rows = compounds[missing] if isinstance(compounds, np.ndarray) else [
+                    c for c, m in zip(compounds, missing) if m
+                ]
+                scores = np.asarray(scores, dtype=float)
+                scores[missing] = self._heuristic_batch(rows)
+            source = "model"
+
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            "n": n,
+            "seconds": round(elapsed, 4),
+            "compounds_per_sec": round(n / elapsed, 1) if elapsed else None,
+            "source": source,
+            "model_rows": int(scorable.sum()) if source == "model" else 0,
+        }
+        return scores
+
+
+_WARNED = set()
+
+
+def _warn_feature_mismatch(model_path, features):
+    # Once per model file, not once per call
+    if model_path in _WARNED:
+        return
+    _WARNED.add(model_path)
+    print(
+        f"⚠️ QSAR model {model_path} expects features {list(features)}; "
+        "input has none of them, using the heuristic score"
+    )
@@ -61,6 +61,30 @@ def _clean_sentences(text: str, max_sentences=4):
     return clean
 
 
+# ------------------------------------------------------------
+# LOCAL LITERATURE (ARTICLE STORE, NO NETWORK)
+# ------------------------------------------------------------
+def _local_abstracts(pmids, gene=None, max_articles=5):
+    """
+    Abstracts for PMIDs already in the local PubMed store, preferring
+    those that mention the gene.
+    """
+    if not pmids or not isinstance(pmids, (list, tuple)):
+        return ""
+
+    try:
+        from tools.pubmed_store import get_pubmed_store
+        articles = get_pubmed_store().get_articles(pmids)
+    except Exception:
+        return ""
+
+    if gene:
+        mentioning = [a for a in articles if gene.upper() in a["abstract"].upper()]
+        articles = mentioning or articles
+
+    return " ".join(a["abstract"] for a in articles[:max_articles])
+
+
 # ------------------------------------------------------------
 # MAIN EXPLAIN FUNCTION (SAFE + STABLE)
 # ------------------------------------------------------------
@@ -79,6 +103,7 @@ def explain(
     Backward-compatible with all pipeline calls.
     """
 
+    symbol = gene                           # None when no gene was given
     gene = gene or "the gene"
     gene_cap = gene[0].upper() + gene[1:]   # ✅ FIX: always capitalized start
     disease = disease or query or "the disease"
@@ -110,7 +135,7 @@ def explain(
     # -------------------------------------------------
     # 3️⃣ LITERATURE EVIDENCE
     # -------------------------------------------------
-    raw_text = text or context or ""
+    raw_text = text or context or _local_abstracts(kwargs.get("literature"), symbol)
     evidence = _clean_sentences(raw_text)
 
     if evidence:
@@ -5,6 +5,7 @@
 import os
 import shutil
 import subprocess
+from functools import lru_cache
 
 
 # ============================================================
@@ -16,16 +17,29 @@ BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 ALPHAFOLD_DIR = os.path.join(BASE_DIR, "data", "alphafold_structures")
 RECEPTOR_DIR = os.path.join(BASE_DIR, "data", "receptors")
 
-os.makedirs(RECEPTOR_DIR, exist_ok=True)
+# "native" = in-process RDKit writer, "adt" = prepare_receptor4.py subprocess
+PDBQT_METHOD = "native"
+
+
+@lru_cache(maxsize=None)
+def _ensure_dirs():
+    """
+    Create the receptor output directory on first use (not at import).
+    """
+    os.makedirs(RECEPTOR_DIR, exist_ok=True)
 
 
 # ============================================================
-# FIND AutoDockTools SCRIPT
+# FIND AutoDockTools SCRIPT (LAZY, MEMOIZED)
 # ============================================================
 
+@lru_cache(maxsize=None)
 def find_prepare_receptor():
     """
     Locate prepare_receptor4.py safely.
+
+    Only called when the AutoDockTools route is actually used; the
+    result is memoized. Raises RuntimeError if the script is missing.
     """
     candidates = [
         "prepare_receptor4.py",
@@ -43,20 +57,59 @@ def find_prepare_receptor():
     )
 
 
-PREPARE_RECEPTOR = find_prepare_receptor()
+# ============================================================
+# CONVERSION BACKENDS
+# ============================================================
+
+def _convert_native(pdb_file: str, pdbqt_file: str):
+    """
+    PDB → PDBQT in-process: add polar/non-polar H, Gasteiger charges,
+    merge non-polar H, AD4 atom types.
+    """
+    from rdkit import Chem
+    from tools.pdbqt_writer import receptor_to_pdbqt
+
+    mol = Chem.MolFromPDBFile(pdb_file, removeHs=False)
+    if mol is None:
+        raise ValueError(f"RDKit could not parse {pdb_file}")
+
+    mol = Chem.AddHs(mol, addCoords=True, addResidueInfo=True)
+    text = receptor_to_pdbqt(mol)
+
+    tmp = f"{pdbqt_file}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, pdbqt_file)
+
+
+def _convert_adt(pdb_file: str, pdbqt_file: str):
+    cmd = [
+        find_prepare_receptor(),
+        "-r", pdb_file,
+        "-o", pdbqt_file,
+        "-A", "hydrogens"
+    ]
+
+    subprocess.run(
+        cmd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True
+    )
 
 
 # ============================================================
 # CORE FUNCTION
 # ============================================================
 
-def prepare_receptor(gene: str, force: bool = False):
+def prepare_receptor(gene: str, force: bool = False, method: str = PDBQT_METHOD):
     """
     Prepare protein receptor for docking
 
     Args:
         gene (str): gene/protein name (HGNC)
         force (bool): overwrite existing PDBQT
+        method (str): "native" (in-process writer) or "adt" (prepare_receptor4.py)
 
     Returns:
         dict:
@@ -68,6 +121,7 @@ def prepare_receptor(gene: str, force: bool = False):
     """
 
     gene = gene.strip().upper()
+    _ensure_dirs()
 
     pdb_file = os.path.join(ALPHAFOLD_DIR, f"{gene}.pdb")
     pdbqt_file = os.path.join(RECEPTOR_DIR, f"{gene}.pdbqt")
@@ -87,19 +141,14 @@ def prepare_receptor(gene: str, force: bool = False):
         }
 
     try:
-        cmd = [
-            PREPARE_RECEPTOR,
-            "-r", pdb_file,
-            "-o", pdbqt_file,
-            "-A", "hydrogens"
-        ]
-
-        subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            check=True
-        )
+        if method == "adt":
+            _convert_adt(pdb_file, pdbqt_file)
+        else:
+            try:
+                _convert_native(pdb_file, pdbqt_file)
+            except Exception as e:
+                print(f"⚠️ Native PDBQT writer failed for {gene} ({e}), using prepare_receptor4.py")
+                _convert_adt(pdb_file, pdbqt_file)
 
         if os.path.exists(pdbqt_file):
             return {
@@ -112,7 +161,7 @@ def prepare_receptor(gene: str, force: bool = False):
         return {
             "status": "error",
             "path": None,
-            "message": f"prepare_receptor4.py failed: {e}"
+            "message": f"PDBQT conversion failed: {e}"
         }
 
     return {
@@ -128,7 +177,8 @@ def prepare_receptor(gene: str, force: bool = False):
 
 def prepare_receptors_for_genes(
     genes: list,
-    force: bool = False
+    force: bool = False,
+    method: str = PDBQT_METHOD
 ):
     """
     Prepare docking receptors for multiple gene targets.
@@ -142,7 +192,8 @@ def prepare_receptors_for_genes(
     for gene in genes:
         results[gene] = prepare_receptor(
             gene=gene,
-            force=force
+            force=force,
+            method=method
         )
 
     return results
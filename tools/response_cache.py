@@ -0,0 +1,394 @@
+# ============================================================
+# TWO-TIER RESPONSE CACHE (IN-PROCESS LRU + SHARED STORE)
+# ============================================================
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+RESPONSE_CACHE_DB = os.path.join("data", "cache", "responses.sqlite")
+
+# Bump when pipeline output changes, so stale results are never served
+PIPELINE_VERSION = os.getenv("PIPELINE_VERSION", "1")
+
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))       # seconds
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))      # entries per endpoint
+
+# Cache status values (X-Cache header)
+HIT = "HIT"
+MISS = "MISS"
+COALESCED = "COALESCED"
+
+
+def normalize_query(query: str) -> str:
+    return " ".join((query or "").lower().split())
+
+
+def json_default(obj):
+    # numpy scalars / arrays, torch tensors
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if isinstance(obj, (set, tuple)):
+        return list(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+# ------------------------------------------------------------
+# SHARED STORES
+# ------------------------------------------------------------
+
+class SQLiteResponseStore:
+    """
+    Local shared tier: survives restarts, shared by workers on one host.
+    """
+
+    def __init__(self, path: str = RESPONSE_CACHE_DB):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT, created_at REAL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_created ON responses(created_at)"
+            )
+            conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, ttl: int):
+        row = self._conn().execute(
+            "SELECT value, created_at FROM responses WHERE key = ? AND created_at >= ?",
+            (key, time.time() - ttl)
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, key: str, value: str, created_at: float, ttl: int):
+        with self._write_lock:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses(key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at)
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (created_at - ttl,))
+            conn.commit()
+
+
+class MongoResponseStore:
+    """
+    Cluster-wide shared tier; a TTL index lets Mongo drop expired entries.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        try:
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+        except Exception as e:
+            print("⚠️ Response cache TTL index not created:", e)
+
+    def get(self, key: str, ttl: int):
+        doc = self.collection.find_one({"_id": key})
+        if not doc or time.time() - doc["created_at"] > ttl:
+            return None
+        return doc["value"], doc["created_at"]
+
+    def put(self, key: str, value: str, created_at: float, ttl: int):
+        self.collection.replace_one(
+            {"_id": key},
+            {
+                "_id": key,
+                "value": value,
+                "created_at": created_at,
+                "expires_at": datetime.utcnow() + timedelta(seconds=ttl)
+            },
+            upsert=True
+        )
+
+
+# ------------------------------------------------------------
+# CACHE
+# ------------------------------------------------------------
+
+class _LeaderGone(Exception):
+    """
+    Set on a coalescing future when its leader was cancelled or
+    interrupted; waiters claim the key again instead of failing.
+    """
+
+
+class ResponseCache:
+    """
+    Endpoint result cache keyed on (endpoint, normalized query, pipeline version).
+
+    ✔ Tier 1: in-process LRU with TTL
+    ✔ Tier 2: shared store (SQLite by default, Mongo when connected)
+    ✔ Request coalescing: concurrent identical queries compute once
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: int = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        store=None,
+        version: str = PIPELINE_VERSION
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self.version = version
+
+        self._entries = OrderedDict()        # key → (value, created_at)
+        self._inflight = {}                  # key → Future
+        self._lock = threading.Lock()
+
+        self.counts = {"memory": 0, "shared": 0, "miss": 0, "coalesced": 0}
+
+    def key(self, query: str, **params) -> str:
+        payload = json.dumps(
+            [self.name, normalize_query(query), self.version, params],
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # -------------------------
+    # Tiers
+    # -------------------------
+    def _memory_get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry[1] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _memory_put(self, key, value, created_at):
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _shared_get(self, key):
+        if self.store is None:
+            return None
+        try:
+            found = self.store.get(key, self.ttl)
+            if found is None:
+                return None
+            return json.loads(found[0]), found[1]
+        except Exception as e:
+            print(f"⚠️ Response cache read failed ({self.name}):", e)
+            return None
+
+    def _shared_put(self, key, value, created_at):
+        if self.store is None:
+            return
+        try:
+            self.store.put(key, json.dumps(value, default=json_default), created_at, self.ttl)
+        except Exception as e:
+            print(f"⚠️ Response cache write failed ({self.name}):", e)
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+    def _claim(self, key):
+        """
+        (entry, None, False) on a memory hit, otherwise (None, future,
+        leader); only the leader computes, everyone else waits on future.
+        """
+        with self._lock:
+            entry = self._memory_get(key)
+            if entry is not None:
+                self.counts["memory"] += 1
+                return entry, None, False
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counts["coalesced"] += 1
+                return None, future, False
+
+            future = Future()
+            future.set_running_or_notify_cancel()     # waiters cannot cancel it
+            self._inflight[key] = future
+            return None, future, True
+
+    def _promote(self, key, entry):
+        with self._lock:
+            self.counts["shared"] += 1
+            self._memory_put(key, *entry)
+
+    def _store(self, key, entry, cacheable):
+        with self._lock:
+            self.counts["miss"] += 1
+        if cacheable is None or cacheable(entry[0]):
+            self._shared_put(key, *entry)
+            with self._lock:
+                self._memory_put(key, *entry)
+
+    def _release(self, key, future):
+        # Only our own future: a waiter may already lead a new computation
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _abandon(self, key, future):
+        """
+        The leader was cancelled (e.g. its request went away): free the
+        key and wake the waiters so one of them takes over, rather than
+        handing them a cancellation that is not theirs.
+        """
+        self._release(key, future)
+        future.set_exception(_LeaderGone())
+
+    def get_or_compute(self, query: str, compute, cacheable=None, **params):
+        """
+        Cached result for a query, computing it at most once at a time.
+
+        `cacheable(result)` → False keeps a result out of both tiers
+        (partial or degraded output); it is still returned to every
+        caller coalesced onto the computation.
+
+        Returns:
+            tuple: (result, status, age_seconds), status in HIT / MISS / COALESCED
+        """
+        key = self.key(query, **params)
+
+        while True:
+            entry, future, leader = self._claim(key)
+
+            if entry is not None:
+                return entry[0], HIT, time.time() - entry[1]
+            if leader:
+                break
+
+            try:
+                value, created_at = future.result()
+            except _LeaderGone:
+                continue
+            return value, COALESCED, time.time() - created_at
+
+        try:
+            entry = self._shared_get(key)
+            if entry is not None:
+                status = HIT
+                self._promote(key, entry)
+            else:
+                status = MISS
+                entry = (compute(), time.time())
+                self._store(key, entry, cacheable)
+
+            future.set_result(entry)
+
+        except Exception as e:
+            future.set_exception(e)
+            raise
+
+        except BaseException:
+            self._abandon(key, future)
+            raise
+
+        finally:
+            self._release(key, future)
+
+        return entry[0], status, time.time() - entry[1]
+
+    async def aget_or_compute(self, query: str, compute, cacheable=None, **params):
+        """
+        get_or_compute() for the event loop: compute() returns an
+        awaitable and shared-store I/O runs in a worker thread.
+        Coalesces with synchronous callers of the same key.
+        """
+        key = self.key(query, **params)
+
+        while True:
+            entry, future, leader = self._claim(key)
+
+            if entry is not None:
+                return entry[0], HIT, time.time() - entry[1]
+            if leader:
+                break
+
+            try:
+                value, created_at = await asyncio.wrap_future(future)
+            except _LeaderGone:
+                continue
+            return value, COALESCED, time.time() - created_at
+
+        try:
+            entry = await asyncio.to_thread(self._shared_get, key)
+            if entry is not None:
+                status = HIT
+                self._promote(key, entry)
+            else:
+                status = MISS
+                entry = (await compute(), time.time())
+                await asyncio.to_thread(self._store, key, entry, cacheable)
+
+            future.set_result(entry)
+
+        except Exception as e:
+            future.set_exception(e)
+            raise
+
+        except BaseException:                # CancelledError: not the waiters' failure
+            self._abandon(key, future)
+            raise
+
+        finally:
+            self._release(key, future)
+
+        return entry[0], status, time.time() - entry[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "endpoint": self.name,
+                "version": self.version,
+                "ttl": self.ttl,
+                "entries": len(self._entries),
+                "inflight": len(self._inflight),
+                "store": type(self.store).__name__ if self.store is not None else None,
+                **self.counts
+            }
+
+
+def cache_headers(status: str, age: float, ttl: int) -> dict:
+    """
+    HTTP headers describing how a response was served.
+    """
+    age = max(0, int(age))
+    return {
+        "X-Cache": status,
+        "Age": str(age),
+        "Cache-Control": f"max-age={max(0, ttl - age)}",
+    }
@@ -0,0 +1,171 @@
+# ============================================================
+# FINGERPRINT SIMILARITY INDEX (MORGAN / ECFP4, TANIMOTO TOP-K)
+# ============================================================
+
+import numpy as np
+
+from tools.fingerprint_index import FingerprintIndex, get_library_index
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+FP_RADIUS = 2          # ECFP4
+FP_BITS = 2048
+FP_BYTES = FP_BITS // 8
+
+QUERY_CHUNK_ROWS = 262_144   # ~64 MB of fingerprints per scan step
+MAX_TOP_K = 1000             # largest k served per query
+
+
+# ------------------------------------------------------------
+# FINGERPRINTS
+# ------------------------------------------------------------
+
+def _generator():
+    from rdkit.Chem import rdFingerprintGenerator
+    return rdFingerprintGenerator.GetMorganGenerator(radius=FP_RADIUS, fpSize=FP_BITS)
+
+
+def fingerprint(smiles: str):
+    """
+    Packed Morgan fingerprint (uint8[FP_BYTES]) or None for bad SMILES.
+    """
+    from rdkit import Chem
+
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        return None
+    bits = _generator().GetFingerprintAsNumPy(mol).astype(np.uint8)
+    return np.packbits(bits)
+
+
+def _fingerprint_chunk(smiles_chunk):
+    from rdkit import Chem
+
+    gen = _generator()
+    out = np.zeros((len(smiles_chunk), FP_BYTES), dtype=np.uint8)
+    ok = np.zeros(len(smiles_chunk), dtype=bool)
+
+    for i, smi in enumerate(smiles_chunk):
+        mol = Chem.MolFromSmiles(smi) if smi else None
+        if mol is None:
+            continue
+        out[i] = np.packbits(gen.GetFingerprintAsNumPy(mol).astype(np.uint8))
+        ok[i] = True
+
+    return out, ok
+
+
+# ------------------------------------------------------------
+# POPCOUNT
+# ------------------------------------------------------------
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_rows(packed: np.ndarray):
+    """
+    Bits set per row of a uint8 matrix.
+    """
+    if hasattr(np, "bitwise_count"):   # NumPy ≥ 2.0
+        # 64-bit words: 8x fewer elements than bytes
+        words = np.ascontiguousarray(packed).view(np.uint64)
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_TABLE[packed].sum(axis=1, dtype=np.int32)
+
+
+# ------------------------------------------------------------
+# INDEX
+# ------------------------------------------------------------
+
+class SimilarityIndex(FingerprintIndex):
+    """
+    Memory-mapped Morgan fingerprint index (see FingerprintIndex for the
+    file layout), plus similarity_counts.npy: int32[n] bits set per row.
+    """
+
+    PREFIX = "similarity"
+    FP_BYTES = FP_BYTES
+    ARRAYS = ("counts",)
+    LABEL = "Similarity"
+
+    fingerprint_chunk = staticmethod(_fingerprint_chunk)
+
+    def extra_arrays(self, fps):
+        return {"counts": _popcount_rows(fps)}
+
+    def meta(self):
+        return {"radius": FP_RADIUS, "bits": FP_BITS}
+
+    # -------------------------
+    # Query
+    # -------------------------
+    def tanimoto(self, query_fp: np.ndarray):
+        """
+        Tanimoto similarity of one packed fingerprint against every row.
+        """
+        q_count = int(_popcount_rows(query_fp[None, :])[0])
+        q_words = np.ascontiguousarray(query_fp).view(np.uint64)
+        sims = np.empty(len(self), dtype=np.float32)
+
+        for start in range(0, len(self), QUERY_CHUNK_ROWS):
+            block = np.asarray(self.fps[start:start + QUERY_CHUNK_ROWS]).view(np.uint64)
+            inter = _popcount_rows(np.bitwise_and(block, q_words).view(np.uint8))
+            union = self.counts[start:start + len(block)] + q_count - inter
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sims[start:start + len(block)] = np.where(union > 0, inter / union, 0.0)
+
+        return sims
+
+    def search(self, smiles: str, k: int = 10, min_similarity: float = 0.0):
+        """
+        Top-k most similar library compounds.
+
+        Returns:
+            list[dict]: [{"id", "smiles", "similarity"}], best first
+        """
+        fp = fingerprint(smiles)
+        if fp is None or len(self) == 0 or k < 1:
+            return []
+
+        sims = self.tanimoto(fp)
+        k = min(k, MAX_TOP_K, len(sims))
+
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+
+        return [
+            {
+                "id": self.ids[i],
+                "smiles": self.smiles[i],
+                "similarity": round(float(sims[i]), 4),
+            }
+            for i in top
+            if sims[i] >= min_similarity
+        ]
+
+
+# ------------------------------------------------------------
+# SHARED INDEX OVER THE COMPOUND LIBRARY
+# ------------------------------------------------------------
+
+def get_similarity_index(rebuild: bool = False):
+    """
+    Similarity index over the compound library (see get_library_index).
+
+    Returns:
+        SimilarityIndex | None (if the library is missing)
+    """
+    return get_library_index(SimilarityIndex, rebuild=rebuild)
+
+
+def find_similar_compounds(smiles: str, k: int = 10, min_similarity: float = 0.0):
+    """
+    Top-k library compounds by Tanimoto similarity to a query SMILES.
+    """
+    index = get_similarity_index()
+    if index is None:
+        return []
+    return index.search(smiles, k=k, min_similarity=min_similarity)
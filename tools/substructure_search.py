@@ -0,0 +1,235 @@
+# ============================================================
+# SUBSTRUCTURE SCREENING (PATTERN-FINGERPRINT PREFILTER + MATCH)
+# ============================================================
+
+import os
+import time
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from tools.fingerprint_index import FingerprintIndex, INDEX_DIR, get_library_index
+
+
+# ------------------------------------------------------------
+# CONFIG
+# ------------------------------------------------------------
+
+PATTERN_BITS = 2048
+PATTERN_BYTES = PATTERN_BITS // 8
+
+SCREEN_CHUNK_ROWS = 262_144
+MAX_HITS = 1000            # largest limit served per query
+
+# Fewer survivors than this are matched in-process (pool startup dominates)
+PARALLEL_THRESHOLD = 2000
+MATCH_CHUNK = 500
+
+
+# ------------------------------------------------------------
+# QUERY / FINGERPRINTS
+# ------------------------------------------------------------
+
+def parse_query(query: str):
+    """
+    Scaffold as SMILES, or SMARTS if it is not valid SMILES.
+    """
+    from rdkit import Chem, RDLogger
+
+    if not query:
+        return None
+
+    RDLogger.DisableLog("rdApp.*")
+    try:
+        mol = Chem.MolFromSmiles(query)
+        if mol is None:
+            mol = Chem.MolFromSmarts(query)
+    finally:
+        RDLogger.EnableLog("rdApp.*")
+    return mol
+
+
+def _pattern_fp(mol):
+    from rdkit import Chem, DataStructs
+
+    fp = Chem.PatternFingerprint(mol, fpSize=PATTERN_BITS)
+    bits = np.zeros(PATTERN_BITS, dtype=np.uint8)
+    DataStructs.ConvertToNumpyArray(fp, bits)
+    return np.packbits(bits)
+
+
+def _pattern_chunk(smiles_chunk):
+    from rdkit import Chem
+
+    out = np.zeros((len(smiles_chunk), PATTERN_BYTES), dtype=np.uint8)
+    ok = np.zeros(len(smiles_chunk), dtype=bool)
+
+    for i, smi in enumerate(smiles_chunk):
+        mol = Chem.MolFromSmiles(smi) if smi else None
+        if mol is None:
+            continue
+        out[i] = _pattern_fp(mol)
+        ok[i] = True
+
+    return out, ok
+
+
+def _match_chunk(args):
+    """
+    Full substructure match of one query against (row, smiles) pairs.
+    """
+    from rdkit import Chem
+
+    query, rows, smiles_chunk = args
+    pattern = parse_query(query)
+
+    hits = []
+    for row, smi in zip(rows, smiles_chunk):
+        mol = Chem.MolFromSmiles(smi)
+        if mol is not None and mol.HasSubstructMatch(pattern):
+            hits.append(row)
+    return hits
+
+
+# ------------------------------------------------------------
+# INDEX
+# ------------------------------------------------------------
+
+class SubstructureIndex(FingerprintIndex):
+    """
+    Memory-mapped pattern-fingerprint screen (see FingerprintIndex for
+    the file layout).
+
+    A library molecule can only contain the query if every bit of the
+    query's pattern fingerprint is also set in its own, so the bitwise
+    screen rejects most molecules before RDKit matching.
+    """
+
+    PREFIX = "substructure"
+    FP_BYTES = PATTERN_BYTES
+    LABEL = "Substructure"
+
+    fingerprint_chunk = staticmethod(_pattern_chunk)
+
+    def __init__(self, index_dir: str = INDEX_DIR):
+        super().__init__(index_dir)
+        self.last_stats = {}
+
+    def meta(self):
+        return {"bits": PATTERN_BITS}
+
+    # -------------------------
+    # Query
+    # -------------------------
+    def screen(self, query_fp: np.ndarray):
+        """
+        Rows whose pattern fingerprint contains every query bit.
+        """
+        q_words = np.ascontiguousarray(query_fp).view(np.uint64)
+        survivors = []
+
+        for start in range(0, len(self), SCREEN_CHUNK_ROWS):
+            block = np.asarray(self.fps[start:start + SCREEN_CHUNK_ROWS]).view(np.uint64)
+            keep = ((block & q_words) == q_words).all(axis=1)
+            survivors.append(np.flatnonzero(keep) + start)
+
+        return np.concatenate(survivors) if survivors else np.array([], dtype=int)
+
+    def _match(self, query: str, rows, limit: int | None, n_jobs: int | None):
+        """
+        Survivors that really contain the query, in library order;
+        stops once `limit` hits are found.
+        """
+        chunks = (
+            (query, rows[i:i + MATCH_CHUNK], [self.smiles[r] for r in rows[i:i + MATCH_CHUNK]])
+            for i in range(0, len(rows), MATCH_CHUNK)
+        )
+        hits, matched = [], 0
+
+        def done():
+            return limit and len(hits) >= limit
+
+        if len(rows) < PARALLEL_THRESHOLD:
+            for chunk in chunks:
+                hits.extend(_match_chunk(chunk))
+                matched += len(chunk[1])
+                if done():
+                    break
+            return hits, matched
+
+        # Bounded window of chunks in flight, consumed in order
+        workers = n_jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque(
+                (len(c[1]), pool.submit(_match_chunk, c))
+                for c in islice(chunks, 2 * workers)
+            )
+            while pending:
+                size, future = pending.popleft()
+                hits.extend(future.result())
+                matched += size
+                if done():
+                    for _, f in pending:
+                        f.cancel()
+                    break
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.append((len(chunk[1]), pool.submit(_match_chunk, chunk)))
+
+        return hits, matched
+
+    def search(self, query: str, limit: int | None = None, n_jobs: int | None = None):
+        """
+        Library compounds containing a substructure (SMILES or SMARTS).
+
+        Returns:
+            list[dict]: [{"id", "smiles"}] in library order, at most limit
+        """
+        pattern = parse_query(query)
+        if pattern is None or len(self) == 0:
+            return []
+
+        t0 = time.perf_counter()
+        survivors = self.screen(_pattern_fp(pattern))
+        t_screen = time.perf_counter() - t0
+
+        hits, matched = self._match(query, survivors.tolist(), limit, n_jobs)
+        if limit:
+            hits = hits[:limit]
+
+        self.last_stats = {
+            "library": len(self),
+            "screened_in": len(survivors),
+            "matched": matched,
+            "hits": len(hits),
+            "screen_time": round(t_screen, 4),
+            "total_time": round(time.perf_counter() - t0, 4),
+        }
+
+        return [{"id": self.ids[i], "smiles": self.smiles[i]} for i in hits]
+
+
+# ------------------------------------------------------------
+# SHARED INDEX OVER THE COMPOUND LIBRARY
+# ------------------------------------------------------------
+
+def get_substructure_index(rebuild: bool = False):
+    """
+    Substructure index over the compound library (see get_library_index).
+
+    Returns:
+        SubstructureIndex | None (if the library is missing)
+    """
+    return get_library_index(SubstructureIndex, rebuild=rebuild)
+
+
+def find_substructure_matches(query: str, limit: int | None = None):
+    """
+    Library compounds containing a scaffold / SMARTS pattern.
+    """
+    index = get_substructure_index()
+    if index is None:
+        return []
+    return index.search(query, limit=limit)
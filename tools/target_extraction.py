@@ -1,4 +1,5 @@
 import requests
+from tools.http_client import http_get
 from collections import Counter
 import re
 
@@ -13,7 +14,7 @@ def fetch_pubmed_abstracts(pmids, retmax=3):
         "rettype": "abstract"
     }
     try:
-        response = requests.get(base_url, params=params, timeout=10)
+        response = http_get(base_url, params=params, timeout=10)
         response.raise_for_status()
         return response.text
     except requests.RequestException: